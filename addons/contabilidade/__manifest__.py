@@ -22,11 +22,19 @@
         'security/ir_rule.xml',
         'views/contabilidade_contas.xml',
         'views/contabilidade_livro_diario.xml',
+        'views/contabilidade_saldo_mensal.xml',
+        'views/contabilidade_importacao.xml',
+        'views/contabilidade_provisionamento.xml',
+        'views/contabilidade_fechamento.xml',
         'views/contabilidade_livro_razao.xml',
         'views/contabilidade_balanco_patrimonial.xml',
         'views/contabilidade_dre.xml',
         'views/contabilidade_indicadores.xml',
+        'data/plano_contas_data.xml',
         'data/contas_data.xml',
+        'data/partidas_data.xml',
+        'data/saldo_mensal_data.xml',
+        'data/particionamento_data.xml',
         # 'views/custom.xml',
         'views/menus.xml',
     ],
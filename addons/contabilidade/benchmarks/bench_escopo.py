@@ -0,0 +1,122 @@
+"""Tempo da lista e dos relatórios de um usuário conforme cresce o número de usuários.
+
+Compara a regra de acesso antiga (OR entre ``user_id = usuário``, ``IS NULL``
+e ``= 1``) com a regra por ``escopo``. Executar dentro do ``odoo shell`` do
+banco que tem o módulo instalado::
+
+    docker compose run --rm odoo odoo shell -c /etc/odoo/odoo.conf -d <DATA_BASE_NAME> \
+        --db_host=db --db_user=odoo --db_pass=odoo < addons/contabilidade/benchmarks/bench_escopo.py
+
+Os usuários e lançamentos sintéticos são criados dentro da transação do
+shell, que é desfeita no final; o banco não é alterado.
+"""
+import statistics
+import time
+
+ESCALAS = [10, 100, 1000, 5000]
+CONTAS_POR_USUARIO = 20
+LANCAMENTOS_POR_USUARIO = 200
+REPETICOES = 20
+
+REGRA_ANTIGA = "['|','|', ('user_id', '=', user.id), ('user_id', '=', False), ('user_id', '=', 1)]"
+REGRAS = [
+    'contabilidade.contabilidade_contas_rule',
+    'contabilidade.contabilidade_livro_diario_rule',
+    'contabilidade.contabilidade_livro_diario_partida_rule',
+    'contabilidade.contabilidade_saldo_mensal_rule',
+]
+
+cr = env.cr  # noqa: F821 (fornecido pelo odoo shell)
+company_id = env.company.id  # noqa: F821
+currency_id = env.ref('base.BRL').id  # noqa: F821
+# usuário interno: o grupo e os que ele implica, como o create() gravaria
+grupo_ids = (env.ref('base.group_user') | env.ref('base.group_user').trans_implied_ids).ids  # noqa: F821
+
+
+def _criar_usuarios(quantidade, inicio):
+    """Usuários, contas e lançamentos sintéticos, gravados direto em SQL."""
+    cr.execute("""
+        WITH parceiros AS (
+            INSERT INTO res_partner (name, active, create_date, write_date)
+            SELECT 'bench escopo ' || g, TRUE, now(), now()
+              FROM generate_series(%s, %s) AS g
+         RETURNING id
+        )
+        INSERT INTO res_users (login, partner_id, company_id, active, notification_type, create_date, write_date)
+        SELECT 'bench_escopo_' || id, id, %s, TRUE, 'email', now(), now() FROM parceiros
+     RETURNING id
+    """, [inicio, inicio + quantidade - 1, company_id])
+    user_ids = [user_id for user_id, in cr.fetchall()]
+    cr.execute("""
+        INSERT INTO res_groups_users_rel (gid, uid)
+        SELECT g, u FROM unnest(%s::int[]) AS g, unnest(%s::int[]) AS u
+    """, [grupo_ids, user_ids])
+    cr.execute("""
+        INSERT INTO contabilidade_contas (conta, codigo, name, grupo_contabil, user_id, escopo)
+        SELECT 'Conta ' || n, '1.0.' || n, '1.0.' || n || ' - Conta ' || n,
+               CASE WHEN n %% 2 = 0 THEN 'circulante' ELSE 'receitas' END, u, u
+          FROM unnest(%s::int[]) AS u, generate_series(1, %s) AS n
+    """, [user_ids, CONTAS_POR_USUARIO])
+    cr.execute("""
+        INSERT INTO contabilidade_livro_diario
+               (data, descricao, tipo, conta_debito_id, conta_credito_id, valor, currency_id, user_id, escopo)
+        SELECT DATE '2024-01-01' + (n %% 365), 'bench', 'simples',
+               (SELECT min(id) FROM contabilidade_contas WHERE escopo = u),
+               (SELECT max(id) FROM contabilidade_contas WHERE escopo = u),
+               n + 0.5, %s, u, u
+          FROM unnest(%s::int[]) AS u, generate_series(1, %s) AS n
+    """, [currency_id, user_ids, LANCAMENTOS_POR_USUARIO])
+    env['contabilidade.livro.diario']._migrar_partidas()  # noqa: F821
+    return user_ids
+
+
+def _medir(usuario):
+    """Mediana (ms) de cada operação, com o cache do ORM limpo a cada repetição."""
+    Diario = env['contabilidade.livro.diario'].with_user(usuario)  # noqa: F821
+    Conta = env['contabilidade.contas'].with_user(usuario)  # noqa: F821
+    Saldo = env['contabilidade.saldo.mensal'].with_user(usuario)  # noqa: F821
+    operacoes = {
+        'lista do Livro Diário': lambda: Diario.search([], limit=80).mapped('descricao'),
+        'busca de conta': lambda: Conta.name_search('Conta 1', limit=8),
+        'saldos do relatório': lambda: Saldo.read_group([], ['debito:sum', 'credito:sum'], ['conta_id']),
+    }
+    tempos = {}
+    for nome, operacao in operacoes.items():
+        amostras = []
+        for _i in range(REPETICOES):
+            env.invalidate_all()  # noqa: F821
+            inicio = time.perf_counter()
+            operacao()
+            amostras.append((time.perf_counter() - inicio) * 1000)
+        tempos[nome] = statistics.median(amostras)
+    return tempos
+
+
+regras = [env.ref(xmlid) for xmlid in REGRAS]  # noqa: F821
+regra_escopo = regras[0].domain_force
+usuario = None
+total = 0
+resultados = []
+for escala in ESCALAS:
+    novos = _criar_usuarios(escala - total, total + 1)
+    usuario = usuario or env['res.users'].browse(novos[0])  # noqa: F821
+    total = escala
+    env['contabilidade.saldo.mensal']._reconstruir()  # noqa: F821
+    for tabela in ('contabilidade_contas', 'contabilidade_livro_diario',
+                   'contabilidade_livro_diario_partida', 'contabilidade_saldo_mensal'):
+        cr.execute(f"ANALYZE {tabela}")
+
+    for regra in regras:
+        regra.domain_force = REGRA_ANTIGA
+    antiga = _medir(usuario)
+    for regra in regras:
+        regra.domain_force = regra_escopo
+    resultados.append((escala, antiga, _medir(usuario)))
+
+print(f"{CONTAS_POR_USUARIO} contas e {LANCAMENTOS_POR_USUARIO} lançamentos por usuário; mediana em ms")
+for escala, antiga, escopo in resultados:
+    print(f"\n{escala} usuários")
+    for nome in antiga:
+        print(f"  {nome:24} regra antiga: {antiga[nome]:8.2f}   escopo: {escopo[nome]:8.2f}")
+
+cr.rollback()
@@ -0,0 +1,110 @@
+"""Planos de execução do Livro Diário com e sem os índices compostos.
+
+Executar dentro do ``odoo shell`` do banco que tem o módulo instalado::
+
+    docker compose run --rm odoo odoo shell -c /etc/odoo/odoo.conf -d <DATA_BASE_NAME> \
+        --db_host=db --db_user=odoo --db_pass=odoo < addons/contabilidade/benchmarks/bench_indices.py
+
+Os lançamentos sintéticos e a remoção dos índices acontecem dentro da
+transação do shell, que é desfeita no final; o banco não é alterado.
+"""
+import json
+import time
+
+from odoo.addons.contabilidade.models.contabilidade_escopo import sql_escopo
+
+LANCAMENTOS = 200_000
+USUARIOS = 50
+
+INDICES = [
+    'contabilidade_livro_diario_user_id_data_idx',
+    'contabilidade_livro_diario_conta_debito_id_data_idx',
+    'contabilidade_livro_diario_conta_credito_id_data_idx',
+    'contabilidade_livro_diario_partida_conta_id_data_idx',
+    'contabilidade_livro_diario_partida_user_id_data_idx',
+]
+
+cr = env.cr  # noqa: F821 (fornecido pelo odoo shell)
+# contas analíticas: os nós sintéticos do plano não recebem lançamentos
+conta_a, conta_b = env['contabilidade.contas'].search([('sintetica', '=', False)], limit=2, order='id').ids  # noqa: F821
+
+cr.execute(f"""
+    INSERT INTO contabilidade_livro_diario
+           (data, descricao, tipo, conta_debito_id, conta_credito_id, valor, currency_id, user_id, escopo)
+    SELECT data, descricao, tipo, conta_debito_id, conta_credito_id, valor, currency_id, user_id,
+           {sql_escopo('user_id')}
+      FROM (
+    SELECT DATE '2015-01-01' + (g %% 3650) AS data,
+           'bench' AS descricao,
+           'simples' AS tipo,
+           CASE WHEN g %% 2 = 0 THEN %s ELSE %s END AS conta_debito_id,
+           CASE WHEN g %% 2 = 0 THEN %s ELSE %s END AS conta_credito_id,
+           (g %% 1000) + 0.5 AS valor,
+           (SELECT id FROM res_currency WHERE name = 'BRL') AS currency_id,
+           (SELECT id FROM res_users ORDER BY id OFFSET (g %% %s) LIMIT 1) AS user_id
+      FROM generate_series(1, %s) AS g
+    ) AS sinteticos
+""", [conta_a, conta_b, conta_b, conta_a, USUARIOS, LANCAMENTOS])
+# os relatórios agregam as partidas, uma linha por lado de conta
+env['contabilidade.livro.diario']._migrar_partidas()  # noqa: F821
+cr.execute("ANALYZE contabilidade_livro_diario")
+cr.execute("ANALYZE contabilidade_livro_diario_partida")
+
+CONSULTAS = {
+    'relatório (partidas por usuário + mês)': ("""
+        SELECT conta_id, SUM(debito), SUM(credito) FROM contabilidade_livro_diario_partida
+         WHERE user_id IN %s AND data >= %s AND data <= %s
+         GROUP BY conta_id
+    """, [(env.uid,), '2024-03-01', '2024-03-31']),  # noqa: F821
+    'razão (partidas da conta + data)': ("""
+        SELECT id FROM contabilidade_livro_diario_partida
+         WHERE conta_id = %s AND data >= %s
+         ORDER BY data, id
+    """, [conta_a, '2024-12-01']),
+    'livro razão (conta OR conta + data)': ("""
+        SELECT id FROM contabilidade_livro_diario
+         WHERE (conta_credito_id = %s OR conta_debito_id = %s) AND data >= %s
+         ORDER BY data, id
+    """, [conta_a, conta_a, '2024-12-01']),
+    'lista (usuário, ordem padrão)': ("""
+        SELECT id FROM contabilidade_livro_diario
+         WHERE user_id = %s ORDER BY data, id LIMIT 80
+    """, [env.uid]),  # noqa: F821
+}
+
+
+def _nos(plano):
+    tipos = []
+    pilha = [plano]
+    while pilha:
+        no = pilha.pop()
+        tipos.append(no['Node Type'])
+        pilha.extend(no.get('Plans', []))
+    return tipos
+
+
+def _explain(sql, params):
+    inicio = time.perf_counter()
+    cr.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + sql, params)
+    resultado = cr.fetchone()[0]
+    if isinstance(resultado, str):
+        resultado = json.loads(resultado)
+    return _nos(resultado[0]['Plan']), (time.perf_counter() - inicio) * 1000
+
+
+cr.execute("SAVEPOINT sem_indices")
+for indice in INDICES:
+    cr.execute(f'DROP INDEX IF EXISTS "{indice}"')
+sem_indices = {nome: _explain(*consulta) for nome, consulta in CONSULTAS.items()}
+cr.execute("ROLLBACK TO SAVEPOINT sem_indices")
+
+com_indices = {nome: _explain(*consulta) for nome, consulta in CONSULTAS.items()}
+
+print(f"{LANCAMENTOS} lançamentos, {USUARIOS} usuários")
+for nome in CONSULTAS:
+    (nos_antes, ms_antes), (nos_depois, ms_depois) = sem_indices[nome], com_indices[nome]
+    print(f"\n{nome}")
+    print(f"  sem índices: {ms_antes:8.1f} ms  {' > '.join(nos_antes)}")
+    print(f"  com índices: {ms_depois:8.1f} ms  {' > '.join(nos_depois)}")
+
+cr.rollback()
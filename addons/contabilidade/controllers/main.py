@@ -0,0 +1,201 @@
+import json
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from werkzeug.wsgi import wrap_file
+
+from odoo import http
+from odoo.exceptions import AccessError
+from odoo.http import content_disposition, request
+
+# Os painéis consultam a API a cada minuto: o navegador guarda a resposta e
+# revalida com If-None-Match; sem lançamentos novos a resposta é um 304.
+CACHE_API = 'private, no-cache'
+
+# Lançamentos gravados por COPY de cada vez na API NDJSON
+LOTE_API = 1000
+
+
+class ContabilidadeController(http.Controller):
+
+    @http.route('/contabilidade/razao/exportar/<int:wizard_id>', type='http', auth='user')
+    def exportar_razao(self, wizard_id, **kwargs):
+        """Envia o arquivo do Livro Razão em lote, lendo-o do disco aos pedaços."""
+        wizard = request.env['contabilidade.livro.razao.exportacao'].browse(wizard_id).exists()
+        if not wizard:
+            raise request.not_found()
+        arquivo, nome, mimetype = wizard._gerar_arquivo()
+        return http.Response(
+            wrap_file(request.httprequest.environ, arquivo),
+            headers=[
+                ('Content-Type', mimetype),
+                ('Content-Disposition', content_disposition(nome)),
+            ],
+            direct_passthrough=True,
+        )
+
+    # ------------------------------------------------------------------
+    # API JSON dos relatórios
+    # ------------------------------------------------------------------
+    # Calculam direto pelos assistentes em memória (``new``), sem gravar
+    # assistentes nem linhas transitórias.
+
+    @staticmethod
+    def _mes(kwargs, sufixo='', padrao=None):
+        """Primeiro dia do mês de ``year<sufixo>``/``month<sufixo>`` (ValueError se inválido)."""
+        padrao = padrao or date.today()
+        ano = int(kwargs.get(f'year{sufixo}') or padrao.year)
+        mes = int(kwargs.get(f'month{sufixo}') or padrao.month)
+        return date(ano, mes, 1)
+
+    @staticmethod
+    def _booleano(valor):
+        return (valor or '').lower() in ('1', 'true', 'sim')
+
+    def _resposta_api(self, chave, calcular):
+        etag = request.env['contabilidade.report.engine']._etag(*chave)
+        headers = [('ETag', f'"{etag}"'), ('Cache-Control', CACHE_API)]
+        if request.httprequest.if_none_match.contains(etag):
+            return request.make_response('', headers=headers, status=304)
+        return request.make_json_response(calcular(), headers=headers)
+
+    def _erro_api(self, mensagem):
+        return request.make_json_response({'erro': mensagem}, status=400)
+
+    @http.route('/contabilidade/api/dre', type='http', auth='user', methods=['GET'])
+    def api_dre(self, **kwargs):
+        """DRE do mês (``modo=mes``) ou dos N meses até ele (``modo=colunas&meses=N``)."""
+        try:
+            mes = self._mes(kwargs)
+            modo = kwargs.get('modo') or 'mes'
+            meses = int(kwargs.get('meses') or 12)
+        except ValueError:
+            return self._erro_api("Parâmetros inválidos: use year, month e meses numéricos.")
+        if modo not in ('mes', 'colunas') or not 1 <= meses <= 36:
+            return self._erro_api("modo deve ser 'mes' ou 'colunas', com meses entre 1 e 36.")
+        zeradas = self._booleano(kwargs.get('zeradas'))
+
+        def calcular():
+            wizard = request.env['contabilidade.dre.wizard'].new({
+                'year': str(mes.year),
+                'month': str(mes.month),
+                'modo': modo,
+                'quantidade_meses': meses,
+                'show_zero_accounts': zeradas,
+                'currency_id': request.env.company.currency_id.id,
+            })
+            return wizard._dados_api()
+
+        return self._resposta_api(('dre', mes, modo, meses, zeradas), calcular)
+
+    @http.route('/contabilidade/api/balanco', type='http', auth='user', methods=['GET'])
+    def api_balanco(self, **kwargs):
+        """Balanço comparativo entre ``year_anterior/month_anterior`` (padrão: mês anterior) e ``year/month``."""
+        try:
+            recente = self._mes(kwargs)
+            anterior = self._mes(kwargs, '_anterior', recente - relativedelta(months=1))
+        except ValueError:
+            return self._erro_api("Parâmetros inválidos: use year, month, year_anterior e month_anterior numéricos.")
+        zeradas = self._booleano(kwargs.get('zeradas'))
+
+        def calcular():
+            wizard = request.env['contabilidade.balanco.patrimonial.wizard'].new({
+                'year_recent': str(recente.year),
+                'month_recent': str(recente.month),
+                'year_previous': str(anterior.year),
+                'month_previous': str(anterior.month),
+                'show_zero_accounts': zeradas,
+                'currency_id': request.env.company.currency_id.id,
+            })
+            return {
+                'recente': recente.isoformat(),
+                'anterior': anterior.isoformat(),
+                **wizard._dados_api(),
+            }
+
+        return self._resposta_api(('balanco', recente, anterior, zeradas), calcular)
+
+    @http.route('/contabilidade/api/indicadores', type='http', auth='user', methods=['GET'])
+    def api_indicadores(self, **kwargs):
+        """Indicadores do mês (liquidez, solvência, ROA, ROE) da série mensal."""
+        try:
+            mes = self._mes(kwargs)
+        except ValueError:
+            return self._erro_api("Parâmetros inválidos: use year e month numéricos.")
+
+        def calcular():
+            IndicadorMensal = request.env['contabilidade.indicador.mensal'].sudo()
+            return IndicadorMensal._dados_api(request.env.uid, mes)
+
+        return self._resposta_api(('indicadores', mes), calcular)
+
+    # ------------------------------------------------------------------
+    # API NDJSON de lançamentos
+    # ------------------------------------------------------------------
+    def _usuario_da_chave(self):
+        """Usuário da chave de API do cabeçalho ``Authorization: Bearer <chave>``, ou None."""
+        tipo, _sep, chave = (request.httprequest.headers.get('Authorization') or '').partition(' ')
+        if tipo.lower() != 'bearer' or not chave.strip():
+            return None
+        return request.env['res.users.apikeys'].sudo()._check_credentials(scope='rpc', key=chave.strip())
+
+    @staticmethod
+    def _registros_ndjson(stream, erros):
+        """``(numero, linha)`` de cada objeto JSON do corpo; linhas inválidas vão para ``erros``."""
+        for numero, bruta in enumerate(stream, start=1):
+            bruta = bruta.strip()
+            if not bruta:
+                continue
+            try:
+                lancamento = json.loads(bruta)
+                if not isinstance(lancamento, dict):
+                    raise ValueError("cada linha deve ser um objeto JSON")
+            except ValueError as erro:
+                erros[numero] = f"JSON inválido: {erro}"
+                continue
+            yield numero, {
+                campo: '' if lancamento.get(campo) is None else str(lancamento[campo])
+                for campo in ('data', 'descricao', 'conta_debito', 'conta_credito', 'valor')
+            }
+
+    @http.route('/contabilidade/api/lancamentos', type='http', auth='none', methods=['POST'], csrf=False,
+                save_session=False)
+    def api_lancamentos(self, **kwargs):
+        """Grava lançamentos simples enviados em NDJSON, um objeto por linha.
+
+        Cada linha tem as colunas da importação CSV (data, descricao,
+        conta_debito, conta_credito, valor), com as contas pelo código.
+        Tudo numa transação, em lotes por COPY. A resposta também é NDJSON,
+        com o resultado de cada linha do corpo, na mesma ordem.
+        """
+        uid = self._usuario_da_chave()
+        if not uid:
+            return request.make_json_response(
+                {'erro': "Chave de API ausente ou inválida."}, status=401, headers=[('WWW-Authenticate', 'Bearer')],
+            )
+        request.update_env(user=uid)
+        try:
+            request.env['contabilidade.livro.diario'].check_access_rights('create')
+        except AccessError:
+            return request.make_json_response(
+                {'erro': "Usuário sem permissão para criar lançamentos."}, status=403,
+            )
+
+        erros = {}
+        numeros = []
+
+        def registros():
+            for numero, linha in self._registros_ndjson(request.httprequest.stream, erros):
+                numeros.append(numero)
+                yield numero, linha
+
+        erros.update(request.env['contabilidade.importacao.wizard']._importar_registros(registros(), LOTE_API))
+
+        resultados = []
+        for numero in sorted({*numeros, *erros}):
+            if numero in erros:
+                resultados.append({'linha': numero, 'ok': False, 'erro': erros[numero]})
+            else:
+                resultados.append({'linha': numero, 'ok': True})
+        corpo = "".join(json.dumps(resultado, ensure_ascii=False) + "\n" for resultado in resultados)
+        return request.make_response(corpo, headers=[('Content-Type', 'application/x-ndjson; charset=utf-8')])
@@ -1,7 +1,17 @@
+from . import contabilidade_escopo
 from . import contabilidade_contas
 from . import contabilidade_livro_diario
+from . import contabilidade_livro_diario_partida
+from . import contabilidade_saldo_mensal
+from . import contabilidade_agregacao
+from . import contabilidade_report_engine
+from . import contabilidade_fechamento
+from . import contabilidade_importacao
 from . import contabilidade_livro_razao
+from . import contabilidade_livro_razao_exportacao
 from . import contabilidade_balanco_patrimonial
 from . import res_users
+from . import contabilidade_provisionamento
 from . import contabilidade_dre
 from . import contabilidade_indicadores
+from . import contabilidade_indicador_mensal
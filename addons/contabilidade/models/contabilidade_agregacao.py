@@ -0,0 +1,228 @@
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, models
+
+
+class ContabilidadeAgregacao(models.AbstractModel):
+    _name = 'contabilidade.agregacao'
+    _description = 'Agregação de débitos e créditos por conta'
+
+    @api.model
+    def _filtro_usuarios(self, user_ids, coluna='user_id'):
+        """Cláusula SQL para ``coluna IN user_ids`` (False representa "sem usuário")."""
+        ids = tuple(uid for uid in user_ids if uid)
+        clausulas = []
+        params = []
+        if ids:
+            clausulas.append(f"{coluna} IN %s")
+            params.append(ids)
+        if len(ids) != len(user_ids):
+            clausulas.append(f"{coluna} IS NULL")
+        if not clausulas:
+            return "FALSE", []
+        return "(" + " OR ".join(clausulas) + ")", params
+
+    @api.model
+    def _dividir_janela(self, date_from, date_to):
+        """Divide a janela [date_from, date_to] em meses completos e trechos de dias.
+
+        Retorna ``(mes_inicio, mes_fim, trechos)``: os meses completos são os
+        de ``mes_inicio <= periodo < mes_fim`` (``None`` = sem limite, ou
+        ``(False, False)`` se não houver mês completo) e ``trechos`` é a lista
+        de intervalos de datas (inclusivos) que precisam ser lidos das partidas.
+        """
+        mes_inicio = None
+        if date_from:
+            mes_inicio = date_from if date_from.day == 1 else date_from.replace(day=1) + relativedelta(months=1)
+        mes_fim = None
+        if date_to:
+            dia_seguinte = date_to + timedelta(days=1)
+            mes_fim = dia_seguinte if dia_seguinte.day == 1 else date_to.replace(day=1)
+
+        if mes_inicio and mes_fim and mes_inicio >= mes_fim:
+            return False, False, [(date_from, date_to)]
+
+        trechos = []
+        if date_from and date_from != mes_inicio:
+            trechos.append((date_from, mes_inicio - timedelta(days=1)))
+        if date_to and mes_fim <= date_to:
+            trechos.append((mes_fim, date_to))
+        return mes_inicio, mes_fim, trechos
+
+    @api.model
+    def _partes_janela(self, user_ids, date_from=None, date_to=None, conta_ids=None):
+        """Subconsultas ``(conta_id, debito, credito)`` que cobrem a janela de datas."""
+        mes_inicio, mes_fim, trechos = self._dividir_janela(date_from, date_to)
+
+        partes = []
+        params = []
+
+        if mes_inicio is not False:
+            filtro, filtro_params = self._filtro_usuarios(user_ids)
+            where = [filtro]
+            params_saldo = list(filtro_params)
+            if mes_inicio:
+                where.append("periodo >= %s")
+                params_saldo.append(mes_inicio)
+            if mes_fim:
+                where.append("periodo < %s")
+                params_saldo.append(mes_fim)
+            if conta_ids:
+                where.append("conta_id IN %s")
+                params_saldo.append(tuple(conta_ids))
+            partes.append(
+                "SELECT conta_id, debito, credito FROM contabilidade_saldo_mensal WHERE " + " AND ".join(where)
+            )
+            params.extend(params_saldo)
+
+        for inicio, fim in trechos:
+            filtro, filtro_params = self._filtro_usuarios(user_ids)
+            where = [filtro, "data >= %s", "data <= %s"]
+            params_trecho = [*filtro_params, inicio, fim]
+            if conta_ids:
+                where.append("conta_id IN %s")
+                params_trecho.append(tuple(conta_ids))
+            partes.append(
+                "SELECT conta_id, debito, credito FROM contabilidade_livro_diario_partida WHERE " + " AND ".join(where)
+            )
+            params.extend(params_trecho)
+
+        return partes, params
+
+    @api.model
+    def _partes_acumuladas(self, user_ids, date_to=None, conta_ids=None):
+        """Subconsultas para o acumulado desde o início até ``date_to``.
+
+        Para cada usuário com período fechado, parte do saldo congelado no
+        último fechamento até ``date_to`` e só agrega o que veio depois dele.
+        """
+        fechamentos = self.env['contabilidade.fechamento'].sudo()._ultimos_fechamentos(user_ids, date_to)
+
+        grupos = {}
+        for user_id in user_ids:
+            fechamento = fechamentos.get(user_id)
+            grupos.setdefault(fechamento, []).append(user_id)
+
+        partes = []
+        params = []
+        for fechamento, usuarios in grupos.items():
+            date_from = None
+            if fechamento:
+                fechamento_id, data_fechamento = fechamento
+                date_from = data_fechamento + timedelta(days=1)
+                where = "fechamento_id = %s"
+                params_fechamento = [fechamento_id]
+                if conta_ids:
+                    where += " AND conta_id IN %s"
+                    params_fechamento.append(tuple(conta_ids))
+                partes.append("SELECT conta_id, debito, credito FROM contabilidade_fechamento_saldo WHERE " + where)
+                params.extend(params_fechamento)
+                if date_to and date_from > date_to:
+                    continue
+            partes_janela, params_janela = self._partes_janela(usuarios, date_from, date_to, conta_ids)
+            partes.extend(partes_janela)
+            params.extend(params_janela)
+        return partes, params
+
+    @api.model
+    def _partes(self, user_ids, date_from=None, date_to=None, conta_ids=None):
+        if date_from:
+            return self._partes_janela(user_ids, date_from, date_to, conta_ids)
+        return self._partes_acumuladas(user_ids, date_to, conta_ids)
+
+    @api.model
+    def _mapas_por_conta(self, user_ids, date_from=None, date_to=None, conta_ids=None):
+        """Totais de débito e crédito por conta em uma janela de datas.
+
+        Usa os saldos mensais para os meses completos da janela e as partidas
+        do Livro Diário apenas para os dias das pontas, tudo em uma única consulta
+        agrupada. Sem ``date_from`` (posição acumulada), começa pelo último
+        fechamento de período. Retorna ``(debit_map, credit_map)`` no formato
+        ``{conta_id: total}``.
+        """
+        self.env['contabilidade.livro.diario.partida'].flush_model()
+        partes, params = self._partes(user_ids, date_from, date_to, conta_ids)
+
+        self.env.cr.execute(f"""
+            SELECT m.conta_id, SUM(m.debito), SUM(m.credito)
+              FROM ({" UNION ALL ".join(partes)}) AS m(conta_id, debito, credito)
+             WHERE m.conta_id IS NOT NULL
+             GROUP BY m.conta_id
+        """, params)
+
+        debit_map = {}
+        credit_map = {}
+        for conta_id, debito, credito in self.env.cr.fetchall():
+            debit_map[conta_id] = debito or 0.0
+            credit_map[conta_id] = credito or 0.0
+        return debit_map, credit_map
+
+    @api.model
+    def _mapas_por_conta_mes(self, user_ids, date_from, date_to, conta_ids=None):
+        """Totais de débito e crédito por conta e mês, lidos só dos saldos mensais.
+
+        ``date_from`` e ``date_to`` delimitam meses completos. Retorna
+        ``{periodo: (debit_map, credit_map)}``, com ``periodo`` no primeiro dia do mês.
+        """
+        self.env['contabilidade.livro.diario.partida'].flush_model()
+        filtro, params = self._filtro_usuarios(user_ids)
+        where = [filtro, "periodo >= %s", "periodo <= %s"]
+        params = [*params, date_from.replace(day=1), date_to]
+        if conta_ids:
+            where.append("conta_id IN %s")
+            params.append(tuple(conta_ids))
+        self.env.cr.execute(f"""
+            SELECT periodo, conta_id, SUM(debito), SUM(credito)
+              FROM contabilidade_saldo_mensal
+             WHERE {" AND ".join(where)}
+             GROUP BY periodo, conta_id
+        """, params)
+
+        mapas = {}
+        for periodo, conta_id, debito, credito in self.env.cr.fetchall():
+            debit_map, credit_map = mapas.setdefault(periodo, ({}, {}))
+            debit_map[conta_id] = debito or 0.0
+            credit_map[conta_id] = credito or 0.0
+        return mapas
+
+    @api.model
+    def _posicoes_por_conta(self, user_ids, datas, conta_ids=None):
+        """Débitos e créditos acumulados por conta em várias datas de corte, numa só consulta.
+
+        Cada data soma as partes de ``_partes_acumuladas``: o saldo congelado
+        no último fechamento até ela e só os meses e dias posteriores a ele,
+        marcadas com o índice da data. Retorna ``{data: (debit_map, credit_map)}``.
+        """
+        self.env['contabilidade.livro.diario.partida'].flush_model()
+        datas = list(datas)
+        if not datas:
+            return {}
+
+        partes = []
+        params = []
+        for indice, data in enumerate(datas):
+            partes_data, params_data = self._partes_acumuladas(user_ids, data, conta_ids)
+            partes.extend(f"SELECT {indice}, p.* FROM ({parte}) AS p" for parte in partes_data)
+            params.extend(params_data)
+
+        somas = [
+            f"SUM(CASE WHEN m.corte = {indice} THEN m.{coluna} ELSE 0 END)"
+            for indice in range(len(datas)) for coluna in ('debito', 'credito')
+        ]
+        self.env.cr.execute(f"""
+            SELECT m.conta_id, {", ".join(somas)}
+              FROM ({" UNION ALL ".join(partes)}) AS m(corte, conta_id, debito, credito)
+             WHERE m.conta_id IS NOT NULL
+             GROUP BY m.conta_id
+        """, params)
+
+        posicoes = {data: ({}, {}) for data in datas}
+        for row in self.env.cr.fetchall():
+            conta_id = row[0]
+            for indice, data in enumerate(datas):
+                debit_map, credit_map = posicoes[data]
+                debit_map[conta_id] = row[1 + 2 * indice] or 0.0
+                credit_map[conta_id] = row[2 + 2 * indice] or 0.0
+        return posicoes
@@ -2,6 +2,8 @@ from odoo import api, fields, models, Command
 from odoo.tools.float_utils import float_is_zero
 from dateutil.relativedelta import relativedelta
 from odoo.exceptions import ValidationError
+from markupsafe import Markup
+from datetime import date, timedelta
 
 MONTH_SELECTION = [
     ('1', 'Janeiro'),
@@ -18,6 +20,36 @@ MONTH_SELECTION = [
     ('12', 'Dezembro'),
 ]
 
+BS_GROUPS = [
+    'circulante', 'nao_circulante',
+    'passivo_circulante', 'passivo_nao_circulante',
+    'patrimonio',
+]
+
+GROUP_INFO = {
+    'circulante': {
+        'label': 'Ativo Circulante',
+        'section': 'ativo',
+    },
+    'nao_circulante': {
+        'label': 'Ativo Não Circulante',
+        'section': 'ativo',
+    },
+    'passivo_circulante': {
+        'label': 'Passivo Circulante',
+        'section': 'passivo_pl',
+    },
+    'passivo_nao_circulante': {
+        'label': 'Passivo Não Circulante',
+        'section': 'passivo_pl',
+    },
+    'patrimonio': {
+        'label': 'Patrimônio Líquido',
+        'section': 'passivo_pl',
+    },
+}
+
+
 class ContabilidadeBalancoPatrimonialWizard(models.TransientModel):
     _name = 'contabilidade.balanco.patrimonial.wizard'
     _description = 'Balanço Patrimonial (análise vertical e horizontal)'
@@ -52,6 +84,23 @@ class ContabilidadeBalancoPatrimonialWizard(models.TransientModel):
     total_passivo_pl_recent   = fields.Monetary(string='Total P Recente', currency_field='currency_id', compute='_compute_balanco')
     total_passivo_pl_previous = fields.Monetary(string='Total P Anterior', currency_field='currency_id', compute='_compute_balanco')
 
+    # Tendência: N meses terminando no Mês 2
+    modo = fields.Selection([
+        ('comparativo', 'Comparativo (Mês 1 x Mês 2)'),
+        ('tendencia', 'Tendência'),
+    ], string='Modo', required=True, default='comparativo')
+    quantidade_meses = fields.Selection([
+        ('6', '6 meses'),
+        ('12', '12 meses'),
+        ('24', '24 meses'),
+    ], string='Meses', required=True, default='12')
+    ah_modo = fields.Selection([
+        ('encadeada', 'Sobre o mês anterior'),
+        ('base', 'Sobre o primeiro mês'),
+    ], string='AH%', required=True, default='encadeada')
+    tendencia_html = fields.Html(string='Tendência', compute='_compute_tendencia', sanitize=False)
+    tendencia_ids = fields.One2many('contabilidade.balanco.patrimonial.tendencia', 'wizard_id', string='Células da tendência')
+
     @api.onchange('month_recent', 'year_recent', 'month_previous', 'year_previous', 'show_zero_accounts')
     def _onchange_filters(self):
         self._compute_balanco()
@@ -92,349 +141,508 @@ class ContabilidadeBalancoPatrimonialWizard(models.TransientModel):
         return credit_sum - debit_sum
 
 
-    @api.depends('month_recent', 'year_recent', 'month_previous', 'year_previous', 'show_zero_accounts', 'currency_id')
-    def _compute_balanco(self):
-        Diario = self.env['contabilidade.livro.diario'].sudo()
-        Account = self.env['contabilidade.contas'].sudo()
-
-        BS_GROUPS = [
-            'circulante', 'nao_circulante',
-            'passivo_circulante', 'passivo_nao_circulante',
-            'patrimonio',
-        ]
+    def _dados_balanco(self, date_previous, date_recent):
+        """Saldo natural de cada conta de balanço e o resultado acumulado nas duas datas.
 
-        GROUP_INFO = {
-            'circulante': {
-                'label': 'Ativo Circulante',
-                'section': 'ativo',
-            },
-            'nao_circulante': {
-                'label': 'Ativo Não Circulante',
-                'section': 'ativo',
-            },
-            'passivo_circulante': {
-                'label': 'Passivo Circulante',
-                'section': 'passivo_pl',
-            },
-            'passivo_nao_circulante': {
-                'label': 'Passivo Não Circulante',
-                'section': 'passivo_pl',
-            },
-            'patrimonio': {
-                'label': 'Patrimônio Líquido',
-                'section': 'passivo_pl',
-            },
-        }
+        Só depende das datas e do Livro Diário: fica memorizado na transação,
+        e filtros de exibição (``show_zero_accounts``) não voltam ao banco.
+        Retorna ``(contas, resultado_recent, resultado_previous)``, com
+        ``contas`` na ordem do plano.
+        """
+        user_ids = [self.env.user.id]
+        return self.env['contabilidade.report.engine']._memorizar(
+            ('balanco', date_previous, date_recent), user_ids,
+            lambda: self._calcular_dados_balanco(user_ids, date_previous, date_recent),
+        )
 
-        for wizard in self:
-            wizard.line_ids = [Command.clear()]
-            wizard.total_ativo_recent = 0.0
-            wizard.total_ativo_previous = 0.0
-            wizard.total_passivo_pl_recent = 0.0
-            wizard.total_passivo_pl_previous = 0.0
+    def _calcular_dados_balanco(self, user_ids, date_previous, date_recent):
+        Engine = self.env['contabilidade.report.engine']
+        Account = self.env['contabilidade.contas'].sudo()
 
-            if not wizard.month_recent or not wizard.year_recent or not wizard.month_previous or not wizard.year_previous:
+        # --- totais acumulados até cada data (posição), numa única consulta ---
+        posicoes = Engine._posicoes(user_ids, [date_previous, date_recent])
+        debit_recent, credit_recent = posicoes[date_recent]
+        debit_previous, credit_previous = posicoes[date_previous]
+
+        # contas de balanço
+        accounts = Account.search([
+            ('grupo_contabil', 'in', BS_GROUPS),
+            ('sintetica', '=', False),
+            *Account._dominio_escopo(),
+        ], order='codigo asc, conta asc, id asc')
+
+        # contas de resultado
+        receita_accounts = Account.search([
+            ('grupo_contabil', 'in', ['receita', 'receitas']),
+            ('sintetica', '=', False),
+            *Account._dominio_escopo(),
+        ])
+        despesa_accounts = Account.search([
+            ('grupo_contabil', 'in', ['despesa', 'despesas']),
+            ('sintetica', '=', False),
+            *Account._dominio_escopo(),
+        ])
+
+        # saldos por conta
+        contas = []
+        for acc in accounts:
+            area = self._map_area_from_group(acc.grupo_contabil)
+            if not area:
                 continue
+            contas.append({
+                'account_id': acc.id,
+                'name': acc.name,
+                'group_key': acc.grupo_contabil,
+                'section': GROUP_INFO[acc.grupo_contabil]['section'],
+                'area': area,
+                'saldo_recent': self._compute_natural_balance(
+                    area, debit_recent.get(acc.id, 0.0), credit_recent.get(acc.id, 0.0),
+                ),
+                'saldo_previous': self._compute_natural_balance(
+                    area, debit_previous.get(acc.id, 0.0), credit_previous.get(acc.id, 0.0),
+                ),
+            })
 
-            currency = wizard.currency_id
-            precision = currency.rounding
-
-            # Converte mês/ano para datas (último dia de cada mês selecionado)
-            from datetime import date, timedelta
-            base_date_recent = date(int(wizard.year_recent), int(wizard.month_recent), 1)
-            base_date_previous = date(int(wizard.year_previous), int(wizard.month_previous), 1)
-            date_recent = (base_date_recent + relativedelta(months=1)) - timedelta(days=1)
-            date_previous = (base_date_previous + relativedelta(months=1)) - timedelta(days=1)
-
-            # --- movimentos até cada data (posição) ---
-            user_field = 'user_id' if 'user_id' in Diario._fields else 'create_uid'
-            domain_base = [(user_field, '=', self.env.user.id)]
-
-            moves_recent = Diario.search([
-                *domain_base,
-                ('data', '<=', date_recent),
-            ])
-            moves_previous = Diario.search([
-                *domain_base,
-                ('data', '<=', date_previous),
-            ])
-
-            debit_recent = {}
-            credit_recent = {}
-            debit_previous = {}
-            credit_previous = {}
-
-            for m in moves_recent:
-                if m.conta_debito_id:
-                    debit_recent[m.conta_debito_id.id] = debit_recent.get(m.conta_debito_id.id, 0.0) + (m.valor or 0.0)
-                if m.conta_credito_id:
-                    credit_recent[m.conta_credito_id.id] = credit_recent.get(m.conta_credito_id.id, 0.0) + (m.valor or 0.0)
-
-            for m in moves_previous:
-                if m.conta_debito_id:
-                    debit_previous[m.conta_debito_id.id] = debit_previous.get(m.conta_debito_id.id, 0.0) + (m.valor or 0.0)
-                if m.conta_credito_id:
-                    credit_previous[m.conta_credito_id.id] = credit_previous.get(m.conta_credito_id.id, 0.0) + (m.valor or 0.0)
-
-            # contas de balanço
-            accounts = Account.search([
-                ('grupo_contabil', 'in', BS_GROUPS),
-                '|', '|',
-                ('user_id', '=', self.env.user.id),
-                ('user_id', '=', False),
-                ('user_id', '=', 1),
-            ], order='codigo asc, conta asc, id asc')
-
-            # contas de resultado
-            receita_accounts = Account.search([
-                ('grupo_contabil', 'in', ['receita', 'receitas']),
-                '|', '|',
-                ('user_id', '=', self.env.user.id),
-                ('user_id', '=', False),
-                ('user_id', '=', 1),
-            ])
-            despesa_accounts = Account.search([
-                ('grupo_contabil', 'in', ['despesa', 'despesas']),
-                '|', '|',
-                ('user_id', '=', self.env.user.id),
-                ('user_id', '=', False),
-                ('user_id', '=', 1),
-            ])
-
-            account_data_by_group = {g: [] for g in BS_GROUPS}
-            group_totals_recent = {g: 0.0 for g in BS_GROUPS}
-            group_totals_previous = {g: 0.0 for g in BS_GROUPS}
-
-            total_ativo_recent = total_ativo_previous = 0.0
-            total_passivo_pl_recent = total_passivo_pl_previous = 0.0
-
-            # saldos por conta
-            for acc in accounts:
-                group_key = acc.grupo_contabil
-                area = wizard._map_area_from_group(group_key)
-                if not area:
-                    continue
-
-                debit_r = debit_recent.get(acc.id, 0.0)
-                credit_r = credit_recent.get(acc.id, 0.0)
-                debit_p = debit_previous.get(acc.id, 0.0)
-                credit_p = credit_previous.get(acc.id, 0.0)
+        # resultado acumulado
+        def _net_result(debit_map, credit_map):
+            total_receita = sum((credit_map.get(acc.id, 0.0) - debit_map.get(acc.id, 0.0)) for acc in receita_accounts)
+            total_despesa = sum((debit_map.get(acc.id, 0.0) - credit_map.get(acc.id, 0.0)) for acc in despesa_accounts)
+            return total_receita - total_despesa
 
-                balance_recent = wizard._compute_natural_balance(area, debit_r, credit_r)
-                balance_previous = wizard._compute_natural_balance(area, debit_p, credit_p)
+        return contas, _net_result(debit_recent, credit_recent), _net_result(debit_previous, credit_previous)
 
-                if (
-                    not wizard.show_zero_accounts
-                    and float_is_zero(balance_recent, precision_rounding=precision)
-                    and float_is_zero(balance_previous, precision_rounding=precision)
-                ):
-                    continue
+    def _linhas_balanco(self):
+        """``(linhas, totais)`` do Balanço do assistente, sem gravar nada.
 
-                section = GROUP_INFO[group_key]['section']
+        ``linhas`` são os valores das linhas (``contabilidade.balanco.patrimonial.line``)
+        e ``totais`` os totais de ativo e de passivo + PL nas duas datas.
+        """
+        self.ensure_one()
+        currency = self.currency_id
+        precision = currency.rounding
 
-                if area == 'ativo':
-                    total_ativo_recent += balance_recent
-                    total_ativo_previous += balance_previous
-                else:
-                    total_passivo_pl_recent += balance_recent
-                    total_passivo_pl_previous += balance_previous
+        # Converte mês/ano para datas (último dia de cada mês selecionado)
+        base_date_recent = date(int(self.year_recent), int(self.month_recent), 1)
+        base_date_previous = date(int(self.year_previous), int(self.month_previous), 1)
+        date_recent = (base_date_recent + relativedelta(months=1)) - timedelta(days=1)
+        date_previous = (base_date_previous + relativedelta(months=1)) - timedelta(days=1)
 
-                group_totals_recent[group_key] += balance_recent
-                group_totals_previous[group_key] += balance_previous
+        contas, resultado_recent, resultado_previous = self._dados_balanco(date_previous, date_recent)
 
-                account_data_by_group[group_key].append({
-                    'account_id': acc.id,
-                    'name': acc.name,
-                    'group_key': group_key,
-                    'section': section,
-                    'area': area,
-                    'saldo_recent': balance_recent,
-                    'saldo_previous': balance_previous,
-                })
+        account_data_by_group = {g: [] for g in BS_GROUPS}
+        group_totals_recent = {g: 0.0 for g in BS_GROUPS}
+        group_totals_previous = {g: 0.0 for g in BS_GROUPS}
 
-            # resultado acumulado
-            def _net_result(debit_map, credit_map):
-                total_receita = sum((credit_map.get(acc.id, 0.0) - debit_map.get(acc.id, 0.0)) for acc in receita_accounts)
-                total_despesa = sum((debit_map.get(acc.id, 0.0) - credit_map.get(acc.id, 0.0)) for acc in despesa_accounts)
-                return total_receita - total_despesa
+        total_ativo_recent = total_ativo_previous = 0.0
+        total_passivo_pl_recent = total_passivo_pl_previous = 0.0
 
-            resultado_recent = _net_result(debit_recent, credit_recent)
-            resultado_previous = _net_result(debit_previous, credit_previous)
+        for data in contas:
+            balance_recent = data['saldo_recent']
+            balance_previous = data['saldo_previous']
 
-            if not (
-                float_is_zero(resultado_recent, precision_rounding=precision)
-                and float_is_zero(resultado_previous, precision_rounding=precision)
-                and not wizard.show_zero_accounts
+            if (
+                not self.show_zero_accounts
+                and float_is_zero(balance_recent, precision_rounding=precision)
+                and float_is_zero(balance_previous, precision_rounding=precision)
             ):
-                group_key = 'patrimonio'
-                section = 'passivo_pl'
-
-                group_totals_recent[group_key] += resultado_recent
-                group_totals_previous[group_key] += resultado_previous
-                total_passivo_pl_recent += resultado_recent
-                total_passivo_pl_previous += resultado_previous
-
-                account_data_by_group[group_key].append({
-                    'account_id': False,
-                    'name': 'Lucros/Prejuízos Acumulados',
-                    'group_key': group_key,
-                    'section': section,
-                    'area': 'patrimonio',
-                    'saldo_recent': resultado_recent,
-                    'saldo_previous': resultado_previous,
-                })
-
-            def percent(value, denom):
-                if float_is_zero(denom, precision_rounding=precision):
-                    return 0.0
-                return value / denom
+                continue
 
-            def ah(recent_val, previous_val):
-                if float_is_zero(previous_val, precision_rounding=precision):
-                    return False
-                return (recent_val - previous_val) / previous_val
+            group_key = data['group_key']
+            if data['area'] == 'ativo':
+                total_ativo_recent += balance_recent
+                total_ativo_previous += balance_previous
+            else:
+                total_passivo_pl_recent += balance_recent
+                total_passivo_pl_previous += balance_previous
+
+            group_totals_recent[group_key] += balance_recent
+            group_totals_previous[group_key] += balance_previous
+
+            account_data_by_group[group_key].append(data)
+
+        if not (
+            float_is_zero(resultado_recent, precision_rounding=precision)
+            and float_is_zero(resultado_previous, precision_rounding=precision)
+            and not self.show_zero_accounts
+        ):
+            group_key = 'patrimonio'
+            section = 'passivo_pl'
+
+            group_totals_recent[group_key] += resultado_recent
+            group_totals_previous[group_key] += resultado_previous
+            total_passivo_pl_recent += resultado_recent
+            total_passivo_pl_previous += resultado_previous
+
+            account_data_by_group[group_key].append({
+                'account_id': False,
+                'name': 'Lucros/Prejuízos Acumulados',
+                'group_key': group_key,
+                'section': section,
+                'area': 'patrimonio',
+                'saldo_recent': resultado_recent,
+                'saldo_previous': resultado_previous,
+            })
 
-            line_commands = []
-            seq = 0
+        def percent(value, denom):
+            if float_is_zero(denom, precision_rounding=precision):
+                return 0.0
+            return value / denom
+
+        def ah(recent_val, previous_val):
+            if float_is_zero(previous_val, precision_rounding=precision):
+                return False
+            return (recent_val - previous_val) / previous_val
+
+        linhas = []
+
+        def add_line(values):
+            values.setdefault('sequence', len(linhas) + 1)
+            values.setdefault('currency_id', currency.id)
+            linhas.append(values)
+
+        # HEADER ATIVO
+        add_line({
+            'name': 'ATIVO',
+            'section': 'ativo',
+            'display_type': 'section',
+            'saldo_recent': currency.round(total_ativo_recent),
+            'saldo_previous': currency.round(total_ativo_previous),
+            'av_recent': percent(total_ativo_recent, total_ativo_recent),
+            'av_previous': percent(total_ativo_previous, total_ativo_previous),
+            'ah_percent': ah(total_ativo_recent, total_ativo_previous),
+        })
+
+        # grupos de ATIVO (subtotais)
+        for group_key in ('circulante', 'nao_circulante'):
+            group_label = GROUP_INFO[group_key]['label']
+            group_r = group_totals_recent.get(group_key, 0.0)
+            group_p = group_totals_previous.get(group_key, 0.0)
 
-            def add_line(values):
-                nonlocal seq
-                seq += 1
-                values.setdefault('sequence', seq)
-                values.setdefault('currency_id', currency.id)
-                line_commands.append(Command.create(values))
+            if (
+                not self.show_zero_accounts
+                and float_is_zero(group_r, precision_rounding=precision)
+                and float_is_zero(group_p, precision_rounding=precision)
+            ):
+                continue
 
-            # HEADER ATIVO
             add_line({
-                'name': 'ATIVO',
+                'name': group_label,
                 'section': 'ativo',
-                'display_type': 'section',
-                'saldo_recent': currency.round(total_ativo_recent),
-                'saldo_previous': currency.round(total_ativo_previous),
-                'av_recent': percent(total_ativo_recent, total_ativo_recent),
-                'av_previous': percent(total_ativo_previous, total_ativo_previous),
-                'ah_percent': ah(total_ativo_recent, total_ativo_previous),
+                'group_key': group_key,
+                'display_type': 'subtotal',
+                'saldo_recent': currency.round(group_r),
+                'saldo_previous': currency.round(group_p),
+                'av_recent': percent(group_r, total_ativo_recent),
+                'av_previous': percent(group_p, total_ativo_previous),
+                'ah_percent': ah(group_r, group_p),
             })
 
-            # grupos de ATIVO (subtotais)
-            for group_key in ('circulante', 'nao_circulante'):
-                group_label = GROUP_INFO[group_key]['label']
-                group_r = group_totals_recent.get(group_key, 0.0)
-                group_p = group_totals_previous.get(group_key, 0.0)
+            for data in account_data_by_group.get(group_key, []):
+                saldo_r = data['saldo_recent']
+                saldo_p = data['saldo_previous']
 
                 if (
-                    not wizard.show_zero_accounts
-                    and float_is_zero(group_r, precision_rounding=precision)
-                    and float_is_zero(group_p, precision_rounding=precision)
+                    not self.show_zero_accounts
+                    and float_is_zero(saldo_r, precision_rounding=precision)
+                    and float_is_zero(saldo_p, precision_rounding=precision)
                 ):
                     continue
 
                 add_line({
-                    'name': group_label,
+                    'conta_id': data['account_id'],
+                    'name': data['name'],
                     'section': 'ativo',
                     'group_key': group_key,
-                    'display_type': 'subtotal',
-                    'saldo_recent': currency.round(group_r),
-                    'saldo_previous': currency.round(group_p),
-                    'av_recent': percent(group_r, total_ativo_recent),
-                    'av_previous': percent(group_p, total_ativo_previous),
-                    'ah_percent': ah(group_r, group_p),
+                    'display_type': 'line',
+                    'saldo_recent': currency.round(saldo_r),
+                    'saldo_previous': currency.round(saldo_p),
+                    'av_recent': percent(saldo_r, total_ativo_recent),
+                    'av_previous': percent(saldo_p, total_ativo_previous),
+                    'ah_percent': ah(saldo_r, saldo_p),
                 })
 
-                for data in account_data_by_group.get(group_key, []):
-                    saldo_r = data['saldo_recent']
-                    saldo_p = data['saldo_previous']
-
-                    if (
-                        not wizard.show_zero_accounts
-                        and float_is_zero(saldo_r, precision_rounding=precision)
-                        and float_is_zero(saldo_p, precision_rounding=precision)
-                    ):
-                        continue
-
-                    add_line({
-                        'conta_id': data['account_id'],
-                        'name': data['name'],
-                        'section': 'ativo',
-                        'group_key': group_key,
-                        'display_type': 'line',
-                        'saldo_recent': currency.round(saldo_r),
-                        'saldo_previous': currency.round(saldo_p),
-                        'av_recent': percent(saldo_r, total_ativo_recent),
-                        'av_previous': percent(saldo_p, total_ativo_previous),
-                        'ah_percent': ah(saldo_r, saldo_p),
-                    })
-
-            # HEADER PASSIVO + PL
+        # HEADER PASSIVO + PL
+        add_line({
+            'name': 'PASSIVO + PL',
+            'section': 'passivo_pl',
+            'display_type': 'section',
+            'saldo_recent': currency.round(total_passivo_pl_recent),
+            'saldo_previous': currency.round(total_passivo_pl_previous),
+            'av_recent': percent(total_passivo_pl_recent, total_passivo_pl_recent),
+            'av_previous': percent(total_passivo_pl_previous, total_passivo_pl_previous),
+            'ah_percent': ah(total_passivo_pl_recent, total_passivo_pl_previous),
+        })
+
+        # grupos de PASSIVO + PL (subtotais)
+        for group_key in ('passivo_circulante', 'passivo_nao_circulante', 'patrimonio'):
+            group_label = GROUP_INFO[group_key]['label']
+            group_r = group_totals_recent.get(group_key, 0.0)
+            group_p = group_totals_previous.get(group_key, 0.0)
+
+            if (
+                not self.show_zero_accounts
+                and float_is_zero(group_r, precision_rounding=precision)
+                and float_is_zero(group_p, precision_rounding=precision)
+            ):
+                continue
+
             add_line({
-                'name': 'PASSIVO + PL',
+                'name': group_label,
                 'section': 'passivo_pl',
-                'display_type': 'section',
-                'saldo_recent': currency.round(total_passivo_pl_recent),
-                'saldo_previous': currency.round(total_passivo_pl_previous),
-                'av_recent': percent(total_passivo_pl_recent, total_passivo_pl_recent),
-                'av_previous': percent(total_passivo_pl_previous, total_passivo_pl_previous),
-                'ah_percent': ah(total_passivo_pl_recent, total_passivo_pl_previous),
+                'group_key': group_key,
+                'display_type': 'subtotal',
+                'saldo_recent': currency.round(group_r),
+                'saldo_previous': currency.round(group_p),
+                'av_recent': percent(group_r, total_passivo_pl_recent),
+                'av_previous': percent(group_p, total_passivo_pl_previous),
+                'ah_percent': ah(group_r, group_p),
             })
 
-            # grupos de PASSIVO + PL (subtotais)
-            for group_key in ('passivo_circulante', 'passivo_nao_circulante', 'patrimonio'):
-                group_label = GROUP_INFO[group_key]['label']
-                group_r = group_totals_recent.get(group_key, 0.0)
-                group_p = group_totals_previous.get(group_key, 0.0)
+            for data in account_data_by_group.get(group_key, []):
+                saldo_r = data['saldo_recent']
+                saldo_p = data['saldo_previous']
 
                 if (
-                    not wizard.show_zero_accounts
-                    and float_is_zero(group_r, precision_rounding=precision)
-                    and float_is_zero(group_p, precision_rounding=precision)
+                    not self.show_zero_accounts
+                    and float_is_zero(saldo_r, precision_rounding=precision)
+                    and float_is_zero(saldo_p, precision_rounding=precision)
                 ):
                     continue
 
                 add_line({
-                    'name': group_label,
+                    'conta_id': data['account_id'],
+                    'name': data['name'],
                     'section': 'passivo_pl',
                     'group_key': group_key,
-                    'display_type': 'subtotal',
-                    'saldo_recent': currency.round(group_r),
-                    'saldo_previous': currency.round(group_p),
-                    'av_recent': percent(group_r, total_passivo_pl_recent),
-                    'av_previous': percent(group_p, total_passivo_pl_previous),
-                    'ah_percent': ah(group_r, group_p),
+                    'display_type': 'line',
+                    'saldo_recent': currency.round(saldo_r),
+                    'saldo_previous': currency.round(saldo_p),
+                    'av_recent': percent(saldo_r, total_passivo_pl_recent),
+                    'av_previous': percent(saldo_p, total_passivo_pl_previous),
+                    'ah_percent': ah(saldo_r, saldo_p),
                 })
 
-                for data in account_data_by_group.get(group_key, []):
-                    saldo_r = data['saldo_recent']
-                    saldo_p = data['saldo_previous']
-
-                    if (
-                        not wizard.show_zero_accounts
-                        and float_is_zero(saldo_r, precision_rounding=precision)
-                        and float_is_zero(saldo_p, precision_rounding=precision)
-                    ):
-                        continue
-
-                    add_line({
-                        'conta_id': data['account_id'],
-                        'name': data['name'],
-                        'section': 'passivo_pl',
-                        'group_key': group_key,
-                        'display_type': 'line',
-                        'saldo_recent': currency.round(saldo_r),
-                        'saldo_previous': currency.round(saldo_p),
-                        'av_recent': percent(saldo_r, total_passivo_pl_recent),
-                        'av_previous': percent(saldo_p, total_passivo_pl_previous),
-                        'ah_percent': ah(saldo_r, saldo_p),
-                    })
-
-            wizard.line_ids = line_commands
-            wizard.total_ativo_recent = currency.round(total_ativo_recent)
-            wizard.total_ativo_previous = currency.round(total_ativo_previous)
-            wizard.total_passivo_pl_recent = currency.round(total_passivo_pl_recent)
-            wizard.total_passivo_pl_previous = currency.round(total_passivo_pl_previous)
+        totais = {
+            'total_ativo_recent': currency.round(total_ativo_recent),
+            'total_ativo_previous': currency.round(total_ativo_previous),
+            'total_passivo_pl_recent': currency.round(total_passivo_pl_recent),
+            'total_passivo_pl_previous': currency.round(total_passivo_pl_previous),
+        }
+        return linhas, totais
+
+    def _dados_api(self):
+        """Balanço em estruturas simples (JSON): totais e linhas."""
+        self.ensure_one()
+        linhas, totais = self._linhas_balanco()
+        campos = ('name', 'section', 'group_key', 'display_type', 'conta_id',
+                  'saldo_recent', 'saldo_previous', 'av_recent', 'av_previous', 'ah_percent')
+        return {
+            'totais': totais,
+            'linhas': [{campo: linha.get(campo, False) for campo in campos} for linha in linhas],
+        }
+
+    @api.depends('month_recent', 'year_recent', 'month_previous', 'year_previous', 'show_zero_accounts', 'currency_id')
+    def _compute_balanco(self):
+        for wizard in self:
+            wizard.line_ids = [Command.clear()]
+            wizard.total_ativo_recent = 0.0
+            wizard.total_ativo_previous = 0.0
+            wizard.total_passivo_pl_recent = 0.0
+            wizard.total_passivo_pl_previous = 0.0
+
+            if not wizard.month_recent or not wizard.year_recent or not wizard.month_previous or not wizard.year_previous:
+                continue
+
+            linhas, totais = wizard._linhas_balanco()
+            wizard.line_ids = [Command.create(values) for values in linhas]
+            wizard.update(totais)
+
+
+    def _saldos_tendencia(self, fim, quantidade_meses):
+        """Saldo de fim de mês de cada conta de balanço e o resultado acumulado, nos N meses até ``fim``.
+
+        Memorizado na transação: AH%, contas zeradas e moeda não voltam ao
+        banco. Retorna ``(meses, contas, resultado)``, com ``contas`` como
+        lista de ``(conta_id, nome, grupo, saldos)``.
+        """
+        user_ids = [self.env.user.id]
+        return self.env['contabilidade.report.engine']._memorizar(
+            ('balanco_tendencia', fim, quantidade_meses), user_ids,
+            lambda: self._calcular_saldos_tendencia(user_ids, fim, quantidade_meses),
+        )
+
+    def _calcular_saldos_tendencia(self, user_ids, fim, quantidade_meses):
+        Engine = self.env['contabilidade.report.engine']
+        Account = self.env['contabilidade.contas'].sudo()
+
+        meses = [fim - relativedelta(months=n) for n in reversed(range(quantidade_meses))]
+        # posição no último dia de cada mês, partindo do último fechamento até ele
+        fins_mes = [mes + relativedelta(months=1, days=-1) for mes in meses]
+        posicoes = Engine._posicoes(user_ids, fins_mes)
+
+        accounts = Account.search([
+            ('grupo_contabil', 'in', BS_GROUPS + ['receitas', 'despesa']),
+            ('sintetica', '=', False),
+            *Account._dominio_escopo(),
+        ], order='codigo asc, conta asc, id asc')
+
+        # saldo natural de cada conta no fim de cada mês
+        saldos = {acc.id: [] for acc in accounts}
+        resultado = []
+        for fim_mes in fins_mes:
+            debit_acum, credit_acum = posicoes[fim_mes]
+            lucro = 0.0
+            for acc in accounts:
+                debito = debit_acum.get(acc.id, 0.0)
+                credito = credit_acum.get(acc.id, 0.0)
+                area = self._map_area_from_group(acc.grupo_contabil)
+                if area:
+                    saldos[acc.id].append(self._compute_natural_balance(area, debito, credito))
+                else:
+                    lucro += credito - debito
+            resultado.append(lucro)
+
+        contas = [
+            (acc.id, acc.name, acc.grupo_contabil, saldos[acc.id])
+            for acc in accounts if acc.grupo_contabil in BS_GROUPS
+        ]
+        return meses, contas, resultado
+
+    def _estrutura_tendencia(self):
+        """Linhas do balanço com saldo, AV% e AH% para cada um dos N meses.
+
+        Os saldos de fim de mês vêm de uma única consulta de posições, cada
+        uma partindo do último fechamento até o fim do mês (ver
+        ``_posicoes_por_conta``). Retorna ``(meses, linhas)``.
+        """
+        self.ensure_one()
+        currency = self.currency_id
+        precision = currency.rounding
+
+        fim = date(int(self.year_recent), int(self.month_recent), 1)
+        meses, contas, resultado = self._saldos_tendencia(fim, int(self.quantidade_meses))
+
+        zerado = lambda valores: all(float_is_zero(v, precision_rounding=precision) for v in valores)
+        somar = lambda listas: [sum(valores) for valores in zip(*listas)] if listas else [0.0] * len(meses)
+
+        grupos = {}
+        for conta_id, nome, grupo, valores in contas:
+            if self.show_zero_accounts or not zerado(valores):
+                grupos.setdefault(grupo, []).append((conta_id, nome, valores))
+        totais_grupo = {g: somar([valores for _id, _nome, valores in grupos.get(g, [])]) for g in BS_GROUPS}
+        if self.show_zero_accounts or not zerado(resultado):
+            totais_grupo['patrimonio'] = somar([totais_grupo['patrimonio'], resultado])
+        totais_secao = {
+            'ativo': somar([totais_grupo['circulante'], totais_grupo['nao_circulante']]),
+            'passivo_pl': somar([totais_grupo[g] for g in ('passivo_circulante', 'passivo_nao_circulante', 'patrimonio')]),
+        }
+
+        def ah(valores):
+            taxas = [False]
+            for indice in range(1, len(valores)):
+                anterior = valores[0] if self.ah_modo == 'base' else valores[indice - 1]
+                taxas.append(False if float_is_zero(anterior, precision_rounding=precision) else (valores[indice] - anterior) / anterior)
+            return taxas
+
+        linhas = []
+
+        def add(name, section, display_type, valores, group_key=False, conta_id=False):
+            total = totais_secao[section]
+            linhas.append({
+                'name': name,
+                'section': section,
+                'display_type': display_type,
+                'group_key': group_key,
+                'conta_id': conta_id,
+                'saldos': [currency.round(v) for v in valores],
+                'av': [0.0 if float_is_zero(t, precision_rounding=precision) else v / t for v, t in zip(valores, total)],
+                'ah': ah(valores),
+            })
+
+        for section, label, group_keys in (
+            ('ativo', 'ATIVO', ('circulante', 'nao_circulante')),
+            ('passivo_pl', 'PASSIVO + PL', ('passivo_circulante', 'passivo_nao_circulante', 'patrimonio')),
+        ):
+            add(label, section, 'section', totais_secao[section])
+            for group_key in group_keys:
+                if not self.show_zero_accounts and zerado(totais_grupo[group_key]):
+                    continue
+                add(GROUP_INFO[group_key]['label'], section, 'subtotal', totais_grupo[group_key], group_key)
+                for conta_id, nome, valores in grupos.get(group_key, []):
+                    add(nome, section, 'line', valores, group_key, conta_id)
+                if group_key == 'patrimonio' and (self.show_zero_accounts or not zerado(resultado)):
+                    add('Lucros/Prejuízos Acumulados', section, 'line', resultado, group_key)
+        return meses, linhas
+
+    @api.depends('modo', 'month_recent', 'year_recent', 'quantidade_meses', 'ah_modo', 'show_zero_accounts', 'currency_id')
+    def _compute_tendencia(self):
+        nomes = dict(MONTH_SELECTION)
+        for wizard in self:
+            wizard.tendencia_html = False
+            if wizard.modo != 'tendencia' or not wizard.month_recent or not wizard.year_recent:
+                continue
+            meses, linhas = wizard._estrutura_tendencia()
+            cabecalho = Markup().join(
+                Markup('<th class="text-end">%s</th><th class="text-end">AV%%</th><th class="text-end">AH%%</th>')
+                % f"{nomes[str(mes.month)][:3]}/{mes.year}"
+                for mes in meses
+            )
+            corpo = Markup().join(
+                Markup('<tr class="%s"><td>%s</td>%s</tr>') % (
+                    'fw-bold' if linha['display_type'] != 'line' else '',
+                    linha['name'],
+                    Markup().join(
+                        Markup('<td class="text-end">%s</td><td class="text-end">%s</td><td class="text-end">%s</td>') % (
+                            f"{saldo:,.2f}", f"{av:.1%}", '' if ah is False else f"{ah:.1%}",
+                        )
+                        for saldo, av, ah in zip(linha['saldos'], linha['av'], linha['ah'])
+                    ),
+                )
+                for linha in linhas
+            )
+            wizard.tendencia_html = Markup(
+                '<table class="table table-sm o_list_table"><thead><tr><th>Conta</th>%s</tr></thead>'
+                '<tbody>%s</tbody></table>'
+            ) % (cabecalho, corpo)
+
+    def action_abrir_tendencia(self):
+        """Grava as células da tendência (conta x mês) e abre a análise em gráfico/pivô."""
+        self.ensure_one()
+        meses, linhas = self._estrutura_tendencia()
+        self.tendencia_ids.unlink()
+        self.env['contabilidade.balanco.patrimonial.tendencia'].create([
+            {
+                'wizard_id': self.id,
+                'sequence': sequencia,
+                'name': linha['name'],
+                'section': linha['section'],
+                'display_type': linha['display_type'],
+                'group_key': linha['group_key'],
+                'conta_id': linha['conta_id'],
+                'periodo': mes,
+                'currency_id': self.currency_id.id,
+                'saldo': saldo,
+                'av_percent': av,
+                'ah_percent': ah,
+            }
+            for sequencia, linha in enumerate(linhas, start=1)
+            # só as contas: os totais de grupo e seção saem do agrupamento do pivô
+            if linha['display_type'] == 'line'
+            for mes, saldo, av, ah in zip(meses, linha['saldos'], linha['av'], linha['ah'])
+        ])
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Tendência do Balanço Patrimonial',
+            'res_model': 'contabilidade.balanco.patrimonial.tendencia',
+            'view_mode': 'graph,pivot,tree',
+            'domain': [('wizard_id', '=', self.id)],
+            'target': 'current',
+        }
 
 
 class ContabilidadeBalancoPatrimonialLine(models.TransientModel):
     _name = 'contabilidade.balanco.patrimonial.line'
+    _inherit = ['contabilidade.escopo.mixin']
     _description = 'Linha do Balanço Patrimonial (AV/AH)'
     _order = 'section, sequence, id'
 
@@ -461,3 +669,22 @@ class ContabilidadeBalancoPatrimonialLine(models.TransientModel):
         ('patrimonio', 'Patrimônio Líquido'),
     ], string='Tipo')
 
+
+
+class ContabilidadeBalancoPatrimonialTendencia(models.TransientModel):
+    _name = 'contabilidade.balanco.patrimonial.tendencia'
+    _description = 'Célula da tendência do Balanço Patrimonial (linha x mês)'
+    _order = 'sequence, periodo'
+
+    wizard_id      = fields.Many2one('contabilidade.balanco.patrimonial.wizard', ondelete='cascade', index=True)
+    sequence       = fields.Integer(default=10)
+    name           = fields.Char(string='Conta', required=True)
+    section        = fields.Selection([('ativo', 'Ativo'),('passivo_pl', 'Passivo + PL')], string='Section', required=True)
+    display_type   = fields.Selection([('line', 'Line'),('section', 'Section header'),('subtotal', 'Subtotal')], string='Display Type', default='line')
+    group_key      = fields.Selection(selection=[(g, GROUP_INFO[g]['label']) for g in BS_GROUPS], string='Tipo')
+    conta_id       = fields.Many2one('contabilidade.contas', string='Account')
+    periodo        = fields.Date(string='Mês')
+    currency_id    = fields.Many2one('res.currency', string='Currency', required=True)
+    saldo          = fields.Monetary(string='Saldo', currency_field='currency_id')
+    av_percent     = fields.Float(string='AV%', group_operator=False)
+    ah_percent     = fields.Float(string='AH%', group_operator=False)
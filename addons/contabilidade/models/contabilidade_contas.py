@@ -1,15 +1,98 @@
-from odoo import models, fields
+import re
+from collections import defaultdict
+from datetime import date
+
+from odoo import api, models, fields
+from odoo.exceptions import ValidationError
+from odoo.osv import expression
+from odoo.tools.sql import create_index, create_unique_index
+
+from .contabilidade_escopo import USUARIO_COMPARTILHADO, escopo_usuario
+
+# Regras da classificação da DRE, avaliadas em ordem sobre o nome da conta;
+# a primeira que casar define a classificação.
+REGRAS_DRE = [
+    ('irpj_csll', re.compile(r'\b(irpj|csll)\b', re.IGNORECASE)),
+    ('imposto_venda', re.compile(r'\b(icms|pis|cofins|iss)\b', re.IGNORECASE)),
+    ('devolucao', re.compile(r'\bdevol', re.IGNORECASE)),
+    ('custo', re.compile(r'\b(cmv|cpv|csv)\b', re.IGNORECASE)),
+    ('receita_financeira', re.compile(r'\breceitas? financ', re.IGNORECASE)),
+    ('despesa_financeira', re.compile(r'\bdespesas? financ', re.IGNORECASE)),
+]
+
+# Códigos gerados: "<prefixo do grupo>.<subgrupo>.<número>"
+PREFIXOS_CODIGO = {
+    'circulante': '1',
+    'nao_circulante': '2',
+    'passivo_circulante': '3',
+    'passivo_nao_circulante': '4',
+    'patrimonio': '5',
+    'despesa': '6',
+    'receitas': '7',
+    'apuracao': '8',
+}
+SUBGRUPO_CODIGO = {
+    'realizavel': '0',
+    'investimentos': '1',
+    'imobilizado': '2',
+    'intangivel': '3',
+}
+
+# Nó sintético padrão de cada grupo (e subgrupo do não circulante), pelo xmlid
+NOS_PADRAO = {
+    'circulante': 'no_ativo_circulante',
+    'nao_circulante': 'no_ativo_nao_circulante',
+    'passivo_circulante': 'no_passivo_circulante',
+    'passivo_nao_circulante': 'no_passivo_nao_circulante',
+    'patrimonio': 'no_patrimonio',
+    'despesa': 'no_despesas',
+    'receitas': 'no_receitas',
+    'apuracao': 'no_apuracao',
+}
+NOS_SUBGRUPO = {
+    'realizavel': 'no_realizavel_lp',
+    'investimentos': 'no_investimentos',
+    'imobilizado': 'no_imobilizado',
+    'intangivel': 'no_intangivel',
+}
+# Nó do ativo circulante pelo nome da conta, avaliado em ordem (mesmos termos
+# da antiga heurística dos Indicadores); sem regra que case, vale o nó do grupo
+REGRAS_NO_CIRCULANTE = [
+    ('no_disponivel', re.compile(r'caixa|banco|disponi|aplic', re.IGNORECASE)),
+    ('no_estoques', re.compile(r'estoque|mercadoria', re.IGNORECASE)),
+]
+
+# Texto digitado que é início de código ("1", "1.0.", "2.3.1")
+CODIGO_PREFIXO = re.compile(r'^[0-9]+(\.[0-9]*)*$')
+
+# Contas usadas por último que sobem para o topo da busca
+CONTAS_RECENTES = 20
+
 
 class ContabilidadeContas(models.Model):
     _name = "contabilidade.contas"
+    _inherit = ["contabilidade.escopo.mixin"]
     _description = "Contabilidade Contas"
+    _parent_name = "parent_id"
+    _parent_store = True
 
-    name = fields.Char(string="Conta + Código", required=True)
-    conta = fields.Char(string="Conta", required=True)
-    codigo = fields.Char(string="Código", readonly=True)
+    # índices trigrama: o ilike da busca por nome (a cada tecla no Livro
+    # Diário) não varre a tabela inteira
+    name = fields.Char(string="Conta + Código", required=True, compute='_compute_name', store=True, precompute=True,
+                       index='trigram')
+    conta = fields.Char(string="Conta", required=True, index='trigram')
+    codigo = fields.Char(string="Código", readonly=True, index='trigram')
     descricao = fields.Text(string="Descrição")
     user_id = fields.Many2one('res.users', string="Usuário", default=lambda self: self.env.user)
 
+    # Plano de contas hierárquico: as contas sintéticas só agrupam, e o total de
+    # qualquer nó sai de uma consulta pelo prefixo do parent_path.
+    parent_id = fields.Many2one('contabilidade.contas', string="Conta Superior", index=True, ondelete='restrict',
+                                domain=[('sintetica', '=', True)])
+    child_ids = fields.One2many('contabilidade.contas', 'parent_id', string="Subcontas")
+    parent_path = fields.Char(unaccent=False)
+    sintetica = fields.Boolean(string="Sintética", help="Conta de agrupamento: não recebe lançamentos, só totaliza as subcontas.")
+
     grupo_contabil = fields.Selection([
         ('circulante', 'Ativo Circulante'),
         ('nao_circulante', 'Ativo Não Circulante'),
@@ -28,62 +111,241 @@ class ContabilidadeContas(models.Model):
         ('intangivel', 'Intangível'),
     ], string="Subgrupo")
 
+    classificacao_dre = fields.Selection([
+        ('receita', 'Receita'),
+        ('imposto_venda', 'Impostos sobre Venda'),
+        ('devolucao', 'Devoluções'),
+        ('custo', 'Custo (CMV / CPV / CSV)'),
+        ('despesa_operacional', 'Despesa Operacional'),
+        ('receita_financeira', 'Receita Financeira'),
+        ('despesa_financeira', 'Despesa Financeira'),
+        ('irpj_csll', 'IRPJ / CSLL'),
+    ], string="Classificação DRE", compute='_compute_classificacao_dre', store=True, index=True)
+
+    def init(self):
+        # LIKE 'prefixo%' no parent_path usa o índice independente da collation
+        create_index(self._cr, 'contabilidade_contas_parent_path_idx', self._table, ['parent_path text_pattern_ops'])
+        # idem para a busca por início de código
+        create_index(self._cr, 'contabilidade_contas_codigo_prefixo_idx', self._table, ['codigo text_pattern_ops'])
+        # regra de acesso + ordem por código
+        create_index(self._cr, 'contabilidade_contas_escopo_codigo_idx', self._table, ['escopo', 'codigo'])
+
+    @api.constrains('parent_id')
+    def _check_parent_id(self):
+        if self._has_cycle():
+            raise ValidationError("Uma conta não pode ser superior a ela mesma.")
+
+    @api.model
+    def _conta_pai_padrao(self, grupo, subgrupo=False, nome=False):
+        """Nó sintético padrão para uma conta do grupo/subgrupo e nome informados."""
+        xmlid = grupo == 'nao_circulante' and NOS_SUBGRUPO.get(subgrupo) or NOS_PADRAO.get(grupo)
+        if grupo == 'circulante' and nome:
+            # caixa, bancos e estoques entram nos nós lidos pelas liquidezes imediata e seca
+            xmlid = next((no for no, regra in REGRAS_NO_CIRCULANTE if regra.search(nome)), xmlid)
+        return xmlid and self.env.ref(f'contabilidade.{xmlid}', raise_if_not_found=False) or self.browse()
+
+    @api.model
+    def _prefixo_codigo(self, grupo, subgrupo=False):
+        """Prefixo "grupo.subgrupo" dos códigos gerados para o grupo/subgrupo informado."""
+        meio = SUBGRUPO_CODIGO.get(subgrupo, '0') if grupo == 'nao_circulante' else '0'
+        return f"{PREFIXOS_CODIGO[grupo]}.{meio}"
+
+    @api.model
+    def _atribuir_pais(self):
+        """Pendura no nó padrão do grupo as contas analíticas ainda sem conta superior."""
+        contas = self.sudo().with_context(active_test=False).search([('parent_id', '=', False), ('sintetica', '=', False)])
+        for pai, grupo_contas in contas.grouped(lambda c: self._conta_pai_padrao(c.grupo_contabil, c.subgrupo1, c.conta)).items():
+            if pai:
+                grupo_contas.write({'parent_id': pai.id})
+
+    @api.model
+    def _name_search(self, name, domain=None, operator='ilike', limit=None, order=None):
+        """Busca das contas nos campos Many2one.
+
+        Um início de código ("1.0.") filtra pelo prefixo do código, em ordem de
+        código; outro texto, pelo nome. Em ambos os casos as contas que o
+        usuário usou por último nos lançamentos vêm primeiro.
+        """
+        if operator not in ('ilike', 'like', '=ilike', '=like'):
+            return super()._name_search(name, domain, operator, limit=limit, order=order)
+        filtro = []
+        if name and CODIGO_PREFIXO.match(name):
+            filtro = [('codigo', '=like', f'{name}%')]
+            order = 'codigo, id'
+        elif name:
+            filtro = [('name', operator, name)]
+        dominio = expression.AND([domain or [], filtro])
+
+        ids = []
+        recentes = self.env['contabilidade.contas.uso']._recentes()
+        if recentes:
+            encontradas = set(self.search(expression.AND([dominio, [('id', 'in', recentes)]])).ids)
+            ids = [conta_id for conta_id in recentes if conta_id in encontradas][:limit]
+        if limit is None or len(ids) < limit:
+            ids += self.search(
+                expression.AND([dominio, [('id', 'not in', ids)]]),
+                limit=limit and limit - len(ids), order=order,
+            ).ids
+        return ids
 
-    def create(self, vals):
-        if isinstance(vals, list):
-            vals = vals[0]
-
-        if not vals.get('codigo') and vals.get('grupo_contabil'):
-            prefixos = {
-                'circulante': '1',
-                'nao_circulante': '2',
-                'passivo_circulante': '3',
-                'passivo_nao_circulante': '4',
-                'patrimonio': '5',
-                'despesa': '6',
-                'receitas': '7',
-                'apuracao': '8',
-            }
-            prefixo = prefixos[vals['grupo_contabil']]
-
-            if vals['grupo_contabil'] == 'nao_circulante':
-                subgrupo_map = {
-                    'realizavel': '0',
-                    'investimentos': '1',
-                    'imobilizado': '2',
-                    'intangivel': '3',
-                }
-                meio = subgrupo_map.get(vals.get('subgrupo1'), '0')
-            else:
-                meio = '0'
-
-            domain = [('grupo_contabil', '=', vals['grupo_contabil'])]
-            if vals['grupo_contabil'] == 'nao_circulante' and vals.get('subgrupo1'):
-                domain.append(('subgrupo1', '=', vals['subgrupo1']))
-
-            ultima = self.search(domain, order='codigo desc', limit=1)
-
-            if ultima and ultima.codigo:
-                partes = ultima.codigo.split('.')
-                partes[-1] = str(int(partes[-1]) + 1)
-                novo_codigo = '.'.join(partes)
-            else:
-                novo_codigo = f"{prefixo}.{meio}.1"
-
-            vals['codigo'] = novo_codigo
-
-        conta_nome = vals.get('conta', '')
-        codigo_val = vals.get('codigo', '')
-        vals['name'] = f"{codigo_val} - {conta_nome}" if conta_nome else codigo_val
-
-        return super(ContabilidadeContas, self).create(vals)
+    @api.depends('conta', 'grupo_contabil', 'sintetica')
+    def _compute_classificacao_dre(self):
+        for conta in self:
+            # só contas de resultado entram na DRE
+            if conta.sintetica or conta.grupo_contabil not in ('receitas', 'despesa'):
+                conta.classificacao_dre = False
+                continue
+            classificacao = 'receita' if conta.grupo_contabil == 'receitas' else 'despesa_operacional'
+            for valor, regra in REGRAS_DRE:
+                if regra.search(conta.conta or ''):
+                    classificacao = valor
+                    break
+            conta.classificacao_dre = classificacao
+
+
+    @api.depends('codigo', 'conta')
+    def _compute_name(self):
+        for conta in self:
+            conta.name = f"{conta.codigo or ''} - {conta.conta}" if conta.conta else conta.codigo
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        # contas sem código, agrupadas pelo prefixo "grupo.subgrupo" e pelo dono
+        pendentes = defaultdict(list)
+        for vals in vals_list:
+            grupo = vals.get('grupo_contabil')
+            if not vals.get('codigo') and grupo and not vals.get('sintetica'):
+                user_id = vals['user_id'] if 'user_id' in vals else self.env.uid
+                pendentes[(user_id or None, self._prefixo_codigo(grupo, vals.get('subgrupo1')))].append(vals)
+
+            if not vals.get('parent_id') and not vals.get('sintetica') and grupo:
+                vals['parent_id'] = self._conta_pai_padrao(grupo, vals.get('subgrupo1'), vals.get('conta')).id
+
+        Sequencia = self.env['contabilidade.contas.sequencia']
+        for (user_id, prefixo), grupo_vals in pendentes.items():
+            ultimo = Sequencia._reservar(user_id, prefixo, len(grupo_vals))
+            for numero, vals in enumerate(grupo_vals, start=ultimo - len(grupo_vals) + 1):
+                vals['codigo'] = f"{prefixo}.{numero}"
+
+        self.env['contabilidade.report.engine']._limpar_memoria()
+        return super(ContabilidadeContas, self).create(vals_list)
 
 
     def write(self, vals):
-        if 'codigo' in vals or 'conta' in vals:
-            conta_nome = vals.get('conta', self.conta)
-            codigo_val = vals.get('codigo', self.codigo)
-            vals['name'] = f"{codigo_val} - {conta_nome}" if conta_nome else codigo_val
-        return super(ContabilidadeContas, self).write(vals)
+        res = super(ContabilidadeContas, self).write(vals)
+        self.env['contabilidade.report.engine']._limpar_memoria()
+        if 'parent_id' in vals:
+            # os totais por nó mudam em todos os meses
+            self.env['contabilidade.indicador.mensal']._invalidar({None: date.min})
+            self.env['contabilidade.diario.versao']._incrementar()
+        return res
+
+
+class ContabilidadeContasSequencia(models.Model):
+    _name = "contabilidade.contas.sequencia"
+    _description = "Último código gerado por prefixo de conta"
+
+    # Um contador por (escopo da conta, prefixo "grupo.subgrupo"): as contas
+    # sem dono e as do usuário 1 são compartilhadas e usam o mesmo contador,
+    # o de ``user_id`` vazio. O upsert que reserva os números trava a linha até
+    # o fim da transação: criações simultâneas no mesmo prefixo esperam uma
+    # pela outra e nunca repetem código.
+    user_id = fields.Many2one('res.users', string="Usuário", readonly=True, ondelete='cascade')
+    prefixo = fields.Char(string="Prefixo", required=True, readonly=True)
+    ultimo = fields.Integer(string="Último número", readonly=True)
+
+    def init(self):
+        create_unique_index(
+            self._cr, 'contabilidade_contas_sequencia_chave_uniq', self._table, ['(COALESCE(user_id, 0))', 'prefixo'],
+        )
+        # contadores do usuário 1 gravados antes da chave por escopo
+        self._cr.execute("""
+            WITH removidos AS (
+                DELETE FROM contabilidade_contas_sequencia WHERE user_id = %s RETURNING prefixo, ultimo
+            )
+            INSERT INTO contabilidade_contas_sequencia AS s (user_id, prefixo, ultimo)
+            SELECT NULL, prefixo, ultimo FROM removidos
+            ON CONFLICT ((COALESCE(user_id, 0)), prefixo) DO UPDATE
+               SET ultimo = GREATEST(s.ultimo, EXCLUDED.ultimo)
+        """, [USUARIO_COMPARTILHADO])
+
+    @api.model
+    def _reservar(self, user_id, prefixo, quantidade):
+        """Reserva ``quantidade`` números seguidos no prefixo e retorna o último.
+
+        O contador nunca fica abaixo do maior número já usado no prefixo entre
+        as contas visíveis ao usuário (comparação numérica, não textual), então
+        contas importadas com código explícito também são respeitadas.
+        """
+        escopo = escopo_usuario(user_id)
+        self.env['contabilidade.contas'].flush_model(['codigo', 'escopo'])
+        self.env.cr.execute("""
+            INSERT INTO contabilidade_contas_sequencia AS s
+                   (user_id, prefixo, ultimo, create_uid, create_date, write_uid, write_date)
+            SELECT %s, %s, COALESCE(MAX(substring(c.codigo FROM '([0-9]+)$')::int), 0) + %s,
+                   %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+              FROM contabilidade_contas c
+             WHERE c.codigo ~ %s
+               AND c.escopo IN (0, %s)
+            ON CONFLICT ((COALESCE(user_id, 0)), prefixo) DO UPDATE
+               SET ultimo = GREATEST(s.ultimo, EXCLUDED.ultimo - %s) + %s,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+            RETURNING ultimo
+        """, [
+            escopo or None, prefixo, quantidade, self.env.uid, self.env.uid,
+            '^' + re.escape(prefixo + '.') + '[0-9]+$', escopo, quantidade, quantidade,
+        ])
+        self.invalidate_model(['ultimo'])
+        return self.env.cr.fetchone()[0]
+
+
+class ContabilidadeContasUso(models.Model):
+    _name = "contabilidade.contas.uso"
+    _description = "Último uso de cada conta por usuário"
+
+    # Uma linha por (usuário, conta), atualizada quando o usuário lança na
+    # conta; ordena a busca de contas pelas usadas mais recentemente.
+    user_id = fields.Many2one('res.users', string="Usuário", required=True, readonly=True, ondelete='cascade')
+    conta_id = fields.Many2one('contabilidade.contas', string="Conta", required=True, readonly=True, ondelete='cascade')
+    ultimo_uso = fields.Datetime(string="Último uso", readonly=True)
+
+    def init(self):
+        create_unique_index(self._cr, 'contabilidade_contas_uso_chave_uniq', self._table, ['user_id', 'conta_id'])
+        create_index(self._cr, 'contabilidade_contas_uso_recentes_idx', self._table, ['user_id', 'ultimo_uso DESC'])
+
+    @api.model
+    def _registrar_uso(self, conta_ids):
+        """Marca as contas como usadas agora pelo usuário atual.
 
+        Usa a hora do relógio, não a do início da transação: numa importação
+        longa, os últimos lançamentos contam como os mais recentes.
+        """
+        conta_ids = sorted(set(filter(None, conta_ids)))
+        if not conta_ids:
+            return
+        uid = self.env.uid
+        self.env.cr.execute(f"""
+            INSERT INTO contabilidade_contas_uso AS u
+                   (user_id, conta_id, ultimo_uso, create_uid, create_date, write_uid, write_date)
+            SELECT %s, c.conta_id, clock_timestamp() at time zone 'UTC',
+                   %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+              FROM (VALUES {", ".join(["(%s::int)"] * len(conta_ids))}) AS c(conta_id)
+            ON CONFLICT (user_id, conta_id) DO UPDATE
+               SET ultimo_uso = EXCLUDED.ultimo_uso,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+        """, [uid, uid, uid, *conta_ids])
+        self.invalidate_model(['ultimo_uso'])
 
+    @api.model
+    def _recentes(self):
+        """Ids das contas usadas por último pelo usuário atual, da mais recente."""
+        self.env.cr.execute("""
+            SELECT conta_id
+              FROM contabilidade_contas_uso
+             WHERE user_id = %s
+             ORDER BY ultimo_uso DESC, id DESC
+             LIMIT %s
+        """, [self.env.uid, CONTAS_RECENTES])
+        return [conta_id for conta_id, in self.env.cr.fetchall()]
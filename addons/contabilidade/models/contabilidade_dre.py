@@ -1,3 +1,6 @@
+from dateutil.relativedelta import relativedelta
+from markupsafe import Markup
+
 from odoo import api, fields, models, Command
 import datetime
 import calendar
@@ -18,6 +21,14 @@ MONTH_SELECTION = [
     ('12', 'Dezembro'),
 ]
 
+# Totais da DRE expostos como campos do assistente
+CAMPOS_VALORES = [
+    'total_receita', 'total_despesa', 'lucro_prejuizo',
+    'receita_bruta', 'impostos_sobre_venda', 'devolucoes', 'receita_liquida',
+    'custo_inicial', 'custo_atual', 'lucro_bruto', 'despesas_operacionais',
+    'resultado_antes_financeiro', 'receita_financeira', 'despesa_financeira', 'lucro_liquido',
+]
+
 
 class ContabilidadeDreWizard(models.TransientModel):
     _name = 'contabilidade.dre.wizard'
@@ -41,6 +52,12 @@ class ContabilidadeDreWizard(models.TransientModel):
         return [(str(i), str(i)) for i in range(2000, 2100)]
 
     show_zero_accounts = fields.Boolean(string='Mostrar contas zeradas', default=False)
+    modo = fields.Selection([
+        ('mes', 'Mês selecionado'),
+        ('colunas', 'Meses em colunas'),
+    ], string='Modo', required=True, default='mes')
+    quantidade_meses = fields.Integer(string='Meses', default=12, help="Quantidade de meses, terminando no mês selecionado.")
+    colunas_html = fields.Html(string='DRE por mês', compute='_compute_dre', sanitize=False)
     currency_id = fields.Many2one('res.currency', string='Currency', required=True, default=lambda self: self.env.company.currency_id)
 
     line_ids = fields.One2many('contabilidade.dre.line', 'wizard_id', string='Linhas', readonly=True, compute='_compute_dre')
@@ -67,219 +84,304 @@ class ContabilidadeDreWizard(models.TransientModel):
 
     lucro_liquido = fields.Monetary(string='Lucro Líquido', currency_field='currency_id', compute='_compute_dre')
 
-    @api.onchange('month', 'year', 'show_zero_accounts')
+    @api.onchange('month', 'year', 'show_zero_accounts', 'modo', 'quantidade_meses')
     def _onchange_filters(self):
         self._compute_dre()
         return None
 
-    @api.depends('month', 'year', 'show_zero_accounts', 'currency_id')
-    def _compute_dre(self):
-        Diario = self.env['contabilidade.livro.diario'].sudo()
+    def _classificar_contas(self):
+        """Contas de cada grupo da DRE, lidas numa única busca pela classificação armazenada
+        (memorizada na transação)."""
         Account = self.env['contabilidade.contas'].sudo()
+        ids = self.env['contabilidade.report.engine']._memorizar(
+            ('dre_contas',), [self.env.user.id], self._ids_classificados,
+        )
+        return {chave: Account.browse(conta_ids) for chave, conta_ids in ids.items()}
 
+    def _ids_classificados(self):
+        Account = self.env['contabilidade.contas'].sudo()
+        accounts = Account.search([
+            ('classificacao_dre', '!=', False),
+            *Account._dominio_escopo(),
+        ], order='codigo asc, conta asc, id asc')
+
+        contas = {chave: [] for chave in (
+            'receita', 'despesa', 'impostos_sobre_venda', 'devolucao', 'irpj_csll', 'cogs',
+            'receita_financeira', 'despesa_financeira', 'despesas_operacionais',
+        )}
+        buckets = {
+            'imposto_venda': 'impostos_sobre_venda',
+            'devolucao': 'devolucao',
+            'irpj_csll': 'irpj_csll',
+            'custo': 'cogs',
+            'receita_financeira': 'receita_financeira',
+            'despesa_financeira': 'despesa_financeira',
+            'despesa_operacional': 'despesas_operacionais',
+        }
+        for acc in accounts:
+            if acc.grupo_contabil == 'receitas':
+                contas['receita'].append(acc.id)
+            elif acc.grupo_contabil == 'despesa':
+                contas['despesa'].append(acc.id)
+            chave = buckets.get(acc.classificacao_dre)
+            if chave:
+                contas[chave].append(acc.id)
+        return contas
+
+    def _valores_dre(self, contas, debit_map, credit_map, debit_map_before, credit_map_before):
+        """Totais da DRE para uma coluna (um período) a partir dos mapas por conta."""
+        self.ensure_one()
+        rnd = self.currency_id.round
+
+        def devedor(accounts, debitos=debit_map, creditos=credit_map):
+            return sum(debitos.get(acc.id, 0.0) - creditos.get(acc.id, 0.0) for acc in accounts)
+
+        def credor(accounts):
+            return sum(credit_map.get(acc.id, 0.0) - debit_map.get(acc.id, 0.0) for acc in accounts)
+
+        total_receita = credor(contas['receita'])
+        total_despesa = devedor(contas['despesa'])
+        receita_bruta = sum(credit_map.get(acc.id, 0.0) for acc in contas['receita'])
+        impostos_sobre_venda = devedor(contas['impostos_sobre_venda'])
+        devolucoes = devedor(contas['devolucao'])
+        custo_atual = devedor(contas['cogs'])
+
+        v = {
+            'total_receita': rnd(total_receita),
+            'total_despesa': rnd(total_despesa),
+            'lucro_prejuizo': rnd(total_receita - total_despesa),
+            'receita_bruta': rnd(receita_bruta),
+            'impostos_sobre_venda': rnd(impostos_sobre_venda),
+            'devolucoes': rnd(devolucoes),
+            'receita_liquida': rnd(receita_bruta - impostos_sobre_venda - devolucoes),
+            'custo_inicial': rnd(devedor(contas['cogs'], debit_map_before, credit_map_before)),
+            'custo_atual': rnd(custo_atual),
+            'despesas_operacionais': rnd(devedor(contas['despesas_operacionais']) + devedor(contas['irpj_csll'])),
+            'receita_financeira': rnd(credor(contas['receita_financeira'])),
+            'despesa_financeira': rnd(devedor(contas['despesa_financeira'])),
+        }
+        v['lucro_bruto'] = rnd(v['receita_liquida'] - custo_atual)
+        v['resultado_antes_financeiro'] = rnd(v['lucro_bruto'] - v['despesas_operacionais'])
+        v['lucro_liquido'] = rnd(v['resultado_antes_financeiro'] + v['receita_financeira'] - v['despesa_financeira'])
+        return v
+
+    def _linhas_dre(self, contas, colunas):
+        """Layout da DRE, montado uma vez, com um valor por coluna em cada linha.
+
+        ``colunas`` é uma lista de ``(valores, debit_map, credit_map)``. Cada
+        linha traz também ``av``, a análise vertical (fração da receita
+        líquida) de cada coluna, calculada junto com os valores.
+        """
+        self.ensure_one()
+        rnd = self.currency_id.round
+        linhas = []
+        # análise vertical: cada valor sobre a receita líquida da sua coluna
+        bases = [valores['receita_liquida'] for valores, _debit_map, _credit_map in colunas]
+
+        def add(name, display_type, valores, conta_id=False):
+            linhas.append({
+                'name': name,
+                'display_type': display_type,
+                'conta_id': conta_id,
+                'valores': valores,
+                'av': [valor / base if base else 0.0 for valor, base in zip(valores, bases)],
+            })
+
+        def total(chave, sinal=1):
+            return [sinal * valores[chave] for valores, _debit_map, _credit_map in colunas]
+
+        def por_conta(accounts):
+            for acc in accounts:
+                vals = [credit_map.get(acc.id, 0.0) - debit_map.get(acc.id, 0.0) for _valores, debit_map, credit_map in colunas]
+                if not self.show_zero_accounts and all(abs(val) < 1e-12 for val in vals):
+                    continue
+                add(acc.name, 'line', [rnd(val) for val in vals], acc.id)
+
+        add('RECEITAS', 'section', total('receita_liquida'))
+        add('Receita Bruta', 'line', total('receita_bruta'))
+        add('(-) Impostos sobre Venda', 'line', total('impostos_sobre_venda', -1))
+        add('(-) Devoluções', 'line', total('devolucoes', -1))
+        add('TOTAL - Receita Líquida', 'subtotal', total('receita_liquida'))
+
+        add('(-) CUSTOS (CMV / CPV / CSV)', 'section', total('custo_atual', -1))
+        por_conta(contas['cogs'])
+        add('TOTAL CUSTOS', 'subtotal', total('custo_atual', -1))
+        add('LUCRO BRUTO', 'section', total('lucro_bruto'))
+
+        add('(-) DESPESAS OPERACIONAIS', 'section', total('despesas_operacionais', -1))
+        por_conta(contas['despesas_operacionais'])
+        add('TOTAL DESPESAS OPERACIONAIS', 'subtotal', total('despesas_operacionais', -1))
+
+        add('RESULTADO ANTES FINANCEIRO', 'section', total('resultado_antes_financeiro'))
+
+        if contas['receita_financeira']:
+            add('RECEITA FINANCEIRA', 'section', total('receita_financeira'))
+            por_conta(contas['receita_financeira'])
+
+        if contas['despesa_financeira']:
+            add('DESPESA FINANCEIRA', 'section', total('despesa_financeira', -1))
+            por_conta(contas['despesa_financeira'])
+
+        add('LUCRO LÍQUIDO', 'section', total('lucro_liquido'))
+        return linhas
+
+    def _colunas_mensais(self, contas, user_ids, date_to):
+        """Colunas dos ``quantidade_meses`` meses até ``date_to`` e a coluna acumulada no ano.
+
+        Uma única consulta agrupada por conta e mês alimenta todas as colunas;
+        o histórico anterior de cada mês (custo inicial) é o acumulado de
+        abertura somado mês a mês. Retorna ``(titulos, colunas)``.
+        """
+        self.ensure_one()
+        Engine = self.env['contabilidade.report.engine']
+        meses = [date_to.replace(day=1) - relativedelta(months=n) for n in reversed(range(max(self.quantidade_meses, 1)))]
+        inicio_ano = date_to.replace(month=1, day=1)
+        inicio = min(meses[0], inicio_ano)
+
+        por_mes = Engine._saldos_mes(user_ids, inicio, date_to)
+        debit_acum, credit_acum = Engine._saldos(user_ids, date_to=inicio - datetime.timedelta(days=1))
+
+        def somar(destino, origem):
+            for conta_id, valor in origem.items():
+                destino[conta_id] = destino.get(conta_id, 0.0) + valor
+
+        antes = {}
+        periodo = inicio
+        while periodo <= date_to:
+            antes[periodo] = (dict(debit_acum), dict(credit_acum))
+            debit_mes, credit_mes = por_mes.get(periodo, ({}, {}))
+            somar(debit_acum, debit_mes)
+            somar(credit_acum, credit_mes)
+            periodo += relativedelta(months=1)
+
+        nomes = dict(MONTH_SELECTION)
+        titulos = []
+        colunas = []
+        for mes in meses:
+            debit_map, credit_map = por_mes.get(mes, ({}, {}))
+            titulos.append(f"{nomes[str(mes.month)][:3]}/{mes.year}")
+            colunas.append((self._valores_dre(contas, debit_map, credit_map, *antes[mes]), debit_map, credit_map))
+
+        debit_ano, credit_ano = {}, {}
+        periodo = inicio_ano
+        while periodo <= date_to:
+            debit_mes, credit_mes = por_mes.get(periodo, ({}, {}))
+            somar(debit_ano, debit_mes)
+            somar(credit_ano, credit_mes)
+            periodo += relativedelta(months=1)
+        titulos.append(f"Acumulado {date_to.year}")
+        colunas.append((self._valores_dre(contas, debit_ano, credit_ano, *antes[inicio_ano]), debit_ano, credit_ano))
+        return titulos, colunas
+
+    def _coluna_mes(self, contas, user_ids, date_from, date_to):
+        """Coluna ``(valores, debit_map, credit_map)`` do mês selecionado."""
+        Engine = self.env['contabilidade.report.engine']
+        # totais do mês selecionado e de todo o histórico anterior
+        debit_map, credit_map = Engine._saldos(user_ids, date_from, date_to)
+        debit_map_before, credit_map_before = Engine._saldos(
+            user_ids, date_to=date_from - datetime.timedelta(days=1),
+        )
+        return (
+            self._valores_dre(contas, debit_map, credit_map, debit_map_before, credit_map_before),
+            debit_map, credit_map,
+        )
+
+    def _renderizar_colunas(self, titulos, linhas):
+        cabecalho = Markup().join(Markup('<th class="text-end">%s</th>') % titulo for titulo in titulos)
+        corpo = Markup().join(
+            Markup('<tr class="%s"><td>%s</td>%s</tr>') % (
+                'fw-bold' if linha['display_type'] != 'line' else '',
+                linha['name'],
+                Markup().join(
+                    Markup('<td class="text-end">%s <small class="text-muted">%s</small></td>') % (f"{valor:,.2f}", f"{av:.1%}")
+                    for valor, av in zip(linha['valores'], linha['av'])
+                ),
+            )
+            for linha in linhas
+        )
+        return Markup(
+            '<table class="table table-sm o_list_table"><thead><tr><th>Descrição</th>%s</tr></thead>'
+            '<tbody>%s</tbody></table>'
+        ) % (cabecalho, corpo)
+
+    def _colunas_dre(self):
+        """``(contas, titulos, colunas)`` da DRE do assistente, sem gravar nada.
+
+        No modo mês há uma só coluna; no modo colunas, uma por mês e a
+        acumulada no ano. As colunas ficam memorizadas na transação: contas
+        zeradas só refiltram as linhas.
+        """
+        self.ensure_one()
+        Engine = self.env['contabilidade.report.engine']
+        year_int = int(self.year)
+        month_int = int(self.month)
+        date_from = datetime.date(year_int, month_int, 1)
+        last_day = calendar.monthrange(year_int, month_int)[1]
+        date_to = datetime.date(year_int, month_int, last_day)
+        user_ids = [self.env.user.id]
+        contas = self._classificar_contas()
+
+        if self.modo == 'colunas':
+            titulos, colunas = Engine._memorizar(
+                ('dre_colunas', date_to, self.quantidade_meses, self.currency_id.id), user_ids,
+                lambda: self._colunas_mensais(contas, user_ids, date_to),
+            )
+            return contas, titulos, colunas
+        coluna = Engine._memorizar(
+            ('dre_mes', date_from, date_to, self.currency_id.id), user_ids,
+            lambda: self._coluna_mes(contas, user_ids, date_from, date_to),
+        )
+        nomes = dict(MONTH_SELECTION)
+        return contas, [f"{nomes[self.month][:3]}/{year_int}"], [coluna]
+
+    def _dados_api(self):
+        """DRE em estruturas simples (JSON): títulos, totais e linhas de cada coluna."""
+        self.ensure_one()
+        contas, titulos, colunas = self._colunas_dre()
+        return {
+            'titulos': titulos,
+            'totais': [{campo: valores[campo] for campo in CAMPOS_VALORES} for valores, _debit, _credit in colunas],
+            'linhas': [
+                {chave: linha[chave] for chave in ('name', 'display_type', 'conta_id', 'valores', 'av')}
+                for linha in self._linhas_dre(contas, colunas)
+            ],
+        }
+
+    @api.depends('month', 'year', 'show_zero_accounts', 'currency_id', 'modo', 'quantidade_meses')
+    def _compute_dre(self):
         for wiz in self:
             wiz.line_ids = [Command.clear()]
-
-            wiz.total_receita = 0.0
-            wiz.total_despesa = 0.0
-            wiz.lucro_prejuizo = 0.0
-            wiz.receita_bruta = 0.0
-            wiz.impostos_sobre_venda = 0.0
-            wiz.devolucoes = 0.0
-            wiz.receita_liquida = 0.0
-            wiz.custo_inicial = 0.0
-            wiz.custo_atual = 0.0
-            wiz.lucro_bruto = 0.0
-            wiz.despesas_operacionais = 0.0
-            wiz.resultado_antes_financeiro = 0.0
-            wiz.receita_financeira = 0.0
-            wiz.despesa_financeira = 0.0
-            wiz.lucro_liquido = 0.0
+            wiz.colunas_html = False
+            for campo in CAMPOS_VALORES:
+                wiz[campo] = 0.0
 
             if not wiz.month or not wiz.year:
                 continue
 
-            year_int = int(wiz.year)
-            month_int = int(wiz.month)
-            date_from = datetime.date(year_int, month_int, 1)
-            last_day = calendar.monthrange(year_int, month_int)[1]
-            date_to = datetime.date(year_int, month_int, last_day)
-
-            user_field = 'user_id' if 'user_id' in Diario._fields else 'create_uid'
-            domain_base = [(user_field, '=', self.env.user.id)]
-
-            moves = Diario.search([
-                *domain_base,
-                ('data', '>=', date_from),
-                ('data', '<=', date_to),
-            ])
-
-            moves_before = Diario.search([
-                *domain_base,
-                ('data', '<', date_from),
-            ])
-
-            debit_map = {}
-            credit_map = {}
-            debit_map_before = {}
-            credit_map_before = {}
-
-            for m in moves:
-                if m.conta_debito_id:
-                    debit_map[m.conta_debito_id.id] = debit_map.get(m.conta_debito_id.id, 0.0) + (m.valor or 0.0)
-                if m.conta_credito_id:
-                    credit_map[m.conta_credito_id.id] = credit_map.get(m.conta_credito_id.id, 0.0) + (m.valor or 0.0)
-
-            for m in moves_before:
-                if m.conta_debito_id:
-                    debit_map_before[m.conta_debito_id.id] = debit_map_before.get(m.conta_debito_id.id, 0.0) + (m.valor or 0.0)
-                if m.conta_credito_id:
-                    credit_map_before[m.conta_credito_id.id] = credit_map_before.get(m.conta_credito_id.id, 0.0) + (m.valor or 0.0)
-
-            receita_accounts = Account.search([
-                ('grupo_contabil', 'in', ['receita', 'receitas']),
-                '|', '|',
-                ('user_id', '=', self.env.user.id),
-                ('user_id', '=', False),
-                ('user_id', '=', 1),
-            ], order='codigo asc, conta asc, id asc')
-
-            despesa_accounts = Account.search([
-                ('grupo_contabil', 'in', ['despesa', 'despesas']),
-                '|', '|',
-                ('user_id', '=', self.env.user.id),
-                ('user_id', '=', False),
-                ('user_id', '=', 1),
-            ], order='codigo asc, conta asc, id asc')
-
-            total_receita = 0.0
-            total_despesa = 0.0
-
-            for acc in receita_accounts:
-                total_receita += (credit_map.get(acc.id, 0.0) - debit_map.get(acc.id, 0.0))
-
-            for acc in despesa_accounts:
-                total_despesa += (debit_map.get(acc.id, 0.0) - credit_map.get(acc.id, 0.0))
-
-            wiz.total_receita = wiz.currency_id.round(total_receita)
-            wiz.total_despesa = wiz.currency_id.round(total_despesa)
-            wiz.lucro_prejuizo = wiz.currency_id.round(total_receita - total_despesa)
-
-            receita_bruta_val = sum(credit_map.get(acc.id, 0.0) for acc in receita_accounts)
-
-            impostos_sobre_venda_accounts = Account.search([
-                ('conta', 'ilike', 'icms'), 
-                ('conta', 'ilike', 'pis'), 
-                ('conta', 'ilike', 'cofins'), 
-                ('conta', 'ilike', 'iss')
-            ])
-            impostos_sobre_venda_val = sum(credit_map.get(acc.id, 0.0) - debit_map.get(acc.id, 0.0) for acc in impostos_sobre_venda_accounts)
-
-            devolucao_accounts = Account.search([('conta', 'ilike', 'devol')])
-            devolucoes_val = sum(debit_map.get(acc.id, 0.0) - credit_map.get(acc.id, 0.0) for acc in devolucao_accounts)
-
-            irpj_csll_accounts = Account.search([
-                ('conta', 'ilike', 'irpj'),
-                ('conta', 'ilike', 'csll')
-            ])
-            despesa_irpj_val = sum(debit_map.get(acc.id, 0.0) - credit_map.get(acc.id, 0.0) for acc in irpj_csll_accounts)
-
-            wiz.receita_bruta = wiz.currency_id.round(receita_bruta_val)
-            wiz.impostos_sobre_venda = wiz.currency_id.round(impostos_sobre_venda_val)
-            wiz.devolucoes = wiz.currency_id.round(devolucoes_val)
-            wiz.receita_liquida = wiz.currency_id.round(receita_bruta_val - impostos_sobre_venda_val - devolucoes_val)
-
-            cogs_accounts = (
-                Account.search([('conta', 'ilike', 'cmv')])
-                + Account.search([('conta', 'ilike', 'cpv')])
-                + Account.search([('conta', 'ilike', 'csv')])
-            )
-            custo_inicial_val = sum(debit_map_before.get(acc.id, 0.0) - credit_map_before.get(acc.id, 0.0) for acc in cogs_accounts)
-            custo_atual_val = sum(debit_map.get(acc.id, 0.0) - credit_map.get(acc.id, 0.0) for acc in cogs_accounts)
-
-            receita_financeira_accounts = Account.search([('conta', 'ilike', 'receita financ')]) + Account.search([('conta', 'ilike', 'receita financeira')])
-            despesa_financeira_accounts = Account.search([('conta', 'ilike', 'despesa financ')]) + Account.search([('conta', 'ilike', 'despesa financeira')])
-
-            receita_financeira_val = sum(credit_map.get(acc.id, 0.0) - debit_map.get(acc.id, 0.0) for acc in receita_financeira_accounts)
-            despesa_financeira_val = sum(debit_map.get(acc.id, 0.0) - credit_map.get(acc.id, 0.0) for acc in despesa_financeira_accounts)
-
-            all_despesa_accounts = despesa_accounts
-            despesas_operacionais_accounts = [a for a in all_despesa_accounts if a.id not in [x.id for x in cogs_accounts + despesa_financeira_accounts]]
-            despesas_operacionais_val = sum(debit_map.get(acc.id, 0.0) - credit_map.get(acc.id, 0.0) for acc in despesas_operacionais_accounts)
-
-            despesas_operacionais_val += despesa_irpj_val
-            wiz.despesas_operacionais = wiz.currency_id.round(despesas_operacionais_val)
-
-            wiz.custo_inicial = wiz.currency_id.round(custo_inicial_val)
-            wiz.custo_atual = wiz.currency_id.round(custo_atual_val)
-            wiz.lucro_bruto = wiz.currency_id.round((wiz.receita_liquida or 0.0) - (custo_atual_val or 0.0))
-
-            wiz.resultado_antes_financeiro = wiz.currency_id.round(
-                (wiz.lucro_bruto or 0.0) - (wiz.despesas_operacionais or 0.0)
-            )
-
-            wiz.receita_financeira = wiz.currency_id.round(receita_financeira_val)
-            wiz.despesa_financeira = wiz.currency_id.round(despesa_financeira_val)
-
-            wiz.lucro_liquido = wiz.currency_id.round(
-                (wiz.resultado_antes_financeiro or 0.0) + (wiz.receita_financeira or 0.0) - (wiz.despesa_financeira or 0.0)
-            )
-
-            seq = 0
-            line_cmds = []
-
-            def add(values):
-                nonlocal seq
-                seq += 1
-                values.setdefault('sequence', seq)
-                values.setdefault('currency_id', wiz.currency_id.id)
-                line_cmds.append(Command.create(values))
-
-            add({'name': 'RECEITAS', 'display_type': 'section', 'valor': wiz.receita_liquida})
-            add({'name': 'Receita Bruta', 'display_type': 'line', 'valor': wiz.receita_bruta})
-            add({'name': '(-) Impostos sobre Venda', 'display_type': 'line', 'valor': -wiz.impostos_sobre_venda})
-            add({'name': '(-) Devoluções', 'display_type': 'line', 'valor': -wiz.devolucoes})
-            add({'name': 'TOTAL - Receita Líquida', 'display_type': 'subtotal', 'valor': wiz.receita_liquida})
-
-            add({'name': '(-) CUSTOS (CMV / CPV / CSV)', 'display_type': 'section', 'valor': -wiz.custo_atual})
-            for acc in cogs_accounts:
-                val = debit_map.get(acc.id, 0.0) - credit_map.get(acc.id, 0.0)
-                if not wiz.show_zero_accounts and abs(val) < 1e-12:
-                    continue
-                add({'conta_id': acc.id, 'name': acc.name, 'display_type': 'line', 'valor': wiz.currency_id.round(-val)})
-            add({'name': 'TOTAL CUSTOS', 'display_type': 'subtotal', 'valor': -wiz.custo_atual})
-            add({'name': 'LUCRO BRUTO', 'display_type': 'section', 'valor': wiz.lucro_bruto})
-
-            add({'name': '(-) DESPESAS OPERACIONAIS', 'display_type': 'section', 'valor': -wiz.despesas_operacionais})
-            for acc in despesas_operacionais_accounts:
-                val = debit_map.get(acc.id, 0.0) - credit_map.get(acc.id, 0.0)
-                if not wiz.show_zero_accounts and abs(val) < 1e-12:
-                    continue
-                add({'conta_id': acc.id, 'name': acc.name, 'display_type': 'line', 'valor': wiz.currency_id.round(-val)})
-            add({'name': 'TOTAL DESPESAS OPERACIONAIS', 'display_type': 'subtotal', 'valor': -wiz.despesas_operacionais})
-
-            add({'name': 'RESULTADO ANTES FINANCEIRO', 'display_type': 'section', 'valor': wiz.resultado_antes_financeiro})
-
-            if receita_financeira_accounts:
-                add({'name': 'RECEITA FINANCEIRA', 'display_type': 'section', 'valor': wiz.receita_financeira})
-                for acc in receita_financeira_accounts:
-                    val = credit_map.get(acc.id, 0.0) - debit_map.get(acc.id, 0.0)
-                    if not wiz.show_zero_accounts and abs(val) < 1e-12:
-                        continue
-                    add({'conta_id': acc.id, 'name': acc.name, 'display_type': 'line', 'valor': wiz.currency_id.round(val)})
-
-            if despesa_financeira_accounts:
-                add({'name': 'DESPESA FINANCEIRA', 'display_type': 'section', 'valor': -wiz.despesa_financeira})
-                for acc in despesa_financeira_accounts:
-                    val = debit_map.get(acc.id, 0.0) - credit_map.get(acc.id, 0.0)
-                    if not wiz.show_zero_accounts and abs(val) < 1e-12:
-                        continue
-                    add({'conta_id': acc.id, 'name': acc.name, 'display_type': 'line', 'valor': wiz.currency_id.round(-val)})
-
-            add({'name': 'LUCRO LÍQUIDO', 'display_type': 'section', 'valor': wiz.lucro_liquido})
-
-            wiz.line_ids = line_cmds
-
+            contas, titulos, colunas = wiz._colunas_dre()
+            if wiz.modo == 'colunas':
+                # o mês selecionado é a última coluna mensal
+                coluna = colunas[-2]
+                wiz.colunas_html = wiz._renderizar_colunas(titulos, wiz._linhas_dre(contas, colunas))
+            else:
+                coluna = colunas[0]
+
+            valores = coluna[0]
+            for campo in CAMPOS_VALORES:
+                wiz[campo] = valores[campo]
+
+            wiz.line_ids = [
+                Command.create({
+                    'sequence': seq,
+                    'currency_id': wiz.currency_id.id,
+                    'conta_id': linha['conta_id'],
+                    'name': linha['name'],
+                    'display_type': linha['display_type'],
+                    'valor': linha['valores'][0],
+                    'av_percent': linha['av'][0],
+                })
+                for seq, linha in enumerate(wiz._linhas_dre(contas, [coluna]), start=1)
+            ]
 
 
 class ContabilidadeDreLine(models.TransientModel):
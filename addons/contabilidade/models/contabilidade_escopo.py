@@ -0,0 +1,41 @@
+from odoo import api, fields, models
+
+# Linhas sem usuário ou do usuário 1 são compartilhadas com todos: o escopo
+# delas é 0, e o de qualquer outra linha é o próprio usuário.
+ESCOPO_COMPARTILHADO = 0
+USUARIO_COMPARTILHADO = 1
+
+
+def escopo_usuario(user_id):
+    """Escopo das linhas gravadas com ``user_id`` (id ou False)."""
+    if not user_id or user_id == USUARIO_COMPARTILHADO:
+        return ESCOPO_COMPARTILHADO
+    return user_id
+
+
+def sql_escopo(coluna):
+    """Expressão SQL equivalente a ``escopo_usuario`` sobre ``coluna``."""
+    return f"CASE WHEN {coluna} IS NULL OR {coluna} = {USUARIO_COMPARTILHADO} THEN {ESCOPO_COMPARTILHADO} ELSE {coluna} END"
+
+
+class ContabilidadeEscopoMixin(models.AbstractModel):
+    _name = 'contabilidade.escopo.mixin'
+    _description = 'Escopo (dono ou compartilhado) das linhas por usuário'
+
+    # As regras de acesso filtram por ``escopo IN (0, usuário)``: uma
+    # condição numa só coluna, atendida pelos índices que começam por ela,
+    # em vez do OR entre ``user_id = usuário``, ``IS NULL`` e ``= 1``.
+    escopo = fields.Integer(
+        string='Escopo', compute='_compute_escopo', store=True, precompute=True, readonly=True,
+        help="Usuário dono da linha; 0 = compartilhada com todos os usuários.",
+    )
+
+    @api.depends('user_id')
+    def _compute_escopo(self):
+        for registro in self:
+            registro.escopo = escopo_usuario(registro.user_id.id)
+
+    @api.model
+    def _dominio_escopo(self):
+        """Domínio das linhas visíveis ao usuário atual (próprias e compartilhadas)."""
+        return [('escopo', 'in', [ESCOPO_COMPARTILHADO, escopo_usuario(self.env.uid)])]
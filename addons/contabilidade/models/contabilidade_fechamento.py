@@ -0,0 +1,127 @@
+from odoo import api, fields, models
+from odoo.exceptions import UserError
+from odoo.tools.sql import create_index
+
+
+class ContabilidadeFechamento(models.Model):
+    _name = 'contabilidade.fechamento'
+    _description = 'Fechamento de Período'
+    _order = 'data desc, id desc'
+    _rec_name = 'data'
+
+    # Tudo até ``data`` (inclusive) fica bloqueado e os saldos acumulados por
+    # conta nessa data ficam congelados em ``saldo_ids``.
+    data = fields.Date(string='Fechado até', required=True)
+    user_id = fields.Many2one('res.users', string='Usuário', required=True, default=lambda self: self.env.user)
+    saldo_ids = fields.One2many('contabilidade.fechamento.saldo', 'fechamento_id', string='Saldos', readonly=True)
+
+    def init(self):
+        create_index(self._cr, 'contabilidade_fechamento_user_id_data_idx', self._table, ['user_id', 'data'])
+
+    @api.model
+    def _datas_bloqueio(self, user_ids):
+        """Data do último fechamento de cada usuário: ``{user_id: data}``."""
+        ids = tuple(uid for uid in user_ids if uid)
+        if not ids:
+            return {}
+        self.flush_model(['user_id', 'data'])
+        self.env.cr.execute("""
+            SELECT user_id, MAX(data)
+              FROM contabilidade_fechamento
+             WHERE user_id IN %s
+             GROUP BY user_id
+        """, [ids])
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def _ultimos_fechamentos(self, user_ids, data_limite=None):
+        """Último fechamento de cada usuário até ``data_limite``: ``{user_id: (id, data)}``."""
+        ids = tuple(uid for uid in user_ids if uid)
+        if not ids:
+            return {}
+        self.flush_model(['user_id', 'data'])
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (user_id) user_id, id, data
+              FROM contabilidade_fechamento
+             WHERE user_id IN %s AND (%s::date IS NULL OR data <= %s::date)
+             ORDER BY user_id, data DESC, id DESC
+        """, [ids, data_limite, data_limite])
+        return {user_id: (fechamento_id, data) for user_id, fechamento_id, data in self.env.cr.fetchall()}
+
+    @api.model
+    def _verificar_bloqueio(self, movimentos):
+        """Impede alterações em lançamentos de períodos fechados.
+
+        ``movimentos`` é um iterável de tuplas ``(user_id, data)``.
+        """
+        movimentos = [(user_id, data) for user_id, data in movimentos if user_id and data]
+        if not movimentos:
+            return
+        bloqueios = self.sudo()._datas_bloqueio({user_id for user_id, _data in movimentos})
+        for user_id, data in movimentos:
+            bloqueio = bloqueios.get(user_id)
+            if bloqueio and data <= bloqueio:
+                raise UserError(
+                    "O período até %s está fechado. Reabra o fechamento para alterar lançamentos de %s."
+                    % (bloqueio.strftime('%d/%m/%Y'), data.strftime('%d/%m/%Y'))
+                )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        Agregacao = self.env['contabilidade.agregacao']
+        snapshots = []
+        for vals in vals_list:
+            user_id = vals.get('user_id') or self.env.uid
+            data = fields.Date.to_date(vals['data'])
+            ultimo = self.sudo()._datas_bloqueio([user_id]).get(user_id)
+            if ultimo and data <= ultimo:
+                raise UserError(
+                    "Já existe um fechamento em %s. O novo fechamento deve ser posterior ao último."
+                    % ultimo.strftime('%d/%m/%Y')
+                )
+            # saldos acumulados até a data, partindo do fechamento anterior
+            debit_map, credit_map = Agregacao._mapas_por_conta([user_id], date_to=data)
+            snapshots.append([
+                {'conta_id': conta_id, 'debito': debit_map.get(conta_id, 0.0), 'credito': credit_map.get(conta_id, 0.0)}
+                for conta_id in sorted(set(debit_map) | set(credit_map))
+            ])
+        fechamentos = super().create(vals_list)
+
+        # os usuários só leem os saldos congelados: a gravação é do próprio fechamento
+        self.env['contabilidade.fechamento.saldo'].sudo().create([
+            dict(saldo, fechamento_id=fechamento.id)
+            for fechamento, saldos in zip(fechamentos, snapshots)
+            for saldo in saldos
+        ])
+        return fechamentos
+
+    def write(self, vals):
+        if {'data', 'user_id', 'saldo_ids'}.intersection(vals):
+            raise UserError("Um fechamento não pode ser alterado; reabra-o e feche novamente.")
+        return super().write(vals)
+
+    def unlink(self):
+        for fechamento in self:
+            posterior = self.search([
+                ('user_id', '=', fechamento.user_id.id),
+                ('id', 'not in', self.ids),
+                ('data', '>', fechamento.data),
+            ], limit=1)
+            if posterior:
+                raise UserError("Apenas o último fechamento pode ser reaberto.")
+        return super().unlink()
+
+    def action_reabrir(self):
+        self.unlink()
+        return {'type': 'ir.actions.act_window_close'}
+
+
+class ContabilidadeFechamentoSaldo(models.Model):
+    _name = 'contabilidade.fechamento.saldo'
+    _description = 'Saldo congelado no fechamento'
+    _order = 'fechamento_id, conta_id'
+
+    fechamento_id = fields.Many2one('contabilidade.fechamento', string='Fechamento', required=True, ondelete='cascade', index=True)
+    conta_id = fields.Many2one('contabilidade.contas', string='Conta', required=True, ondelete='cascade')
+    debito = fields.Float(string='Débitos acumulados')
+    credito = fields.Float(string='Créditos acumulados')
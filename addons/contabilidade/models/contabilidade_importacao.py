@@ -0,0 +1,380 @@
+import csv
+import io
+from contextlib import contextmanager
+from datetime import datetime
+
+from odoo import api, fields, models
+from odoo.exceptions import UserError, ValidationError
+
+from .contabilidade_escopo import sql_escopo
+
+COLUNAS_CSV = ('data', 'descricao', 'conta_debito', 'conta_credito', 'valor')
+
+# Mensagens de erro guardadas no resultado; as demais só entram na contagem.
+MAX_ERROS_LOG = 200
+
+
+class ContabilidadeImportacaoWizard(models.TransientModel):
+    _name = 'contabilidade.importacao.wizard'
+    _description = 'Importação de lançamentos do Livro Diário (CSV/OFX)'
+
+    arquivo = fields.Binary(string='Arquivo', required=True, attachment=True)
+    nome_arquivo = fields.Char(string='Nome do arquivo')
+    formato = fields.Selection([('csv', 'CSV'), ('ofx', 'OFX')], string='Formato', required=True, default='csv')
+    codificacao = fields.Selection([
+        ('utf-8-sig', 'UTF-8'),
+        ('cp1252', 'Windows-1252 / Latin-1'),
+    ], string='Codificação', required=True, default='utf-8-sig')
+    delimitador = fields.Char(string='Delimitador', size=1, default=';')
+
+    conta_banco_id = fields.Many2one(
+        'contabilidade.contas', string='Conta do Banco',
+        domain=[('sintetica', '=', False)],
+        help="OFX: conta debitada nas entradas e creditada nas saídas.",
+    )
+    conta_contrapartida_id = fields.Many2one(
+        'contabilidade.contas', string='Contrapartida',
+        domain=[('sintetica', '=', False)],
+        help="OFX: conta do outro lado de cada transação do extrato.",
+    )
+
+    tamanho_lote = fields.Integer(string='Tamanho do lote', default=1000)
+    usar_copy = fields.Boolean(
+        string='Carga rápida (COPY)',
+        help="Grava os lotes com COPY do PostgreSQL em vez do ORM. Indicado para arquivos muito grandes.",
+    )
+
+    state = fields.Selection([('rascunho', 'Rascunho'), ('concluido', 'Concluído')], default='rascunho')
+    total_importado = fields.Integer(string='Lançamentos importados', readonly=True)
+    total_erros = fields.Integer(string='Linhas com erro', readonly=True)
+    log_erros = fields.Text(string='Erros', readonly=True)
+
+    @api.onchange('nome_arquivo')
+    def _onchange_nome_arquivo(self):
+        if self.nome_arquivo and self.nome_arquivo.lower().endswith('.ofx'):
+            self.formato = 'ofx'
+
+    # -------------------------------------------------------------------------
+    # Leitura do arquivo
+    # -------------------------------------------------------------------------
+    @contextmanager
+    def _abrir_arquivo(self):
+        """Abre o arquivo enviado como texto, direto do filestore quando possível."""
+        self.ensure_one()
+        anexo = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'arquivo'),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        if not anexo:
+            raise UserError("Selecione um arquivo para importar.")
+
+        binario = open(anexo._full_path(anexo.store_fname), 'rb') if anexo.store_fname else io.BytesIO(anexo.raw)
+        texto = io.TextIOWrapper(binario, encoding=self.codificacao, errors='replace', newline='')
+        try:
+            yield texto
+        finally:
+            texto.close()
+
+    def _linhas_csv(self, arquivo):
+        leitor = csv.DictReader(arquivo, delimiter=self.delimitador or ';')
+        cabecalho = [(coluna or '').strip().lower() for coluna in (leitor.fieldnames or [])]
+        faltando = [coluna for coluna in COLUNAS_CSV if coluna not in cabecalho]
+        if faltando:
+            raise UserError("Colunas obrigatórias ausentes no CSV: %s" % ", ".join(faltando))
+        leitor.fieldnames = cabecalho
+        for linha in leitor:
+            # numeração do arquivo: cabeçalho é a linha 1
+            yield leitor.line_num, {
+                'data': linha['data'],
+                'descricao': linha['descricao'],
+                'conta_debito': linha['conta_debito'],
+                'conta_credito': linha['conta_credito'],
+                'valor': linha['valor'],
+            }
+
+    @staticmethod
+    def _tokens_ofx(arquivo, tamanho_bloco=65536):
+        """Divide o OFX (SGML ou XML) em tokens ``TAG>valor``, lendo em blocos."""
+        resto = ''
+        while True:
+            bloco = arquivo.read(tamanho_bloco)
+            if not bloco:
+                break
+            partes = (resto + bloco).split('<')
+            resto = partes.pop()
+            yield from partes
+        if resto:
+            yield resto
+
+    def _linhas_ofx(self, arquivo):
+        if not self.conta_banco_id or not self.conta_contrapartida_id:
+            raise UserError("Informe a conta do banco e a contrapartida para importar um OFX.")
+        banco = self.conta_banco_id.codigo
+        contrapartida = self.conta_contrapartida_id.codigo
+
+        numero = 0
+        transacao = None
+        for token in self._tokens_ofx(arquivo):
+            tag, _sep, valor = token.partition('>')
+            tag = tag.strip().upper()
+            valor = valor.strip()
+            if tag == 'STMTTRN':
+                numero += 1
+                transacao = {}
+            elif tag == '/STMTTRN' and transacao is not None:
+                quantia = transacao.get('TRNAMT', '')
+                saida = quantia.startswith('-')
+                yield numero, {
+                    'data': transacao.get('DTPOSTED', '')[:8],
+                    'descricao': transacao.get('MEMO') or transacao.get('NAME') or transacao.get('FITID') or 'Extrato',
+                    'conta_debito': contrapartida if saida else banco,
+                    'conta_credito': banco if saida else contrapartida,
+                    'valor': quantia.lstrip('-+'),
+                }
+                transacao = None
+            elif transacao is not None and tag and not tag.startswith('/'):
+                transacao[tag] = valor
+
+    # -------------------------------------------------------------------------
+    # Conversão
+    # -------------------------------------------------------------------------
+    def _mapa_contas(self):
+        """Código -> id das contas visíveis; as contas do usuário têm prioridade."""
+        contas = {}
+        for conta in self.env['contabilidade.contas'].search_read([('codigo', '!=', False), ('sintetica', '=', False)], ['codigo', 'user_id'], order='id'):
+            if conta['user_id'] and conta['user_id'][0] == self.env.uid:
+                contas[conta['codigo']] = conta['id']
+            else:
+                contas.setdefault(conta['codigo'], conta['id'])
+        return contas
+
+    @staticmethod
+    def _converter_data(texto):
+        texto = (texto or '').strip()
+        for formato in ('%Y-%m-%d', '%d/%m/%Y', '%Y%m%d'):
+            try:
+                return datetime.strptime(texto, formato).date()
+            except ValueError:
+                continue
+        raise ValueError("data inválida '%s'" % texto)
+
+    @staticmethod
+    def _converter_valor(texto):
+        texto = (texto or '').strip().replace('R$', '').replace(' ', '')
+        if ',' in texto:
+            texto = texto.replace('.', '').replace(',', '.')
+        try:
+            valor = float(texto)
+        except ValueError:
+            raise ValueError("valor inválido '%s'" % texto)
+        if valor <= 0:
+            raise ValueError("valor deve ser positivo")
+        return valor
+
+    def _converter_linha(self, linha, contas, currency_id):
+        codigo_debito = (linha['conta_debito'] or '').strip()
+        codigo_credito = (linha['conta_credito'] or '').strip()
+        if codigo_debito not in contas:
+            raise ValueError("conta de débito '%s' não encontrada" % codigo_debito)
+        if codigo_credito not in contas:
+            raise ValueError("conta de crédito '%s' não encontrada" % codigo_credito)
+        descricao = (linha['descricao'] or '').strip()
+        if not descricao:
+            raise ValueError("descrição vazia")
+        return {
+            'data': self._converter_data(linha['data']),
+            'descricao': descricao,
+            'conta_debito_id': contas[codigo_debito],
+            'conta_credito_id': contas[codigo_credito],
+            'valor': self._converter_valor(linha['valor']),
+            'currency_id': currency_id,
+            'user_id': self.env.uid,
+        }
+
+    # -------------------------------------------------------------------------
+    # Gravação
+    # -------------------------------------------------------------------------
+    def _inserir_lote(self, lote, erros):
+        """Grava um lote de ``(numero, vals)``; retorna quantos foram gravados."""
+        if self.usar_copy:
+            try:
+                with self.env.cr.savepoint():
+                    self._copiar_lote(lote)
+                return len(lote)
+            except Exception:
+                # lote recusado (ex.: período fechado): o ORM isola as linhas com erro
+                pass
+
+        Diario = self.env['contabilidade.livro.diario']
+        try:
+            with self.env.cr.savepoint():
+                Diario.create([vals for _numero, vals in lote])
+            return len(lote)
+        except Exception:
+            pass
+
+        # algum registro falhou: grava um a um para isolar as linhas com erro
+        gravados = 0
+        for numero, vals in lote:
+            try:
+                with self.env.cr.savepoint():
+                    Diario.create(vals)
+                gravados += 1
+            except Exception as erro:
+                erros.append((numero, str(erro)))
+        return gravados
+
+    def _copiar_lote(self, lote):
+        """Grava o lote com COPY numa tabela temporária e um único INSERT dos lançamentos e partidas."""
+        # o COPY não passa pelo create(): verifica aqui o bloqueio de período e
+        # se as contas são analíticas e visíveis pelas regras do usuário
+        self.env['contabilidade.fechamento']._verificar_bloqueio(
+            (vals['user_id'], vals['data']) for _numero, vals in lote
+        )
+        conta_ids = {
+            conta_id for _numero, vals in lote for conta_id in (vals['conta_debito_id'], vals['conta_credito_id'])
+        }
+        validas = self.env['contabilidade.contas'].search_count([('id', 'in', list(conta_ids)), ('sintetica', '=', False)])
+        if validas != len(conta_ids):
+            raise ValidationError("O lote tem contas sintéticas ou inacessíveis ao usuário.")
+        cr = self.env.cr
+        cr.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS contabilidade_importacao_tmp (
+                data date,
+                descricao varchar,
+                conta_debito_id int,
+                conta_credito_id int,
+                valor float8,
+                currency_id int,
+                user_id int
+            ) ON COMMIT DROP
+        """)
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for _numero, vals in lote:
+            escritor.writerow([
+                vals['data'].isoformat(), vals['descricao'], vals['conta_debito_id'],
+                vals['conta_credito_id'], vals['valor'], vals['currency_id'], vals['user_id'],
+            ])
+        buffer.seek(0)
+        cr.copy_expert("COPY contabilidade_importacao_tmp FROM STDIN WITH (FORMAT csv)", buffer)
+        cr.execute(f"""
+            WITH novos AS (
+                INSERT INTO contabilidade_livro_diario
+                       (data, descricao, tipo, conta_debito_id, conta_credito_id, valor, currency_id, user_id, escopo,
+                        create_uid, create_date, write_uid, write_date)
+                SELECT data, descricao, 'simples', conta_debito_id, conta_credito_id, valor, currency_id, user_id,
+                       {sql_escopo('user_id')},
+                       %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+                  FROM contabilidade_importacao_tmp
+             RETURNING id, data, user_id, escopo, conta_debito_id, conta_credito_id, valor
+            )
+            INSERT INTO contabilidade_livro_diario_partida
+                   (diario_id, sequence, conta_id, debito, credito, data, user_id, escopo,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT novos.id, lado.sequence, lado.conta_id, lado.debito, lado.credito, novos.data, novos.user_id,
+                   novos.escopo,
+                   %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+              FROM novos
+             CROSS JOIN LATERAL (VALUES
+                    (1, novos.conta_debito_id, novos.valor, 0.0),
+                    (2, novos.conta_credito_id, 0.0, novos.valor)
+                   ) AS lado(sequence, conta_id, debito, credito)
+        """, [self.env.uid] * 4)
+        cr.execute("TRUNCATE contabilidade_importacao_tmp")
+
+        # o que o create() das partidas faria: contas usadas e saldos mensais
+        self.env['contabilidade.contas.uso']._registrar_uso(
+            conta_id for _numero, vals in lote for conta_id in (vals['conta_debito_id'], vals['conta_credito_id'])
+        )
+        movimentos = []
+        for _numero, vals in lote:
+            movimentos.append((vals['user_id'], vals['conta_debito_id'], vals['data'], vals['valor'], 0.0))
+            movimentos.append((vals['user_id'], vals['conta_credito_id'], vals['data'], 0.0, vals['valor']))
+        self.env['contabilidade.saldo.mensal']._aplicar_movimentos(movimentos)
+
+    @api.model
+    def _importar_registros(self, registros, tamanho_lote=1000):
+        """Grava ``(numero, linha)`` já lidos (API NDJSON) em lotes pela carga rápida.
+
+        ``linha`` tem as mesmas chaves do CSV. Cada lote vai num único COPY;
+        se o lote for recusado (ex.: período fechado), o ORM grava as linhas
+        uma a uma para isolar as com erro. Retorna ``{numero: erro}``.
+        """
+        contas = self._mapa_contas()
+        currency_id = self.env.ref('base.BRL').id
+        erros = []
+        lote = []
+
+        def gravar():
+            try:
+                with self.env.cr.savepoint():
+                    self._copiar_lote(lote)
+            except Exception:
+                self.browse()._inserir_lote(lote, erros)
+            lote.clear()
+
+        for numero, linha in registros:
+            try:
+                lote.append((numero, self._converter_linha(linha, contas, currency_id)))
+            except ValueError as erro:
+                erros.append((numero, str(erro)))
+            if len(lote) >= tamanho_lote:
+                gravar()
+        if lote:
+            gravar()
+        return dict(erros)
+
+    def action_importar(self):
+        self.ensure_one()
+        if self.tamanho_lote <= 0:
+            raise UserError("O tamanho do lote deve ser maior que zero.")
+
+        contas = self._mapa_contas()
+        currency_id = self.env.ref('base.BRL').id
+        erros = []
+        mensagens = []
+        total_erros = 0
+        total_importado = 0
+        lote = []
+
+        def registrar_erros():
+            nonlocal total_erros
+            total_erros += len(erros)
+            espaco = MAX_ERROS_LOG - len(mensagens)
+            mensagens.extend("Linha %s: %s" % erro for erro in erros[:max(espaco, 0)])
+            erros.clear()
+
+        with self._abrir_arquivo() as arquivo:
+            linhas = self._linhas_ofx(arquivo) if self.formato == 'ofx' else self._linhas_csv(arquivo)
+            for numero, linha in linhas:
+                try:
+                    lote.append((numero, self._converter_linha(linha, contas, currency_id)))
+                except ValueError as erro:
+                    erros.append((numero, str(erro)))
+                if len(lote) >= self.tamanho_lote:
+                    total_importado += self._inserir_lote(lote, erros)
+                    lote = []
+                if erros:
+                    registrar_erros()
+            if lote:
+                total_importado += self._inserir_lote(lote, erros)
+                registrar_erros()
+
+        if total_erros > len(mensagens):
+            mensagens.append("... e mais %s linha(s) com erro." % (total_erros - len(mensagens)))
+
+        self.write({
+            'state': 'concluido',
+            'total_importado': total_importado,
+            'total_erros': total_erros,
+            'log_erros': "\n".join(mensagens),
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
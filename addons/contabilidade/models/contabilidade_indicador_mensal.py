@@ -0,0 +1,289 @@
+from collections import defaultdict
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, models
+from odoo.tools import split_every
+from odoo.tools.float_utils import float_is_zero
+from odoo.tools.sql import create_unique_index
+
+# Nós do plano de contas (xmlid) totalizados pelos índices
+NODES = {
+    'ativo_circulante': 'no_ativo_circulante',
+    'disponivel': 'no_disponivel',
+    'estoques': 'no_estoques',
+    'ativo_nao_circulante': 'no_ativo_nao_circulante',
+    'realizavel_lp': 'no_realizavel_lp',
+    'passivo_circulante': 'no_passivo_circulante',
+    'passivo_nao_circulante': 'no_passivo_nao_circulante',
+    'patrimonio': 'no_patrimonio',
+    'receitas': 'no_receitas',
+    'despesas': 'no_despesas',
+}
+DEBIT_NODES = {'ativo_circulante', 'disponivel', 'estoques', 'ativo_nao_circulante', 'realizavel_lp', 'despesas'}
+
+# Colunas gravadas por mês, na ordem do INSERT
+CAMPOS_INDICADOR = [
+    'disponivel', 'ativo_circulante', 'estoques', 'realizavel_lp', 'ativo_total',
+    'passivo_circulante', 'passivo_exigivel', 'patrimonio', 'lucro_liquido', 'variacao_nao_circulante',
+    'liq_imediata', 'liq_seca', 'liq_corrente', 'liq_geral', 'solvencia_geral', 'roa', 'roe',
+]
+
+
+def _razao(numerador, denominador):
+    if float_is_zero(denominador, precision_rounding=0.01):
+        return 0.0
+    return numerador / denominador
+
+
+def calcular_indicadores(saldo, lucro_liquido, variacao_nao_circulante=0.0):
+    """Índices a partir do saldo natural de cada nó (``saldo(chave)``) e do lucro do ano."""
+    ativo_circulante = saldo('ativo_circulante')
+    estoques = saldo('estoques')
+    realizavel_lp = saldo('realizavel_lp')
+    disponivel = saldo('disponivel')
+    passivo_circulante = saldo('passivo_circulante')
+    patrimonio = saldo('patrimonio')
+    ativo_total = ativo_circulante + saldo('ativo_nao_circulante')
+    passivo_exigivel = passivo_circulante + saldo('passivo_nao_circulante')
+    return {
+        'disponivel': disponivel,
+        'ativo_circulante': ativo_circulante,
+        'estoques': estoques,
+        'realizavel_lp': realizavel_lp,
+        'ativo_total': ativo_total,
+        'passivo_circulante': passivo_circulante,
+        'passivo_exigivel': passivo_exigivel,
+        'patrimonio': patrimonio,
+        'lucro_liquido': lucro_liquido,
+        'variacao_nao_circulante': variacao_nao_circulante,
+        'liq_imediata': _razao(disponivel, passivo_circulante),
+        'liq_seca': _razao(ativo_circulante - estoques, passivo_circulante),
+        'liq_corrente': _razao(ativo_circulante, passivo_circulante),
+        'liq_geral': _razao(ativo_circulante + realizavel_lp, passivo_exigivel),
+        'solvencia_geral': _razao(ativo_total, passivo_exigivel),
+        'roa': _razao(lucro_liquido, ativo_total),
+        'roe': _razao(lucro_liquido, patrimonio),
+    }
+
+
+class ContabilidadeIndicadorMensal(models.Model):
+    _name = 'contabilidade.indicador.mensal'
+    _description = 'Indicadores Financeiros por Mês'
+    _order = 'user_id, periodo'
+    _rec_name = 'periodo'
+
+    # Série mensal dos índices de cada usuário, calculada em lote a partir dos
+    # saldos mensais. Um lançamento marca como desatualizados o mês dele e os
+    # seguintes (os saldos são acumulados); só esses meses são recalculados.
+    user_id = fields.Many2one('res.users', string='Usuário', required=True, readonly=True, ondelete='cascade')
+    periodo = fields.Date(string='Mês', required=True, readonly=True, help="Primeiro dia do mês; posição no último dia.")
+    desatualizado = fields.Boolean(readonly=True)
+
+    disponivel = fields.Float(string='Disponível', readonly=True)
+    ativo_circulante = fields.Float(string='Ativo Circulante', readonly=True)
+    estoques = fields.Float(string='Estoques', readonly=True)
+    realizavel_lp = fields.Float(string='Realizável a Longo Prazo', readonly=True)
+    ativo_total = fields.Float(string='Ativo Total', readonly=True)
+    passivo_circulante = fields.Float(string='Passivo Circulante', readonly=True)
+    passivo_exigivel = fields.Float(string='Passivo Exigível', readonly=True)
+    patrimonio = fields.Float(string='Patrimônio Líquido', readonly=True)
+    lucro_liquido = fields.Float(string='Lucro Líquido (no ano)', readonly=True)
+    variacao_nao_circulante = fields.Float(string='Variação do Não Circulante', readonly=True)
+
+    liq_imediata = fields.Float(string='Liquidez Imediata', digits=(16, 4), readonly=True, group_operator='avg')
+    liq_seca = fields.Float(string='Liquidez Seca', digits=(16, 4), readonly=True, group_operator='avg')
+    liq_corrente = fields.Float(string='Liquidez Corrente', digits=(16, 4), readonly=True, group_operator='avg')
+    liq_geral = fields.Float(string='Liquidez Geral', digits=(16, 4), readonly=True, group_operator='avg')
+    solvencia_geral = fields.Float(string='Solvência Geral', digits=(16, 4), readonly=True, group_operator='avg')
+    roa = fields.Float(string='ROA', digits=(16, 4), readonly=True, group_operator='avg')
+    roe = fields.Float(string='ROE', digits=(16, 4), readonly=True, group_operator='avg')
+
+    def init(self):
+        create_unique_index(self._cr, 'contabilidade_indicador_mensal_chave_uniq', self._table, ['user_id', 'periodo'])
+
+    @staticmethod
+    def _meses(inicio, fim):
+        mes = inicio.replace(day=1)
+        while mes <= fim:
+            yield mes
+            mes += relativedelta(months=1)
+
+    @api.model
+    def _escopo(self, user_id):
+        # mesmo escopo da regra de acesso do Livro Diário
+        return [user_id, False, 1]
+
+    @api.model
+    def _calcular(self, user_id, inicio, fim):
+        """Índices de cada mês de ``inicio`` a ``fim``, numa única consulta.
+
+        Lê os saldos mensais totalizados por nó do plano de contas; o que é
+        anterior ao ano de ``inicio`` vem somado numa linha de abertura.
+        Retorna ``{periodo: valores}``.
+        """
+        nodes = {
+            chave: self.env.ref(f'contabilidade.{xmlid}', raise_if_not_found=False)
+            for chave, xmlid in NODES.items()
+        }
+        chave_por_no = {node.id: chave for chave, node in nodes.items() if node}
+        inicio = inicio.replace(day=1)
+        fim = fim.replace(day=1)
+        if not chave_por_no or inicio > fim:
+            return {}
+
+        ano_inicio = date(inicio.year, 1, 1)
+        self.env['contabilidade.contas'].flush_model(['parent_path'])
+        self.env['contabilidade.livro.diario.partida'].flush_model()
+        filtro, params = self.env['contabilidade.agregacao']._filtro_usuarios(self._escopo(user_id), coluna='s.user_id')
+        self.env.cr.execute(f"""
+            SELECT no.id, CASE WHEN s.periodo < %s THEN NULL ELSE s.periodo END, SUM(s.debito - s.credito)
+              FROM contabilidade_saldo_mensal s
+              JOIN contabilidade_contas c ON c.id = s.conta_id
+              JOIN contabilidade_contas no ON c.parent_path LIKE no.parent_path || '%%'
+             WHERE {filtro} AND s.periodo <= %s AND no.id IN %s
+             GROUP BY 1, 2
+        """, [ano_inicio, *params, fim, tuple(chave_por_no)])
+
+        acumulado = defaultdict(float)
+        por_mes = defaultdict(dict)
+        for no_id, periodo, saldo in self.env.cr.fetchall():
+            chave = chave_por_no[no_id]
+            if periodo is None:
+                acumulado[chave] += saldo or 0.0
+            else:
+                por_mes[periodo][chave] = saldo or 0.0
+
+        def natural(valores, chave):
+            valor = valores.get(chave, 0.0)
+            return valor if chave in DEBIT_NODES else -valor
+
+        resultados = {}
+        resultado_ano = defaultdict(float)
+        for periodo in self._meses(ano_inicio, fim):
+            if periodo.month == 1:
+                resultado_ano.clear()
+            for chave, saldo in por_mes[periodo].items():
+                acumulado[chave] += saldo
+                resultado_ano[chave] += saldo
+            if periodo < inicio:
+                continue
+            lucro = natural(resultado_ano, 'receitas') - natural(resultado_ano, 'despesas')
+            resultados[periodo] = calcular_indicadores(
+                lambda chave: natural(acumulado, chave),
+                lucro,
+                natural(por_mes[periodo], 'ativo_nao_circulante'),
+            )
+        return resultados
+
+    @api.model
+    def _atualizar(self, user_id, inicio, fim):
+        """Recalcula e grava os meses de ``inicio`` a ``fim`` do usuário."""
+        resultados = self._calcular(user_id, inicio, fim)
+        uid = self.env.uid
+        colunas = ", ".join(CAMPOS_INDICADOR)
+        for lote in split_every(500, resultados.items()):
+            params = []
+            for periodo, valores in lote:
+                params.extend([user_id, periodo, *(valores[campo] for campo in CAMPOS_INDICADOR)])
+            linha = "(%s::int, %s::date" + ", %s::float8" * len(CAMPOS_INDICADOR) + ")"
+            self.env.cr.execute(f"""
+                INSERT INTO contabilidade_indicador_mensal AS i
+                       (user_id, periodo, {colunas}, desatualizado,
+                        create_uid, create_date, write_uid, write_date)
+                SELECT v.*, FALSE, %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+                  FROM (VALUES {", ".join([linha] * len(lote))}) AS v(user_id, periodo, {colunas})
+                ON CONFLICT (user_id, periodo) DO UPDATE
+                   SET {", ".join(f"{campo} = EXCLUDED.{campo}" for campo in CAMPOS_INDICADOR)},
+                       desatualizado = FALSE,
+                       write_uid = EXCLUDED.write_uid,
+                       write_date = EXCLUDED.write_date
+            """, [uid, uid, *params])
+        self.invalidate_model()
+
+    @api.model
+    def _garantir(self, user_id, inicio, fim):
+        """Garante a série do usuário de ``inicio`` a ``fim``, recalculando só a partir
+        do primeiro mês ausente ou desatualizado."""
+        inicio = inicio.replace(day=1)
+        fim = fim.replace(day=1)
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT periodo
+              FROM contabilidade_indicador_mensal
+             WHERE user_id = %s AND periodo >= %s AND periodo <= %s AND NOT desatualizado
+        """, [user_id, inicio, fim])
+        prontos = {periodo for periodo, in self.env.cr.fetchall()}
+        pendente = next((mes for mes in self._meses(inicio, fim) if mes not in prontos), None)
+        if pendente:
+            self._atualizar(user_id, pendente, fim)
+
+    @api.model
+    def _obter(self, user_id, periodo):
+        """Índices do mês de ``periodo`` para o usuário, calculados se preciso."""
+        self._garantir(user_id, periodo, periodo)
+        return self.sudo().search([('user_id', '=', user_id), ('periodo', '=', periodo.replace(day=1))], limit=1)
+
+    @api.model
+    def _dados_api(self, user_id, periodo):
+        """Índices do mês de ``periodo`` em estruturas simples (JSON).
+
+        Não grava nada: usa a linha da série quando está em dia e, senão,
+        calcula o mês em memória. Atualizar a série fica com o cron.
+        """
+        periodo = periodo.replace(day=1)
+        indicador = self.sudo().search([
+            ('user_id', '=', user_id), ('periodo', '=', periodo), ('desatualizado', '=', False),
+        ], limit=1)
+        if indicador:
+            valores = {campo: indicador[campo] for campo in CAMPOS_INDICADOR}
+        else:
+            valores = self._calcular(user_id, periodo, periodo).get(periodo, {})
+        return {
+            'periodo': periodo.isoformat(),
+            **{campo: valores.get(campo, 0.0) for campo in CAMPOS_INDICADOR},
+        }
+
+    @api.model
+    def _invalidar(self, periodos):
+        """Marca como desatualizados, para cada ``{user_id: periodo}``, o mês e os seguintes.
+
+        Lançamentos sem usuário ou do administrador entram no escopo de todos.
+        """
+        for user_id, periodo in periodos.items():
+            todos = not user_id or user_id == 1
+            self.env.cr.execute("""
+                UPDATE contabilidade_indicador_mensal
+                   SET desatualizado = TRUE
+                 WHERE NOT desatualizado AND periodo >= %s AND (%s OR user_id = %s)
+            """, [periodo, todos, user_id or 0])
+        self.invalidate_model(['desatualizado'])
+
+    @api.model
+    def _cron_atualizar(self):
+        """Recalcula, em lote por usuário, os meses marcados como desatualizados."""
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT user_id, MIN(periodo) FILTER (WHERE desatualizado), MAX(periodo)
+              FROM contabilidade_indicador_mensal
+             GROUP BY user_id
+            HAVING bool_or(desatualizado)
+        """)
+        for user_id, inicio, fim in self.env.cr.fetchall():
+            self._atualizar(user_id, inicio, fim)
+
+    @api.model
+    def action_abrir_serie(self):
+        """Atualiza a série do usuário, do primeiro mês com movimento até o mês atual, e a abre."""
+        user_id = self.env.uid
+        hoje = fields.Date.context_today(self)
+        filtro, params = self.env['contabilidade.agregacao']._filtro_usuarios(self._escopo(user_id))
+        self.env['contabilidade.livro.diario.partida'].flush_model()
+        self.env.cr.execute(f"SELECT MIN(periodo) FROM contabilidade_saldo_mensal WHERE {filtro}", params)
+        inicio = self.env.cr.fetchone()[0]
+        if inicio:
+            self.sudo()._garantir(user_id, min(inicio, hoje), hoje)
+        action = self.env['ir.actions.act_window']._for_xml_id('contabilidade.action_contabilidade_indicador_mensal')
+        action['domain'] = [('user_id', '=', user_id)]
+        return action
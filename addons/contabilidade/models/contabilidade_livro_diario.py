@@ -1,18 +1,157 @@
-from odoo import models, fields
+from odoo import api, models, fields
+from odoo.exceptions import ValidationError
+from odoo.tools.float_utils import float_compare
+from odoo.tools.sql import create_index
+
+# Campos que alteram os saldos mensais quando modificados
+CAMPOS_SALDO = {'data', 'valor', 'conta_debito_id', 'conta_credito_id', 'user_id', 'tipo', 'partida_ids'}
+
+# Campos do lançamento simples, espelhados em duas partidas
+CAMPOS_SIMPLES = {'valor', 'conta_debito_id', 'conta_credito_id', 'tipo'}
+
 
 class ContabilidadeLivroDiario(models.Model):
     _name = "contabilidade.livro.diario"
+    _inherit = ["contabilidade.escopo.mixin"]
     _description = "Contabilidade Livro Diário"
+    _order = "data, id"
 
     data = fields.Date(string="Data", required=True)
     descricao = fields.Char(string="Descrição", required=True)
-    conta_credito_id = fields.Many2one('contabilidade.contas', string="Crédito", required=True)
-    conta_debito_id = fields.Many2one('contabilidade.contas', string="Débito", required=True)
-    valor = fields.Float(string="Valor", required=True)
+    tipo = fields.Selection([
+        ('simples', 'Simples'),
+        ('composto', 'Composto'),
+    ], string="Tipo", required=True, default='simples')
+    conta_credito_id = fields.Many2one('contabilidade.contas', string="Crédito", domain=[('sintetica', '=', False)])
+    conta_debito_id = fields.Many2one('contabilidade.contas', string="Débito", domain=[('sintetica', '=', False)])
+    valor = fields.Float(string="Valor")
+    partida_ids = fields.One2many('contabilidade.livro.diario.partida', 'diario_id', string="Partidas", copy=True)
     currency_id = fields.Many2one('res.currency', string="Moeda", default=lambda self: self.env.ref('base.BRL'), required=True)
     user_id = fields.Many2one('res.users', string="Usuário", default=lambda self: self.env.user)
 
 
+    def init(self):
+        # A lista e os relatórios filtram por usuário + data. As consultas por
+        # conta usam as partidas; os índices de débito/crédito atendem a busca
+        # pelos campos do lançamento simples; o de escopo, a regra de acesso.
+        for colunas in (['user_id', 'data'], ['conta_debito_id', 'data'], ['conta_credito_id', 'data'],
+                        ['escopo', 'data']):
+            create_index(
+                self._cr,
+                f"{self._table}_{'_'.join(colunas)}_idx",
+                self._table,
+                colunas,
+            )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lancamentos = super(ContabilidadeLivroDiario, self.with_context(contabilidade_saldo_diario=True)).create(vals_list)
+        lancamentos = lancamentos.with_env(self.env)
+        lancamentos._verificar_bloqueio()
+        lancamentos._sincronizar_partidas()
+        self.env['contabilidade.saldo.mensal']._aplicar_movimentos(lancamentos.partida_ids._movimentos_saldo())
+        return lancamentos
+
+    def write(self, vals):
+        self._verificar_bloqueio()
+        if not CAMPOS_SALDO.intersection(vals):
+            return super().write(vals)
+
+        SaldoMensal = self.env['contabilidade.saldo.mensal']
+        SaldoMensal._aplicar_movimentos(self.partida_ids._movimentos_saldo(), sinal=-1)
+        res = super(ContabilidadeLivroDiario, self.with_context(contabilidade_saldo_diario=True)).write(vals)
+        if 'data' in vals or 'user_id' in vals:
+            self._verificar_bloqueio()
+        if CAMPOS_SIMPLES.intersection(vals):
+            self._sincronizar_partidas()
+        SaldoMensal._aplicar_movimentos(self.partida_ids._movimentos_saldo())
+        return res
+
+    def unlink(self):
+        self._verificar_bloqueio()
+        self.env['contabilidade.saldo.mensal']._aplicar_movimentos(self.partida_ids._movimentos_saldo(), sinal=-1)
+        return super().unlink()
+
+    def _verificar_bloqueio(self):
+        """Rejeita alterações em lançamentos de períodos já fechados."""
+        self.env['contabilidade.fechamento']._verificar_bloqueio(
+            (lancamento.user_id.id, lancamento.data) for lancamento in self
+        )
+
+    def _sincronizar_partidas(self):
+        """Espelha débito/crédito/valor dos lançamentos simples em duas partidas.
+
+        Nos lançamentos compostos o valor passa a ser o total debitado.
+        """
+        Partida = self.env['contabilidade.livro.diario.partida'].with_context(contabilidade_saldo_diario=True)
+        novas = []
+        for lancamento in self:
+            if lancamento.tipo == 'composto':
+                total = sum(lancamento.partida_ids.mapped('debito'))
+                if lancamento.valor != total:
+                    super(ContabilidadeLivroDiario, lancamento).write({'valor': total})
+                continue
+
+            lados = [
+                {'sequence': 1, 'conta_id': lancamento.conta_debito_id.id, 'debito': lancamento.valor, 'credito': 0.0},
+                {'sequence': 2, 'conta_id': lancamento.conta_credito_id.id, 'debito': 0.0, 'credito': lancamento.valor},
+            ]
+            partidas = lancamento.partida_ids.with_context(contabilidade_saldo_diario=True)
+            if len(partidas) == 2:
+                for partida, vals in zip(partidas.sorted('sequence'), lados):
+                    partida.write(vals)
+            else:
+                partidas.unlink()
+                novas.extend(dict(vals, diario_id=lancamento.id) for vals in lados)
+        if novas:
+            Partida.create(novas)
+
+    @api.constrains('tipo', 'conta_debito_id', 'conta_credito_id', 'valor')
+    def _check_simples(self):
+        for lancamento in self.filtered(lambda l: l.tipo == 'simples'):
+            if not lancamento.conta_debito_id or not lancamento.conta_credito_id:
+                raise ValidationError("Informe a conta de débito e a conta de crédito do lançamento.")
+            if lancamento.valor <= 0:
+                raise ValidationError("O valor do lançamento deve ser maior que zero.")
+
+    @api.constrains('partida_ids')
+    def _check_balanceamento(self):
+        for lancamento in self.filtered(lambda l: l.tipo == 'composto'):
+            partidas = lancamento.partida_ids
+            if len(partidas) < 2:
+                raise ValidationError("Um lançamento composto precisa de ao menos duas partidas.")
+            total_debito = sum(partidas.mapped('debito'))
+            total_credito = sum(partidas.mapped('credito'))
+            if float_compare(total_debito, total_credito, precision_rounding=lancamento.currency_id.rounding or 0.01):
+                raise ValidationError(
+                    "O lançamento \"%s\" não está balanceado: débitos %.2f, créditos %.2f."
+                    % (lancamento.descricao, total_debito, total_credito)
+                )
+
+    @api.model
+    def _migrar_partidas(self):
+        """Cria as partidas dos lançamentos gravados antes dos lançamentos compostos."""
+        self.env.cr.execute("""
+            INSERT INTO contabilidade_livro_diario_partida
+                   (diario_id, sequence, conta_id, debito, credito, data, user_id, escopo,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT d.id, lado.sequence, lado.conta_id, lado.debito, lado.credito, d.data, d.user_id, d.escopo,
+                   %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+              FROM contabilidade_livro_diario d
+             CROSS JOIN LATERAL (VALUES
+                    (1, d.conta_debito_id, d.valor, 0.0),
+                    (2, d.conta_credito_id, 0.0, d.valor)
+                   ) AS lado(sequence, conta_id, debito, credito)
+             WHERE d.tipo = 'simples'
+               AND lado.conta_id IS NOT NULL
+               AND NOT EXISTS (
+                    SELECT 1 FROM contabilidade_livro_diario_partida p WHERE p.diario_id = d.id
+               )
+        """, [self.env.uid, self.env.uid])
+        self.env['contabilidade.livro.diario.partida'].invalidate_model()
+        self.invalidate_model(['partida_ids'])
+        return True
+
     def action_open_form(self):
         self.ensure_one()
         return {
@@ -21,4 +160,4 @@ class ContabilidadeLivroDiario(models.Model):
             "res_id": self.id,
             "view_mode": "form",
             "target": "current",
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,234 @@
+import logging
+from datetime import date
+
+from odoo import api, fields, models
+from odoo.exceptions import ValidationError
+from odoo.tools.sql import column_exists, create_index
+
+_logger = logging.getLogger(__name__)
+
+# Campos que alteram os saldos mensais quando modificados
+CAMPOS_SALDO_PARTIDA = {'diario_id', 'conta_id', 'debito', 'credito'}
+
+
+class ContabilidadeLivroDiarioPartida(models.Model):
+    _name = "contabilidade.livro.diario.partida"
+    _inherit = ["contabilidade.escopo.mixin"]
+    _description = "Partida do Lançamento (Livro Diário)"
+    _order = "data, diario_id, sequence, id"
+
+    # Uma linha por lado de conta do lançamento: é a tabela que os relatórios
+    # agregam, filtrando por uma única coluna conta_id.
+    diario_id = fields.Many2one('contabilidade.livro.diario', string="Lançamento", required=True, ondelete='cascade', index=True)
+    sequence = fields.Integer(default=10)
+    conta_id = fields.Many2one('contabilidade.contas', string="Conta", required=True, domain=[('sintetica', '=', False)])
+    debito = fields.Float(string="Débito")
+    credito = fields.Float(string="Crédito")
+    # precompute: gravados já no INSERT, a data decide a partição da linha
+    data = fields.Date(string="Data", related='diario_id.data', store=True, precompute=True)
+    user_id = fields.Many2one('res.users', string="Usuário", related='diario_id.user_id', store=True, precompute=True)
+    descricao = fields.Char(string="Descrição", related='diario_id.descricao')
+    currency_id = fields.Many2one('res.currency', string="Moeda", related='diario_id.currency_id')
+
+    _sql_constraints = [
+        ('lado_unico', 'CHECK(debito >= 0 AND credito >= 0 AND (debito = 0 OR credito = 0))',
+         "Cada partida deve ter apenas débito ou apenas crédito, sem valores negativos."),
+    ]
+
+    def init(self):
+        if self._tabela_particionada():
+            self._completar_colunas()
+        for colunas in (['conta_id', 'data'], ['user_id', 'data'], ['escopo', 'data']):
+            create_index(
+                self._cr,
+                f"{self._table}_{'_'.join(colunas)}_idx",
+                self._table,
+                colunas,
+            )
+
+    # Quando a alteração vem do próprio lançamento (contexto
+    # ``contabilidade_saldo_diario``), é o Livro Diário que ajusta os saldos e
+    # verifica o bloqueio de período.
+    @api.model_create_multi
+    def create(self, vals_list):
+        partidas = super().create(vals_list)
+        self.env['contabilidade.contas.uso']._registrar_uso(partidas.conta_id.ids)
+        if not self.env.context.get('contabilidade_saldo_diario'):
+            partidas.diario_id._verificar_bloqueio()
+            self.env['contabilidade.saldo.mensal']._aplicar_movimentos(partidas._movimentos_saldo())
+        return partidas
+
+    def write(self, vals):
+        if vals.get('conta_id'):
+            self.env['contabilidade.contas.uso']._registrar_uso([vals['conta_id']])
+        if self.env.context.get('contabilidade_saldo_diario'):
+            return super().write(vals)
+
+        self.diario_id._verificar_bloqueio()
+        if not CAMPOS_SALDO_PARTIDA.intersection(vals):
+            return super().write(vals)
+
+        SaldoMensal = self.env['contabilidade.saldo.mensal']
+        SaldoMensal._aplicar_movimentos(self._movimentos_saldo(), sinal=-1)
+        res = super().write(vals)
+        if 'diario_id' in vals:
+            self.diario_id._verificar_bloqueio()
+        SaldoMensal._aplicar_movimentos(self._movimentos_saldo())
+        return res
+
+    def unlink(self):
+        if not self.env.context.get('contabilidade_saldo_diario'):
+            self.diario_id._verificar_bloqueio()
+            self.env['contabilidade.saldo.mensal']._aplicar_movimentos(self._movimentos_saldo(), sinal=-1)
+        return super().unlink()
+
+    @api.constrains('debito', 'credito', 'conta_id')
+    def _check_balanceamento(self):
+        self.diario_id._check_balanceamento()
+
+    @api.constrains('conta_id')
+    def _check_conta_analitica(self):
+        # o domínio do campo só vale na interface; importação e RPC passam por aqui
+        sinteticas = self.conta_id.filtered('sintetica')
+        if sinteticas:
+            raise ValidationError(
+                "A conta %s é sintética (de agrupamento) e não recebe lançamentos." % sinteticas[0].name
+            )
+
+    def _movimentos_saldo(self):
+        """Movimentos (user_id, conta_id, data, debito, credito) de cada partida."""
+        for partida in self:
+            yield (partida.user_id.id, partida.conta_id.id, partida.data, partida.debito, partida.credito)
+
+    # ------------------------------------------------------------------
+    # Particionamento por ano (opcional)
+    # ------------------------------------------------------------------
+    # As partidas são a tabela que cresce com os anos e que os relatórios
+    # varrem por data. Convertida em tabela particionada por ``data``, cada ano
+    # fica numa partição própria (``<tabela>_<ano>``) e as consultas com filtro
+    # de data só leem as partições do período. O Odoo deixa de gerenciar o
+    # esquema de tabelas particionadas: as colunas de campos novos neste
+    # modelo são criadas pelo ``init`` (``_completar_colunas``); mudanças de
+    # tipo ou remoção de campos ainda exigem migração manual.
+
+    def _tabela_particionada(self):
+        self.env.cr.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [self._table])
+        row = self.env.cr.fetchone()
+        return bool(row) and row[0] == 'p'
+
+    def _completar_colunas(self):
+        """Cria na tabela particionada as colunas dos campos armazenados que faltam."""
+        cr = self.env.cr
+        calculados = []
+        for campo in self._fields.values():
+            if not campo.store or not campo.column_type or column_exists(cr, self._table, campo.name):
+                continue
+            cr.execute(f'ALTER TABLE "{self._table}" ADD COLUMN IF NOT EXISTS "{campo.name}" {campo.column_type[1]}')
+            _logger.info("Coluna %s criada na tabela particionada %s", campo.name, self._table)
+            if campo.compute:
+                calculados.append(campo)
+            else:
+                self._init_column(campo.name)
+        if calculados:
+            self.env.invalidate_all()
+            registros = self.with_context(active_test=False).search([])
+            for campo in calculados:
+                self.env.add_to_compute(campo, registros)
+            self.flush_model([campo.name for campo in calculados])
+
+    @api.model
+    def _particionar(self):
+        """Converte a tabela de partidas em tabela particionada por ano."""
+        if self._tabela_particionada():
+            return False
+        self.flush_model()
+        cr = self.env.cr
+        tabela = self._table
+        antiga = f"{tabela}_nao_particionada"
+
+        # definição das FKs e índices atuais, recriados na tabela nova
+        cr.execute("""
+            SELECT conname, pg_get_constraintdef(oid)
+              FROM pg_constraint
+             WHERE conrelid = %s::regclass AND contype = 'f'
+        """, [tabela])
+        chaves = cr.fetchall()
+        cr.execute("""
+            SELECT indexdef
+              FROM pg_indexes i
+              JOIN pg_class c ON c.relname = i.indexname
+              JOIN pg_index x ON x.indexrelid = c.oid
+             WHERE i.tablename = %s AND NOT x.indisprimary
+        """, [tabela])
+        indices = [indexdef for indexdef, in cr.fetchall()]
+        cr.execute("SELECT pg_get_serial_sequence(%s, 'id')", [tabela])
+        sequencia = cr.fetchone()[0]
+
+        cr.execute(f'ALTER TABLE "{tabela}" RENAME TO "{antiga}"')
+        cr.execute(f'ALTER SEQUENCE {sequencia} OWNED BY NONE')
+        cr.execute(f"""
+            CREATE TABLE "{tabela}" (LIKE "{antiga}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+            PARTITION BY RANGE (data)
+        """)
+        cr.execute(f'CREATE TABLE "{tabela}_default" PARTITION OF "{tabela}" DEFAULT')
+
+        cr.execute(f'SELECT EXTRACT(YEAR FROM MIN(data))::int, EXTRACT(YEAR FROM MAX(data))::int FROM "{antiga}"')
+        primeiro, ultimo = cr.fetchone()
+        ano_atual = fields.Date.context_today(self).year
+        for ano in range(min(primeiro or ano_atual, ano_atual), max(ultimo or ano_atual, ano_atual) + 2):
+            self._criar_particao(ano)
+
+        cr.execute(f'INSERT INTO "{tabela}" SELECT * FROM "{antiga}"')
+        cr.execute(f'DROP TABLE "{antiga}"')
+        cr.execute(f'ALTER SEQUENCE {sequencia} OWNED BY "{tabela}".id')
+
+        # a chave primária de uma tabela particionada precisa incluir a coluna de partição
+        cr.execute(f'ALTER TABLE "{tabela}" ADD CONSTRAINT "{tabela}_pkey" PRIMARY KEY (id, data)')
+        for nome, definicao in chaves:
+            cr.execute(f'ALTER TABLE "{tabela}" ADD CONSTRAINT "{nome}" {definicao}')
+        for indexdef in indices:
+            cr.execute(indexdef)
+        _logger.info("Tabela %s convertida em tabela particionada por ano", tabela)
+        return True
+
+    @api.model
+    def _criar_particao(self, ano):
+        """Cria a partição do ano, movendo para ela as linhas que estejam na partição padrão."""
+        cr = self.env.cr
+        tabela = self._table
+        particao = f"{tabela}_{ano}"
+        cr.execute("SELECT to_regclass(%s)", [particao])
+        if cr.fetchone()[0]:
+            return False
+
+        inicio, fim = date(ano, 1, 1), date(ano + 1, 1, 1)
+        padrao = f"{tabela}_default"
+        cr.execute(f'SELECT 1 FROM "{padrao}" WHERE data >= %s AND data < %s LIMIT 1', [inicio, fim])
+        if not cr.fetchone():
+            cr.execute(
+                f'CREATE TABLE "{particao}" PARTITION OF "{tabela}" FOR VALUES FROM (%s) TO (%s)',
+                [inicio, fim],
+            )
+            return True
+
+        # a partição padrão não pode conter linhas do intervalo da nova partição
+        cr.execute(f'CREATE TEMP TABLE contabilidade_particao_tmp (LIKE "{tabela}") ON COMMIT DROP')
+        cr.execute(f"""
+            WITH movidas AS (
+                DELETE FROM "{padrao}" WHERE data >= %s AND data < %s RETURNING *
+            )
+            INSERT INTO contabilidade_particao_tmp SELECT * FROM movidas
+        """, [inicio, fim])
+        cr.execute(
+            f'CREATE TABLE "{particao}" PARTITION OF "{tabela}" FOR VALUES FROM (%s) TO (%s)',
+            [inicio, fim],
+        )
+        cr.execute(f'INSERT INTO "{tabela}" SELECT * FROM contabilidade_particao_tmp')
+        cr.execute("DROP TABLE contabilidade_particao_tmp")
+        return True
+
+    @api.model
+    def _cron_criar_particao_proximo_ano(self):
+        """Garante com antecedência a partição do ano seguinte."""
+        if self._tabela_particionada():
+            self._criar_particao(fields.Date.context_today(self).year + 1)
@@ -1,144 +1,242 @@
+from markupsafe import Markup
+
 from odoo import api, fields, models, _
-from odoo import Command
+
+# Quantidade de partidas exibidas por página do razão
+TAMANHO_PAGINA = 80
+
+
+def formatar_saldo(valor):
+    """Formata um saldo como ``R$ 1,234.56 D`` (devedor) ou ``C`` (credor)."""
+    if valor > 0:
+        tipo_saldo = "D"
+    elif valor < 0:
+        tipo_saldo = "C"
+    else:
+        tipo_saldo = ""
+    return f"R$ {abs(valor):,.2f} {tipo_saldo}".strip()
 
 
 class ContabilidadeLivroRazaoWizard(models.TransientModel):
     _name = 'contabilidade.livro.razao.wizard'
     _description = 'Livro Razão (consulta)'
 
-    conta_id = fields.Many2one('contabilidade.contas', string='Conta', required=True)
+    conta_id = fields.Many2one('contabilidade.contas', string='Conta', required=True, domain=[('sintetica', '=', False)])
     currency_id = fields.Many2one('res.currency', default=lambda self: self.env.ref('base.BRL'), required=True)
-    saldo_inicial = fields.Char(string='Saldo Inicial', compute='_compute_totais')
-    total_debito = fields.Monetary(string='Total Débitos', currency_field='currency_id', compute='_compute_totais')
-    total_credito = fields.Monetary(string='Total Créditos', currency_field='currency_id', compute='_compute_totais')
-    saldo_final = fields.Char(string='Saldo Final', compute='_compute_totais')
-    line_ids = fields.One2many('contabilidade.livro.razao.line', 'wizard_id', string='Lançamentos', compute='_compute_lines', readonly=True,)
+    saldo_inicial = fields.Char(string='Saldo Inicial', compute='_compute_razao')
+    saldo_inicial_valor = fields.Float(compute='_compute_razao')
+    total_debito = fields.Monetary(string='Total Débitos', currency_field='currency_id', compute='_compute_razao')
+    total_credito = fields.Monetary(string='Total Créditos', currency_field='currency_id', compute='_compute_razao')
+    saldo_final = fields.Char(string='Saldo Final', compute='_compute_razao')
     data_base = fields.Date(string='Data Base')
 
+    # Paginação por chave (data, id): a página começa logo após a âncora, cujo
+    # saldo acumulado já é conhecido. Sem âncora, começa no saldo inicial.
+    ancora_data = fields.Date()
+    ancora_id = fields.Integer()
+    ancora_saldo = fields.Float()
+    pagina = fields.Integer(default=1)
+    linhas_html = fields.Html(string='Lançamentos', compute='_compute_razao', sanitize=False)
+    tem_proxima = fields.Boolean(compute='_compute_razao')
+    ultimo_data = fields.Date(compute='_compute_razao')
+    ultimo_id = fields.Integer(compute='_compute_razao')
+    ultimo_saldo = fields.Float(compute='_compute_razao')
+
     # Recalcula ao mudar conta OU data
     @api.onchange('conta_id', 'data_base')
     def onchange_filters(self):
-        self._compute_lines()
-        self._compute_totais()
-
-    def _get_domain_movimentos(self):
-        """Domínio base para buscar lançamentos da conta selecionada."""
+        self.ancora_data = False
+        self.ancora_id = 0
+        self.ancora_saldo = 0.0
+        self.pagina = 1
+        self._compute_razao()
+
+    def _filtro_partidas(self, alias='p', periodo=True):
+        """Cláusula SQL com a conta, o escopo da regra de acesso do Livro Diário e,
+        se ``periodo``, a data base."""
         self.ensure_one()
-        if not self.conta_id:
-            return [('id', '=', 0)]
-        return [
-            '|',
-            ('conta_credito_id', '=', self.conta_id.id),
-            ('conta_debito_id', '=', self.conta_id.id),
-        ]
-
-    def _compute_lines(self):
-        """Monta as linhas do livro razão a partir do Livro Diário."""
-        Diario = self.env['contabilidade.livro.diario']
-
-        for wizard in self:
-            wizard.line_ids = [Command.clear()]
-            if not wizard.conta_id:
-                continue
-
-            domain = wizard._get_domain_movimentos()
-            # filtra lançamentos >= data_base, se informada
-            if wizard.data_base:
-                domain = list(domain) + [('data', '>=', wizard.data_base)]
-
-            movimentos = Diario.search(domain, order='data asc, id asc')
-
-            linhas_razao = []
-            for movimento in movimentos:
-                linhas_razao.append(Command.create({
-                    'data': movimento.data,
-                    'descricao': movimento.descricao,
-                    'diario_id': movimento.id,
-                    'conta_debito_id': movimento.conta_debito_id.id,
-                    'conta_credito_id': movimento.conta_credito_id.id,
-                    'debito': movimento.valor if movimento.conta_debito_id.id == wizard.conta_id.id else 0.0,
-                    'credito': movimento.valor if movimento.conta_credito_id.id == wizard.conta_id.id else 0.0,
-                    'currency_id': wizard.currency_id.id,
-                }))
-
-            wizard.line_ids = linhas_razao
-
-    def _compute_totais(self):
-        """Calcula saldo inicial, totais e saldo final do razão."""
-        Diario = self.env['contabilidade.livro.diario']
-
+        filtro, params = self.env['contabilidade.agregacao']._filtro_usuarios(
+            [self.env.user.id, False, 1], coluna=f'{alias}.user_id',
+        )
+        where = [f'{alias}.conta_id = %s', filtro]
+        params = [self.conta_id.id, *params]
+        if periodo and self.data_base:
+            where.append(f'{alias}.data >= %s')
+            params.append(self.data_base)
+        return " AND ".join(where), params
+
+    def _consultar(self, limite=TAMANHO_PAGINA):
+        """Totais do razão e partidas da página atual, numa única consulta.
+
+        Os totais saem de somas condicionais (antes/a partir da data base)
+        sobre as partidas da conta. A página traz as partidas após a âncora
+        (data, id), com o saldo acumulado de cada linha calculado por uma soma
+        em janela na ordem da paginação, a partir do saldo da âncora (ou do
+        saldo inicial, na primeira página). Retorna ``(totais, linhas)``.
+        """
+        self.ensure_one()
+        self.env['contabilidade.livro.diario.partida'].flush_model()
+        where_conta, params_conta = self._filtro_partidas(periodo=False)
+        where_pagina, params_pagina = self._filtro_partidas()
+        if self.ancora_id:
+            where_pagina += " AND (p.data, p.id) > (%s, %s)"
+            params_pagina.extend([self.ancora_data, self.ancora_id])
+        base = self.data_base or None
+        saldo_ancora = self.ancora_saldo if self.ancora_id else None
+
+        self.env.cr.execute(f"""
+            WITH totais AS (
+                SELECT COALESCE(SUM(CASE WHEN p.data < %s::date THEN p.debito - p.credito ELSE 0 END), 0) AS abertura,
+                       COALESCE(SUM(CASE WHEN p.data < %s::date THEN 0 ELSE p.debito END), 0) AS debito,
+                       COALESCE(SUM(CASE WHEN p.data < %s::date THEN 0 ELSE p.credito END), 0) AS credito
+                  FROM contabilidade_livro_diario_partida p
+                 WHERE {where_conta}
+            ),
+            pagina AS (
+                SELECT p.id, p.data, d.descricao, p.diario_id, p.debito, p.credito,
+                       SUM(p.debito - p.credito) OVER (ORDER BY p.data, p.id) AS acumulado
+                  FROM contabilidade_livro_diario_partida p
+                  JOIN contabilidade_livro_diario d ON d.id = p.diario_id
+                 WHERE {where_pagina}
+                 ORDER BY p.data, p.id
+                 LIMIT %s
+            )
+            SELECT t.abertura, t.debito, t.credito,
+                   pg.id, pg.data, pg.descricao, pg.diario_id, pg.debito, pg.credito,
+                   COALESCE(%s::float8, t.abertura) + pg.acumulado
+              FROM totais t
+              LEFT JOIN pagina pg ON TRUE
+             ORDER BY pg.data, pg.id
+        """, [base, base, base, *params_conta, *params_pagina, limite, saldo_ancora])
+
+        totais = {}
+        linhas = []
+        for abertura, debito, credito, partida_id, data, descricao, diario_id, deb, cred, saldo in self.env.cr.fetchall():
+            totais = {'abertura': abertura, 'debito': debito, 'credito': credito}
+            if partida_id:
+                linhas.append({
+                    'id': partida_id,
+                    'data': data,
+                    'descricao': descricao,
+                    'diario_id': diario_id,
+                    'debito': deb,
+                    'credito': cred,
+                    'saldo': saldo,
+                })
+        return totais, linhas
+
+    def _ancora_anterior(self):
+        """Âncora (data, id, saldo) da página anterior, lendo para trás a partir da âncora atual."""
+        self.ensure_one()
+        self.env['contabilidade.livro.diario.partida'].flush_model()
+        where, params = self._filtro_partidas()
+        self.env.cr.execute(f"""
+            SELECT p.data, p.id,
+                   COALESCE(SUM(p.debito - p.credito) OVER (
+                       ORDER BY p.data DESC, p.id DESC ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                   ), 0) AS movimento
+              FROM contabilidade_livro_diario_partida p
+             WHERE {where} AND (p.data, p.id) <= (%s, %s)
+             ORDER BY p.data DESC, p.id DESC
+             LIMIT %s
+        """, [*params, self.ancora_data, self.ancora_id, TAMANHO_PAGINA + 1])
+        linhas = self.env.cr.fetchall()
+        if len(linhas) <= TAMANHO_PAGINA:
+            return False, 0, 0.0
+        data, partida_id, movimento = linhas[-1]
+        return data, partida_id, self.ancora_saldo - movimento
+
+    @api.depends('conta_id', 'data_base', 'ancora_data', 'ancora_id', 'ancora_saldo')
+    def _compute_razao(self):
+        """Saldos, totais e página atual do razão, a partir de uma única consulta."""
         for wizard in self:
+            wizard.saldo_inicial = ''
+            wizard.saldo_inicial_valor = 0.0
+            wizard.total_debito = 0.0
+            wizard.total_credito = 0.0
+            wizard.saldo_final = ''
+            wizard.linhas_html = False
+            wizard.tem_proxima = False
+            wizard.ultimo_data = False
+            wizard.ultimo_id = 0
+            wizard.ultimo_saldo = 0.0
             if not wizard.conta_id:
-                wizard.saldo_inicial = ''
-                wizard.total_debito = 0.0
-                wizard.total_credito = 0.0
-                wizard.saldo_final = ''
                 continue
 
-            conta_id = wizard.conta_id.id
-            base_domain = wizard._get_domain_movimentos()
-
-            # 1) Domínios: abertura (< data_base) e período (>= data_base)
-            domain_open = list(base_domain)
-            domain_period = list(base_domain)
-
-            if wizard.data_base:
-                domain_open.append(('data', '<', wizard.data_base))
-                domain_period.append(('data', '>=', wizard.data_base))
-
-            movimentos_abertura = Diario.search(domain_open)
-            movimentos_periodo = Diario.search(domain_period)
-
-            def _accumulate(movs):
-                debitos = 0.0
-                creditos = 0.0
-                for movimento in movs:
-                    if movimento.conta_debito_id.id == conta_id:
-                        debitos += movimento.valor
-                    if movimento.conta_credito_id.id == conta_id:
-                        creditos += movimento.valor
-                return debitos, creditos
-
-            deb_abertura, cred_abertura = _accumulate(movimentos_abertura)
-            saldo_inicial_valor = deb_abertura - cred_abertura
-
-            deb_periodo, cred_periodo = _accumulate(movimentos_periodo)
-            wizard.total_debito = deb_periodo
-            wizard.total_credito = cred_periodo
-            saldo_final_valor = saldo_inicial_valor + (deb_periodo - cred_periodo)
-
-            if saldo_inicial_valor > 0:
-                tipo_saldo_inicial = "D"
-            elif saldo_inicial_valor < 0:
-                tipo_saldo_inicial = "C"
-            else:
-                tipo_saldo_inicial = ""
-
-            valor_inicial_formatado = f"{abs(saldo_inicial_valor):,.2f}"
-            wizard.saldo_inicial = f"R$ {valor_inicial_formatado} {tipo_saldo_inicial}".strip()
-
-            # Saldo final
-            if saldo_final_valor > 0:
-                tipo_saldo_final = "D"
-            elif saldo_final_valor < 0:
-                tipo_saldo_final = "C"
-            else:
-                tipo_saldo_final = ""
-
-            valor_final_formatado = f"{abs(saldo_final_valor):,.2f}"
-            wizard.saldo_final = f"R$ {valor_final_formatado} {tipo_saldo_final}".strip()
-
-
-class ContabilidadeLivroRazaoLine(models.TransientModel):
-    _name = 'contabilidade.livro.razao.line'
-    _description = 'Linha do Livro Razão (consulta)'
-
-    wizard_id = fields.Many2one('contabilidade.livro.razao.wizard', ondelete='cascade')
-    data = fields.Date(string='Data')
-    descricao = fields.Char(string='Descrição')
-    diario_id = fields.Many2one('contabilidade.livro.diario', string='Lançamento')
-    conta_debito_id = fields.Many2one('contabilidade.contas', string='Débito')
-    conta_credito_id = fields.Many2one('contabilidade.contas', string='Crédito')
-    debito = fields.Monetary(currency_field='currency_id', string='Débito')
-    credito = fields.Monetary(currency_field='currency_id', string='Crédito')
-    currency_id = fields.Many2one('res.currency', string='Moeda')
+            # memorizado na transação: onchange, depends e leitura fazem uma só consulta
+            totais, linhas = self.env['contabilidade.report.engine']._memorizar(
+                ('razao', wizard.conta_id.id, wizard.data_base, wizard.ancora_data, wizard.ancora_id,
+                 wizard.ancora_saldo, TAMANHO_PAGINA),
+                [self.env.user.id, False, 1],
+                lambda: wizard._consultar(TAMANHO_PAGINA + 1),
+            )
+            saldo_inicial_valor = totais['abertura']
+            saldo_final_valor = saldo_inicial_valor + totais['debito'] - totais['credito']
+            wizard.saldo_inicial_valor = saldo_inicial_valor
+            wizard.saldo_inicial = formatar_saldo(saldo_inicial_valor)
+            wizard.total_debito = totais['debito']
+            wizard.total_credito = totais['credito']
+            wizard.saldo_final = formatar_saldo(saldo_final_valor)
+
+            wizard.tem_proxima = len(linhas) > TAMANHO_PAGINA
+            linhas = linhas[:TAMANHO_PAGINA]
+            if linhas:
+                wizard.ultimo_data = linhas[-1]['data']
+                wizard.ultimo_id = linhas[-1]['id']
+                wizard.ultimo_saldo = linhas[-1]['saldo']
+            wizard.linhas_html = wizard._renderizar_linhas(linhas)
+
+    def _renderizar_linhas(self, linhas):
+        if not linhas:
+            return Markup('<p class="text-muted">%s</p>') % _("Nenhum lançamento para esta conta.")
+        corpo = Markup().join(
+            Markup(
+                '<tr><td>%s</td><td><a href="/web#model=contabilidade.livro.diario&amp;id=%s&amp;view_type=form">%s</a></td>'
+                '<td class="text-end">%s</td><td class="text-end">%s</td><td class="text-end">%s</td></tr>'
+            ) % (
+                linha['data'].strftime('%d/%m/%Y'),
+                linha['diario_id'],
+                linha['descricao'] or '',
+                f"{linha['debito']:,.2f}" if linha['debito'] else '',
+                f"{linha['credito']:,.2f}" if linha['credito'] else '',
+                formatar_saldo(linha['saldo']),
+            )
+            for linha in linhas
+        )
+        cabecalho = Markup(
+            '<thead><tr><th>%s</th><th>%s</th><th class="text-end">%s</th>'
+            '<th class="text-end">%s</th><th class="text-end">%s</th></tr></thead>'
+        ) % (_("Data"), _("Descrição"), _("Débito"), _("Crédito"), _("Saldo"))
+        return Markup('<table class="table table-sm o_list_table">%s<tbody>%s</tbody></table>') % (cabecalho, corpo)
+
+    def _reabrir(self):
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_proxima_pagina(self):
+        self.ensure_one()
+        if self.tem_proxima:
+            self.write({
+                'ancora_data': self.ultimo_data,
+                'ancora_id': self.ultimo_id,
+                'ancora_saldo': self.ultimo_saldo,
+                'pagina': self.pagina + 1,
+            })
+        return self._reabrir()
+
+    def action_pagina_anterior(self):
+        self.ensure_one()
+        if self.ancora_id:
+            data, partida_id, saldo = self._ancora_anterior()
+            self.write({
+                'ancora_data': data,
+                'ancora_id': partida_id,
+                'ancora_saldo': saldo,
+                'pagina': max(self.pagina - 1, 1),
+            })
+        return self._reabrir()
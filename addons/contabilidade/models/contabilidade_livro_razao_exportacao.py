@@ -0,0 +1,144 @@
+import csv
+import io
+import tempfile
+from datetime import timedelta
+
+import xlsxwriter
+
+from odoo import fields, models
+from odoo.exceptions import UserError
+
+# Linhas trazidas do servidor a cada FETCH do cursor
+ITERSIZE = 2000
+
+CABECALHO = ['Código', 'Conta', 'Data', 'Descrição', 'Débito', 'Crédito', 'Saldo']
+
+
+class ContabilidadeLivroRazaoExportacao(models.TransientModel):
+    _name = 'contabilidade.livro.razao.exportacao'
+    _description = 'Exportação do Livro Razão em lote'
+
+    conta_ids = fields.Many2many('contabilidade.contas', string='Contas', domain=[('sintetica', '=', False)],
+                                 help="Vazio = todas as contas.")
+    date_from = fields.Date(string='De', required=True)
+    date_to = fields.Date(string='Até', required=True)
+    formato = fields.Selection([
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel (XLSX)'),
+    ], string='Formato', required=True, default='xlsx')
+
+    def _contas(self):
+        self.ensure_one()
+        return self.conta_ids.sorted(lambda c: (c.codigo or '', c.id)) or \
+            self.env['contabilidade.contas'].search([('sintetica', '=', False)], order='codigo, id')
+
+    def _iterar_partidas(self, conta, user_ids):
+        """Partidas da conta no período, em ordem de (data, id), lidas aos lotes
+        por um cursor declarado no servidor.
+
+        O saldo acumulado de cada linha (sem a abertura) vem da soma em janela,
+        na mesma ordem da leitura.
+        """
+        self.ensure_one()
+        self.env['contabilidade.livro.diario.partida'].flush_model()
+        filtro, params = self.env['contabilidade.agregacao']._filtro_usuarios(user_ids, coluna='p.user_id')
+        cr = self.env.cr
+        cr.execute(f"""
+            DECLARE contabilidade_razao_exportacao NO SCROLL CURSOR FOR
+            SELECT p.data, d.descricao, p.debito, p.credito,
+                   SUM(p.debito - p.credito) OVER (ORDER BY p.data, p.id)
+              FROM contabilidade_livro_diario_partida p
+              JOIN contabilidade_livro_diario d ON d.id = p.diario_id
+             WHERE p.conta_id = %s AND {filtro}
+               AND p.data >= %s AND p.data <= %s
+             ORDER BY p.data, p.id
+        """, [conta.id, *params, self.date_from, self.date_to])
+        try:
+            while True:
+                cr.execute(f"FETCH {ITERSIZE} FROM contabilidade_razao_exportacao")
+                linhas = cr.fetchall()
+                if not linhas:
+                    break
+                yield from linhas
+        finally:
+            cr.execute("CLOSE contabilidade_razao_exportacao")
+
+    def _linhas(self):
+        """Linhas da exportação: por conta, saldo inicial, partidas com saldo e saldo final."""
+        self.ensure_one()
+        # mesmo escopo da regra de acesso do Livro Diário
+        user_ids = [self.env.user.id, False, 1]
+        contas = self._contas()
+        debit_map, credit_map = self.env['contabilidade.agregacao']._mapas_por_conta(
+            user_ids, date_to=self.date_from - timedelta(days=1), conta_ids=contas.ids,
+        )
+        abertura = {conta_id: debit_map.get(conta_id, 0.0) - credit_map.get(conta_id, 0.0) for conta_id in debit_map}
+
+        def secao(conta, partidas):
+            inicial = abertura.get(conta.id, 0.0)
+            saldo = inicial
+            cabecalho = [conta.codigo, conta.conta, self.date_from, 'Saldo inicial', None, None, inicial]
+            for data, descricao, debito, credito, acumulado in partidas:
+                if cabecalho:
+                    yield cabecalho
+                    cabecalho = None
+                saldo = inicial + acumulado
+                yield [conta.codigo, conta.conta, data, descricao, debito or None, credito or None, saldo]
+            if cabecalho:
+                if not inicial:
+                    # conta sem saldo nem movimento no período
+                    return
+                yield cabecalho
+            yield [conta.codigo, conta.conta, self.date_to, 'Saldo final', None, None, saldo]
+
+        for conta in contas:
+            yield from secao(conta, self._iterar_partidas(conta, user_ids))
+
+    def _gerar_arquivo(self):
+        """Grava a exportação num arquivo temporário e retorna ``(arquivo, nome, mimetype)``."""
+        self.ensure_one()
+        if self.date_from > self.date_to:
+            raise UserError("A data inicial deve ser anterior à data final.")
+        nome = f"livro_razao_{self.date_from:%Y%m%d}_{self.date_to:%Y%m%d}.{self.formato}"
+        arquivo = tempfile.TemporaryFile()
+        if self.formato == 'csv':
+            texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+            escritor = csv.writer(texto, delimiter=';')
+            escritor.writerow(CABECALHO)
+            for linha in self._linhas():
+                escritor.writerow(['' if valor is None else valor for valor in linha])
+            texto.flush()
+            texto.detach()
+            mimetype = 'text/csv'
+        else:
+            # constant_memory: cada linha vai para o disco assim que é escrita
+            livro = xlsxwriter.Workbook(arquivo, {'constant_memory': True, 'in_memory': False})
+            planilha = livro.add_worksheet('Livro Razão')
+            data_fmt = livro.add_format({'num_format': 'dd/mm/yyyy'})
+            valor_fmt = livro.add_format({'num_format': '#,##0.00'})
+            planilha.write_row(0, 0, CABECALHO, livro.add_format({'bold': True}))
+            for numero, linha in enumerate(self._linhas(), start=1):
+                codigo, conta, data, descricao, debito, credito, saldo = linha
+                planilha.write_string(numero, 0, codigo or '')
+                planilha.write_string(numero, 1, conta or '')
+                planilha.write_datetime(numero, 2, data, data_fmt)
+                planilha.write_string(numero, 3, descricao or '')
+                if debito is not None:
+                    planilha.write_number(numero, 4, debito, valor_fmt)
+                if credito is not None:
+                    planilha.write_number(numero, 5, credito, valor_fmt)
+                planilha.write_number(numero, 6, saldo, valor_fmt)
+            livro.close()
+            mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        arquivo.seek(0)
+        return arquivo, nome, mimetype
+
+    def action_exportar(self):
+        self.ensure_one()
+        if self.date_from > self.date_to:
+            raise UserError("A data inicial deve ser anterior à data final.")
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/contabilidade/razao/exportar/{self.id}',
+            'target': 'self',
+        }
@@ -0,0 +1,206 @@
+import base64
+import csv
+import io
+
+from odoo import fields, models
+from odoo.exceptions import UserError
+
+from .contabilidade_escopo import sql_escopo
+
+COLUNAS_OPCIONAIS = ('nome', 'email', 'senha')
+
+# Mensagens de erro guardadas no resultado; as demais só entram na contagem.
+MAX_ERROS_LOG = 200
+
+
+class ContabilidadeProvisionamentoWizard(models.TransientModel):
+    _name = 'contabilidade.provisionamento.wizard'
+    _description = 'Cadastro de alunos em lote'
+
+    arquivo = fields.Binary(string='Arquivo', required=True)
+    nome_arquivo = fields.Char(string='Nome do arquivo')
+    codificacao = fields.Selection([
+        ('utf-8-sig', 'UTF-8'),
+        ('cp1252', 'Windows-1252 / Latin-1'),
+    ], string='Codificação', required=True, default='utf-8-sig')
+    delimitador = fields.Char(string='Delimitador', size=1, default=';')
+
+    conta_modelo_ids = fields.Many2many(
+        'contabilidade.contas', string='Plano inicial',
+        domain=[('sintetica', '=', False), ('escopo', '=', 0)],
+        help="Contas compartilhadas copiadas para o plano de cada aluno, com o mesmo código e conta superior.",
+    )
+    data_abertura = fields.Date(string='Data de abertura')
+    valor_abertura = fields.Float(string='Valor de abertura', help="Vazio = sem lançamento de abertura.")
+    conta_abertura_debito_id = fields.Many2one('contabilidade.contas', string='Débito', domain=[('sintetica', '=', False)])
+    conta_abertura_credito_id = fields.Many2one('contabilidade.contas', string='Crédito', domain=[('sintetica', '=', False)])
+
+    state = fields.Selection([('rascunho', 'Rascunho'), ('concluido', 'Concluído')], default='rascunho')
+    total_criados = fields.Integer(string='Alunos cadastrados', readonly=True)
+    total_erros = fields.Integer(string='Linhas com erro', readonly=True)
+    log_erros = fields.Text(string='Erros', readonly=True)
+
+    # -------------------------------------------------------------------------
+    # Leitura do arquivo
+    # -------------------------------------------------------------------------
+    def _linhas_csv(self):
+        """``(numero, {'login', 'nome', 'email', 'senha'})`` de cada aluno do CSV."""
+        self.ensure_one()
+        texto = base64.b64decode(self.arquivo or b'').decode(self.codificacao, errors='replace')
+        leitor = csv.DictReader(io.StringIO(texto, newline=''), delimiter=self.delimitador or ';')
+        cabecalho = [(coluna or '').strip().lower() for coluna in (leitor.fieldnames or [])]
+        if 'login' not in cabecalho:
+            raise UserError("Coluna obrigatória ausente no CSV: login")
+        leitor.fieldnames = cabecalho
+        for linha in leitor:
+            yield leitor.line_num, {
+                'login': (linha['login'] or '').strip(),
+                **{coluna: (linha.get(coluna) or '').strip() for coluna in COLUNAS_OPCIONAIS},
+            }
+
+    def _validar_linhas(self, linhas, erros):
+        """Descarta logins vazios, repetidos no arquivo ou já cadastrados."""
+        alunos = {}
+        for numero, linha in linhas:
+            if not linha['login']:
+                erros.append((numero, "login vazio"))
+            elif linha['login'] in alunos:
+                erros.append((numero, "login '%s' repetido no arquivo" % linha['login']))
+            else:
+                alunos[linha['login']] = (numero, linha)
+
+        existentes = self.env['res.users'].with_context(active_test=False).search([('login', 'in', list(alunos))])
+        for login in existentes.mapped('login'):
+            numero, _linha = alunos.pop(login)
+            erros.append((numero, "login '%s' já cadastrado" % login))
+        return sorted(alunos.values(), key=lambda aluno: aluno[0])
+
+    # -------------------------------------------------------------------------
+    # Gravação
+    # -------------------------------------------------------------------------
+    def _criar_usuarios(self, alunos):
+        """Cria os usuários num único ``create``, já no grupo interno."""
+        grupo_interno = self.env.ref('base.group_user')
+        vals_list = []
+        for _numero, aluno in alunos:
+            vals = {
+                'login': aluno['login'],
+                'name': aluno['nome'] or aluno['login'],
+                'email': aluno['email'] or False,
+                'groups_id': [(6, 0, [grupo_interno.id])],
+            }
+            if aluno['senha']:
+                vals['password'] = aluno['senha']
+            vals_list.append(vals)
+        return self.env['res.users'].with_context(no_reset_password=True).create(vals_list)
+
+    def _copiar_plano(self, usuarios):
+        """Copia as contas do plano inicial para cada usuário, num único INSERT.
+
+        Cada cópia recebe um código novo no contador do aluno, para não
+        aparecer com o mesmo código e nome do modelo compartilhado. Retorna
+        ``{(user_id, conta_modelo_id): conta_id}``.
+        """
+        self.ensure_one()
+        modelos = self.conta_modelo_ids
+        if not modelos or not usuarios:
+            return {}
+        Conta = self.env['contabilidade.contas']
+        Sequencia = self.env['contabilidade.contas.sequencia']
+        modelos_por_prefixo = modelos.grouped(lambda m: Conta._prefixo_codigo(m.grupo_contabil, m.subgrupo1))
+        linhas = []
+        for usuario in usuarios:
+            for prefixo, grupo_modelos in modelos_por_prefixo.items():
+                ultimo = Sequencia._reservar(usuario.id, prefixo, len(grupo_modelos))
+                for numero, modelo in enumerate(grupo_modelos, start=ultimo - len(grupo_modelos) + 1):
+                    linhas.append((modelo.id, usuario.id, f"{prefixo}.{numero}"))
+
+        Conta.flush_model()
+        cr = self.env.cr
+        # o id da cópia sai da sequência antes do INSERT, para devolver o par
+        # (cópia, modelo) sem depender de colunas do modelo que não são únicas
+        cr.execute(f"""
+            WITH copias AS (
+                SELECT nextval(pg_get_serial_sequence('contabilidade_contas', 'id')) AS id,
+                       c.modelo_id, c.user_id, c.codigo
+                  FROM unnest(%s::int[], %s::int[], %s::varchar[]) AS c(modelo_id, user_id, codigo)
+            ), novas AS (
+                INSERT INTO contabilidade_contas
+                       (id, conta, codigo, name, descricao, grupo_contabil, subgrupo1, classificacao_dre,
+                        parent_id, sintetica, user_id, escopo,
+                        create_uid, create_date, write_uid, write_date)
+                SELECT c.id, m.conta, c.codigo, c.codigo || ' - ' || m.conta, m.descricao, m.grupo_contabil,
+                       m.subgrupo1, m.classificacao_dre, m.parent_id, FALSE, c.user_id, {sql_escopo('c.user_id')},
+                       %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+                  FROM copias c
+                  JOIN contabilidade_contas m ON m.id = c.modelo_id
+            )
+            SELECT id, user_id, modelo_id FROM copias
+        """, [
+            [modelo_id for modelo_id, _user_id, _codigo in linhas],
+            [user_id for _modelo_id, user_id, _codigo in linhas],
+            [codigo for _modelo_id, _user_id, codigo in linhas],
+            self.env.uid, self.env.uid,
+        ])
+        copias = cr.fetchall()
+        # parent_path das cópias: o do nó superior seguido do próprio id
+        cr.execute("""
+            UPDATE contabilidade_contas c
+               SET parent_path = COALESCE((SELECT p.parent_path FROM contabilidade_contas p WHERE p.id = c.parent_id), '')
+                                 || c.id || '/'
+             WHERE c.id IN %s
+        """, [tuple(conta_id for conta_id, _user_id, _modelo_id in copias)])
+        Conta.invalidate_model()
+        self.env['contabilidade.report.engine']._limpar_memoria()
+        return {(user_id, modelo_id): conta_id for conta_id, user_id, modelo_id in copias}
+
+    def _lancar_abertura(self, usuarios, contas):
+        """Um lançamento de abertura por usuário, gravado em lote pela carga rápida da importação."""
+        self.ensure_one()
+        if not self.valor_abertura or not usuarios:
+            return
+        debito = self.conta_abertura_debito_id.id
+        credito = self.conta_abertura_credito_id.id
+        currency_id = self.env.ref('base.BRL').id
+        lote = [(numero, {
+            'data': self.data_abertura,
+            'descricao': 'Saldo de abertura',
+            # a conta copiada para o usuário, se houver, no lugar da compartilhada
+            'conta_debito_id': contas.get((usuario.id, debito), debito),
+            'conta_credito_id': contas.get((usuario.id, credito), credito),
+            'valor': self.valor_abertura,
+            'currency_id': currency_id,
+            'user_id': usuario.id,
+        }) for numero, usuario in enumerate(usuarios, start=1)]
+        self.env['contabilidade.importacao.wizard']._copiar_lote(lote)
+
+    def action_provisionar(self):
+        self.ensure_one()
+        if self.valor_abertura and not (self.data_abertura and self.conta_abertura_debito_id and self.conta_abertura_credito_id):
+            raise UserError("Informe a data e as contas do lançamento de abertura.")
+        if self.valor_abertura < 0:
+            raise UserError("O valor de abertura deve ser positivo.")
+
+        erros = []
+        alunos = self._validar_linhas(self._linhas_csv(), erros)
+        usuarios = self._criar_usuarios(alunos)
+        contas = self._copiar_plano(usuarios)
+        self._lancar_abertura(usuarios, contas)
+
+        erros.sort()
+        mensagens = ["Linha %s: %s" % erro for erro in erros[:MAX_ERROS_LOG]]
+        if len(erros) > MAX_ERROS_LOG:
+            mensagens.append("... e mais %s linha(s) com erro." % (len(erros) - MAX_ERROS_LOG))
+        self.write({
+            'state': 'concluido',
+            'total_criados': len(usuarios),
+            'total_erros': len(erros),
+            'log_erros': "\n".join(mensagens),
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
@@ -0,0 +1,178 @@
+import copy
+import hashlib
+
+from odoo import api, fields, models
+from odoo.tools import split_every
+from odoo.tools.lru import LRU
+from odoo.tools.sql import create_unique_index
+
+# Resultados guardados por processo (todas as bases), descartando os menos usados
+TAMANHO_CACHE = 256
+
+_cache = LRU(TAMANHO_CACHE)
+
+
+class ContabilidadeDiarioVersao(models.Model):
+    _name = 'contabilidade.diario.versao'
+    _description = 'Versão do Livro Diário por usuário'
+
+    # Muda a cada alteração de saldos do usuário. Os valores vêm de uma
+    # sequência (não transacional): uma versão de uma transação desfeita
+    # nunca é reutilizada, então um resultado em cache nunca é lido como se
+    # fosse de outra versão. A linha ``geral`` muda com alterações que valem
+    # para todos (plano de contas, recálculo dos saldos) e entra na chave de
+    # todo resultado, inclusive de usuários que ainda não têm linha própria.
+    user_id = fields.Many2one('res.users', string='Usuário', readonly=True, ondelete='cascade')
+    geral = fields.Boolean(string='Geral', default=False, readonly=True)
+    versao = fields.Integer(string='Versão', readonly=True)
+
+    def init(self):
+        self._cr.execute("DROP INDEX IF EXISTS contabilidade_diario_versao_user_uniq")
+        create_unique_index(
+            self._cr, 'contabilidade_diario_versao_chave_uniq', self._table, ['(COALESCE(user_id, 0))', 'geral'],
+        )
+        self._cr.execute("CREATE SEQUENCE IF NOT EXISTS contabilidade_diario_versao_seq")
+
+    @api.model
+    def _incrementar(self, user_ids=None):
+        """Nova versão para cada usuário de ``user_ids`` (False = sem usuário); ``None`` = todos,
+        pela linha geral."""
+        uid = self.env.uid
+        if user_ids is None:
+            self.env.cr.execute("""
+                INSERT INTO contabilidade_diario_versao AS v
+                       (user_id, geral, versao, create_uid, create_date, write_uid, write_date)
+                VALUES (NULL, TRUE, nextval('contabilidade_diario_versao_seq'),
+                        %s, now() at time zone 'UTC', %s, now() at time zone 'UTC')
+                ON CONFLICT ((COALESCE(user_id, 0)), geral) DO UPDATE
+                   SET versao = EXCLUDED.versao,
+                       write_uid = EXCLUDED.write_uid,
+                       write_date = EXCLUDED.write_date
+            """, [uid, uid])
+        else:
+            for lote in split_every(1000, {user_id or None for user_id in user_ids}):
+                self.env.cr.execute(f"""
+                    INSERT INTO contabilidade_diario_versao AS v
+                           (user_id, geral, versao, create_uid, create_date, write_uid, write_date)
+                    SELECT u.user_id, FALSE, nextval('contabilidade_diario_versao_seq'),
+                           %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+                      FROM (VALUES {", ".join(["(%s::int)"] * len(lote))}) AS u(user_id)
+                    ON CONFLICT ((COALESCE(user_id, 0)), geral) DO UPDATE
+                       SET versao = EXCLUDED.versao,
+                           write_uid = EXCLUDED.write_uid,
+                           write_date = EXCLUDED.write_date
+                """, [uid, uid, *lote])
+        self.invalidate_model(['versao'])
+        self.env['contabilidade.report.engine']._limpar_memoria()
+
+    @api.model
+    def _versoes(self, user_ids):
+        """Versão geral seguida das versões dos usuários, na ordem de ``user_ids``
+        (0 = nunca alterado).
+
+        Lidas uma vez por transação: no REPEATABLE READ só as alterações da
+        própria transação mudam o que ela vê, e essas limpam a memória.
+        """
+        chaves = tuple(user_id or 0 for user_id in user_ids)
+        memoria = self.env['contabilidade.report.engine']._memoria()
+        if ('versoes', chaves) not in memoria:
+            self.env.cr.execute("""
+                SELECT geral, COALESCE(user_id, 0), versao
+                  FROM contabilidade_diario_versao
+                 WHERE geral OR COALESCE(user_id, 0) IN %s
+            """, [chaves or (0,)])
+            versoes = {}
+            geral = 0
+            for eh_geral, chave, versao in self.env.cr.fetchall():
+                if eh_geral:
+                    geral = versao
+                else:
+                    versoes[chave] = versao
+            memoria[('versoes', chaves)] = (geral, *(versoes.get(chave, 0) for chave in chaves))
+        return memoria[('versoes', chaves)]
+
+
+class ContabilidadeReportEngine(models.AbstractModel):
+    _name = 'contabilidade.report.engine'
+    _description = 'Saldos dos relatórios com cache por versão do Livro Diário'
+
+    # Os relatórios (DRE, Balanço) pedem os mesmos saldos a cada abertura e a
+    # cada filtro alterado. O resultado de cada consulta de
+    # ``contabilidade.agregacao`` fica num LRU, com a chave incluindo a versão
+    # do Livro Diário de cada usuário do escopo: qualquer lançamento muda a
+    # chave, e a entrada antiga só sai do cache por falta de uso.
+
+    # Dentro de uma transação (uma requisição), os assistentes recalculam os
+    # mesmos relatórios várias vezes: no onchange, pelo @api.depends e na
+    # leitura. ``_memorizar`` guarda o resultado de cada cálculo no cursor,
+    # pela chave (usuário, parâmetros, versões do Livro Diário), e o descarta
+    # no commit/rollback ou quando a transação altera lançamentos ou contas.
+
+    @api.model
+    def _memoria(self):
+        cr = self.env.cr
+        memoria = cr.cache.get('contabilidade_memoria')
+        if memoria is None:
+            memoria = cr.cache['contabilidade_memoria'] = {}
+            cr.postcommit.add(self._limpar_memoria)
+            cr.postrollback.add(self._limpar_memoria)
+        return memoria
+
+    @api.model
+    def _limpar_memoria(self):
+        self.env.cr.cache.pop('contabilidade_memoria', None)
+
+    @api.model
+    def _memorizar(self, chave, user_ids, calcular):
+        """Resultado de ``calcular()`` memorizado na transação; não deve ser alterado."""
+        chave = (self.env.uid, chave, self.env['contabilidade.diario.versao']._versoes(user_ids))
+        memoria = self._memoria()
+        if chave not in memoria:
+            memoria[chave] = calcular()
+        return memoria[chave]
+
+    @api.model
+    def _em_cache(self, metodo, user_ids, *args):
+        user_ids = tuple(user_ids)
+        chave = (
+            self.env.cr.dbname,
+            metodo,
+            user_ids,
+            tuple(tuple(arg) if isinstance(arg, list) else arg for arg in args),
+            self.env['contabilidade.diario.versao']._versoes(user_ids),
+        )
+        resultado = _cache.get(chave)
+        if resultado is None:
+            resultado = getattr(self.env['contabilidade.agregacao'], metodo)(list(user_ids), *args)
+            _cache[chave] = resultado
+        # os relatórios acumulam sobre os mapas recebidos
+        return copy.deepcopy(resultado)
+
+    @api.model
+    def _saldos(self, user_ids, date_from=None, date_to=None, conta_ids=None):
+        """``(debit_map, credit_map)`` por conta na janela; ver ``_mapas_por_conta``."""
+        return self._em_cache('_mapas_por_conta', user_ids, date_from, date_to, conta_ids)
+
+    @api.model
+    def _saldos_mes(self, user_ids, date_from, date_to, conta_ids=None):
+        """``{periodo: (debit_map, credit_map)}``; ver ``_mapas_por_conta_mes``."""
+        return self._em_cache('_mapas_por_conta_mes', user_ids, date_from, date_to, conta_ids)
+
+    @api.model
+    def _posicoes(self, user_ids, datas, conta_ids=None):
+        """``{data: (debit_map, credit_map)}``; ver ``_posicoes_por_conta``."""
+        return self._em_cache('_posicoes_por_conta', user_ids, list(datas), conta_ids)
+
+    @api.model
+    def _etag(self, *chave):
+        """ETag dos relatórios do usuário atual para ``chave`` (rota e parâmetros).
+
+        Muda com a versão do Livro Diário de qualquer usuário do escopo e com
+        o plano de contas: a última alteração (nomes e códigos das linhas) e a
+        quantidade de contas, que pega também as excluídas.
+        """
+        versoes = self.env['contabilidade.diario.versao']._versoes([self.env.uid, False, 1])
+        self.env['contabilidade.contas'].flush_model()
+        self.env.cr.execute("SELECT MAX(write_date), COUNT(*), MAX(id) FROM contabilidade_contas")
+        contas = self.env.cr.fetchone()
+        return hashlib.sha1(repr((self.env.uid, chave, versoes, contas)).encode()).hexdigest()
@@ -0,0 +1,105 @@
+from collections import defaultdict
+from datetime import date
+
+from odoo import api, fields, models
+from odoo.tools import split_every
+from odoo.tools.sql import create_index, create_unique_index
+
+from .contabilidade_escopo import sql_escopo
+
+
+class ContabilidadeSaldoMensal(models.Model):
+    _name = 'contabilidade.saldo.mensal'
+    _inherit = ['contabilidade.escopo.mixin']
+    _description = 'Saldo Mensal por Conta'
+    _order = 'periodo, conta_id'
+
+    # Mantido pelas partidas do Livro Diário na mesma transação dos
+    # lançamentos: uma linha por (usuário, conta, ano/mês), guardando o total
+    # de débitos e créditos.
+    user_id = fields.Many2one('res.users', string='Usuário', readonly=True, ondelete='cascade')
+    conta_id = fields.Many2one('contabilidade.contas', string='Conta', required=True, readonly=True, ondelete='cascade')
+    periodo = fields.Date(string='Mês', required=True, readonly=True, help="Primeiro dia do mês de referência.")
+    debito = fields.Float(string='Débitos', readonly=True)
+    credito = fields.Float(string='Créditos', readonly=True)
+
+    def init(self):
+        create_unique_index(
+            self._cr,
+            'contabilidade_saldo_mensal_chave_uniq',
+            self._table,
+            ['(COALESCE(user_id, 0))', 'conta_id', 'periodo'],
+        )
+        create_index(self._cr, 'contabilidade_saldo_mensal_user_id_periodo_idx', self._table, ['user_id', 'periodo'])
+        create_index(self._cr, 'contabilidade_saldo_mensal_escopo_periodo_idx', self._table, ['escopo', 'periodo'])
+
+    @staticmethod
+    def _inicio_mes(data):
+        return data.replace(day=1)
+
+    @api.model
+    def _aplicar_movimentos(self, movimentos, sinal=1):
+        """Soma (sinal=1) ou estorna (sinal=-1) movimentos nos saldos mensais.
+
+        ``movimentos`` é um iterável de tuplas
+        ``(user_id, conta_id, data, debito, credito)``.
+        """
+        deltas = defaultdict(lambda: [0.0, 0.0])
+        for user_id, conta_id, data, debito, credito in movimentos:
+            if not conta_id or not data:
+                continue
+            chave = (user_id or None, conta_id, self._inicio_mes(data))
+            deltas[chave][0] += sinal * (debito or 0.0)
+            deltas[chave][1] += sinal * (credito or 0.0)
+
+        if not deltas:
+            return
+
+        uid = self.env.uid
+        for lote in split_every(1000, deltas.items()):
+            params = []
+            for (user_id, conta_id, periodo), (debito, credito) in lote:
+                params.extend([user_id, conta_id, periodo, debito, credito])
+            valores = ", ".join(["(%s::int, %s::int, %s::date, %s::float8, %s::float8)"] * len(lote))
+            self.env.cr.execute(f"""
+                INSERT INTO contabilidade_saldo_mensal AS s
+                       (user_id, escopo, conta_id, periodo, debito, credito,
+                        create_uid, create_date, write_uid, write_date)
+                SELECT v.user_id, {sql_escopo('v.user_id')}, v.conta_id, v.periodo, v.debito, v.credito,
+                       %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+                  FROM (VALUES {valores}) AS v(user_id, conta_id, periodo, debito, credito)
+                ON CONFLICT ((COALESCE(user_id, 0)), conta_id, periodo) DO UPDATE
+                   SET debito = s.debito + EXCLUDED.debito,
+                       credito = s.credito + EXCLUDED.credito,
+                       write_uid = EXCLUDED.write_uid,
+                       write_date = EXCLUDED.write_date
+            """, [uid, uid, *params])
+
+        self.invalidate_model(['debito', 'credito'])
+
+        # índices mensais do mês mais antigo alterado em diante
+        periodos = {}
+        for user_id, _conta_id, periodo in deltas:
+            periodos[user_id] = min(periodo, periodos.get(user_id, periodo))
+        self.env['contabilidade.indicador.mensal']._invalidar(periodos)
+        self.env['contabilidade.diario.versao']._incrementar(list(periodos))
+
+    @api.model
+    def _reconstruir(self):
+        """Recalcula todos os saldos mensais a partir das partidas do Livro Diário."""
+        self.env['contabilidade.livro.diario.partida'].flush_model()
+        cr = self.env.cr
+        cr.execute("DELETE FROM contabilidade_saldo_mensal")
+        cr.execute(f"""
+            INSERT INTO contabilidade_saldo_mensal
+                   (user_id, escopo, conta_id, periodo, debito, credito,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT user_id, {sql_escopo('user_id')}, conta_id, date_trunc('month', data)::date, SUM(debito), SUM(credito),
+                   %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+              FROM contabilidade_livro_diario_partida
+             GROUP BY user_id, conta_id, date_trunc('month', data)
+        """, [self.env.uid, self.env.uid])
+        self.invalidate_model()
+        self.env['contabilidade.indicador.mensal']._invalidar({None: date.min})
+        self.env['contabilidade.diario.versao']._incrementar()
+        return True
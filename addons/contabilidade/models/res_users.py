@@ -3,18 +3,19 @@ from odoo import api, models
 class ResUsers(models.Model):
     _inherit = "res.users"
 
-    @api.model
-    def create(self, vals):
-        user = super().create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        users = super().create(vals_list)
 
-        # Detecta se foi criado como portal
+        # Detecta os criados como portal
         portal_group = self.env.ref("base.group_portal")
         internal_group = self.env.ref("base.group_user")
 
-        if portal_group in user.groups_id and internal_group not in user.groups_id:
-            # Remove portal e adiciona interno
-            user.write({
+        portais = users.filtered(lambda user: portal_group in user.groups_id and internal_group not in user.groups_id)
+        if portais:
+            # Remove portal e adiciona interno, numa única escrita para o lote
+            portais.write({
                 'groups_id': [(3, portal_group.id), (4, internal_group.id)]
             })
 
-        return user
+        return users
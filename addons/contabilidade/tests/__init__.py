@@ -0,0 +1,19 @@
+from . import test_saldo_mensal
+from . import test_agregacao
+from . import test_importacao
+from . import test_lancamento_composto
+from . import test_fechamento
+from . import test_particionamento
+from . import test_livro_razao
+from . import test_livro_razao_exportacao
+from . import test_dre_colunas
+from . import test_balanco_tendencia
+from . import test_plano_contas
+from . import test_indicador_mensal
+from . import test_report_engine
+from . import test_contas
+from . import test_busca_contas
+from . import test_escopo
+from . import test_provisionamento
+from . import test_api_relatorios
+from . import test_api_lancamentos
@@ -0,0 +1,25 @@
+from odoo.tests.common import TransactionCase
+
+
+class ContabilidadeCase(TransactionCase):
+    """Base dos testes: uma conta de banco, uma de receita e um atalho para lançar."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Conta = cls.env['contabilidade.contas']
+        cls.banco = Conta.create({'conta': 'Banco Teste', 'grupo_contabil': 'circulante'})
+        cls.receita = Conta.create({'conta': 'Vendas Teste', 'grupo_contabil': 'receitas'})
+        cls.Diario = cls.env['contabilidade.livro.diario']
+        cls.Agregacao = cls.env['contabilidade.agregacao']
+
+    @classmethod
+    def _lancar(cls, data, valor, debito=None, credito=None, descricao='Venda'):
+        """Lançamento simples; por padrão debita o banco e credita a receita."""
+        return cls.Diario.create({
+            'data': data,
+            'descricao': descricao,
+            'conta_debito_id': (debito or cls.banco).id,
+            'conta_credito_id': (credito or cls.receita).id,
+            'valor': valor,
+        })
@@ -0,0 +1,41 @@
+from datetime import date
+
+from .common import ContabilidadeCase
+
+
+class TestAgregacao(ContabilidadeCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for dia, valor in ((date(2025, 1, 10), 100.0), (date(2025, 2, 15), 40.0), (date(2025, 3, 3), 7.0)):
+            cls._lancar(dia, valor)
+
+    def _debito(self, date_from=None, date_to=None):
+        debit_map, _credit_map = self.Agregacao._mapas_por_conta([self.env.user.id], date_from, date_to)
+        return debit_map.get(self.banco.id, 0.0)
+
+    def test_dividir_janela(self):
+        dividir = self.Agregacao._dividir_janela
+        self.assertEqual(
+            dividir(date(2025, 1, 15), date(2025, 3, 10)),
+            (date(2025, 2, 1), date(2025, 3, 1), [(date(2025, 1, 15), date(2025, 1, 31)), (date(2025, 3, 1), date(2025, 3, 10))]),
+        )
+        self.assertEqual(dividir(date(2025, 1, 1), date(2025, 1, 31)), (date(2025, 1, 1), date(2025, 2, 1), []))
+        self.assertEqual(dividir(date(2025, 1, 15), date(2025, 1, 20)), (False, False, [(date(2025, 1, 15), date(2025, 1, 20))]))
+
+    def test_janelas(self):
+        """Meses completos e pontas parciais somam o mesmo que o Livro Diário."""
+        self.assertEqual(self._debito(), 147.0)
+        self.assertEqual(self._debito(date(2025, 1, 11)), 47.0)
+        self.assertEqual(self._debito(date_to=date(2025, 2, 14)), 100.0)
+        self.assertEqual(self._debito(date(2025, 2, 1), date(2025, 2, 28)), 40.0)
+        self.assertEqual(self._debito(date(2025, 1, 10), date(2025, 3, 2)), 140.0)
+
+    def test_posicoes_por_conta(self):
+        """Várias datas de corte numa consulta batem com o acumulado de cada data."""
+        datas = [date(2025, 1, 31), date(2025, 2, 20), date(2025, 3, 31)]
+        posicoes = self.Agregacao._posicoes_por_conta([self.env.user.id], datas)
+        self.assertEqual([posicoes[data][0].get(self.banco.id, 0.0) for data in datas], [100.0, 140.0, 147.0])
+        for data in datas:
+            self.assertEqual(posicoes[data][1].get(self.receita.id, 0.0), self._debito(date_to=data))
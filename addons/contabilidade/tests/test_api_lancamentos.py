@@ -0,0 +1,59 @@
+import io
+import json
+from datetime import date
+
+from odoo.tests.common import HttpCase, tagged
+
+from odoo.addons.contabilidade.controllers.main import ContabilidadeController
+
+from .common import ContabilidadeCase
+
+
+@tagged('post_install', '-at_install')
+class TestApiLancamentos(HttpCase, ContabilidadeCase):
+
+    def _corpo(self, *linhas):
+        return "\n".join(linha if isinstance(linha, str) else json.dumps(linha) for linha in linhas).encode()
+
+    def test_resultado_por_linha(self):
+        """Linhas válidas são gravadas em lote; as inválidas voltam com o erro, sem abortar as demais."""
+        venda = {'data': '2025-04-10', 'descricao': 'Venda NDJSON', 'valor': 150.5,
+                 'conta_debito': self.banco.codigo, 'conta_credito': self.receita.codigo}
+        corpo = self._corpo(
+            venda,
+            '{quebrado',
+            '',
+            dict(venda, conta_debito='9.9.99'),
+            dict(venda, valor='1.000,00'),
+        )
+        erros = {}
+        registros = ContabilidadeController._registros_ndjson(io.BytesIO(corpo), erros)
+        erros.update(self.env['contabilidade.importacao.wizard']._importar_registros(registros, tamanho_lote=2))
+
+        self.assertEqual(sorted(erros), [2, 4])
+        self.assertIn("JSON inválido", erros[2])
+        self.assertIn("9.9.99", erros[4])
+        lancamentos = self.env['contabilidade.livro.diario'].search([('descricao', '=', 'Venda NDJSON')])
+        self.assertEqual(sorted(lancamentos.mapped('valor')), [150.5, 1000.0])
+        debit_map, _credit_map = self.env['contabilidade.agregacao']._mapas_por_conta(
+            [self.env.uid], date(2025, 4, 1), date(2025, 4, 30),
+        )
+        self.assertAlmostEqual(debit_map[self.banco.id], 1150.5)
+        # a carga rápida registra as contas usadas, como o create() das partidas
+        self.assertIn(self.banco.id, self.env['contabilidade.contas.uso']._recentes())
+
+    def test_sem_chave(self):
+        """Sem chave de API válida a requisição é recusada."""
+        for headers in ({}, {'Authorization': 'Bearer chave-invalida'}):
+            resposta = self.url_open('/contabilidade/api/lancamentos', data=self._corpo({}), headers=headers)
+            self.assertEqual(resposta.status_code, 401)
+
+    def test_sem_permissao(self):
+        """Uma chave válida de usuário sem acesso ao Livro Diário recebe 403."""
+        usuario = self.env['res.users'].create({'login': 'portal_ndjson', 'name': 'Portal NDJSON'})
+        usuario.groups_id = [(6, 0, [self.env.ref('base.group_portal').id])]
+        chave = self.env['res.users.apikeys'].with_user(usuario)._generate('rpc', 'NDJSON')
+        resposta = self.url_open(
+            '/contabilidade/api/lancamentos', data=self._corpo({}), headers={'Authorization': f'Bearer {chave}'},
+        )
+        self.assertEqual(resposta.status_code, 403)
@@ -0,0 +1,72 @@
+from datetime import date
+
+from odoo.tests.common import HttpCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestApiRelatorios(HttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        admin = cls.env.ref('base.user_admin')
+        Conta = cls.env['contabilidade.contas'].with_user(admin)
+        cls.banco = Conta.create({'conta': 'Banco API', 'grupo_contabil': 'circulante'})
+        cls.receita = Conta.create({'conta': 'Vendas API', 'grupo_contabil': 'receitas'})
+        cls.Diario = cls.env['contabilidade.livro.diario'].with_user(admin)
+        cls.Diario.create({
+            'data': date(2025, 3, 10),
+            'descricao': 'Venda API',
+            'conta_debito_id': cls.banco.id,
+            'conta_credito_id': cls.receita.id,
+            'valor': 300.0,
+        })
+
+    def test_dre_igual_ao_assistente(self):
+        """A API devolve os mesmos totais e linhas do assistente da DRE."""
+        Dre = self.env['contabilidade.dre.wizard'].with_user(self.env.ref('base.user_admin'))
+        dados = Dre.new({'year': '2025', 'month': '3', 'currency_id': self.env.company.currency_id.id})._dados_api()
+        wizard = Dre.create({'year': '2025', 'month': '3'})
+        self.assertEqual(dados['titulos'], ['Mar/2025'])
+        self.assertEqual(dados['totais'][0]['receita_bruta'], wizard.receita_bruta)
+        self.assertEqual(dados['totais'][0]['lucro_liquido'], wizard.lucro_liquido)
+        self.assertEqual([linha['name'] for linha in dados['linhas']], wizard.line_ids.mapped('name'))
+
+    def test_etag(self):
+        """Sem lançamentos novos a mesma consulta responde 304; um lançamento muda o ETag."""
+        self.authenticate('admin', 'admin')
+        url = '/contabilidade/api/dre?year=2025&month=3'
+        resposta = self.url_open(url)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['totais'][0]['receita_bruta'], 300.0)
+        etag = resposta.headers['ETag']
+
+        resposta = self.url_open(url, headers={'If-None-Match': etag})
+        self.assertEqual(resposta.status_code, 304)
+
+        self.Diario.create({
+            'data': date(2025, 3, 20),
+            'descricao': 'Outra venda API',
+            'conta_debito_id': self.banco.id,
+            'conta_credito_id': self.receita.id,
+            'valor': 50.0,
+        })
+        resposta = self.url_open(url, headers={'If-None-Match': etag})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotEqual(resposta.headers['ETag'], etag)
+        self.assertEqual(resposta.json()['totais'][0]['receita_bruta'], 350.0)
+
+    def test_balanco_e_indicadores(self):
+        self.authenticate('admin', 'admin')
+        balanco = self.url_open('/contabilidade/api/balanco?year=2025&month=3').json()
+        self.assertEqual(balanco['anterior'], '2025-02-01')
+        self.assertEqual(balanco['totais']['total_ativo_recent'], balanco['totais']['total_passivo_pl_recent'])
+        self.assertIn(self.banco.id, [linha['conta_id'] for linha in balanco['linhas']])
+
+        indicadores = self.url_open('/contabilidade/api/indicadores?year=2025&month=3').json()
+        self.assertEqual(indicadores['periodo'], '2025-03-01')
+        self.assertIn('liq_corrente', indicadores)
+        # o GET não grava a série; ela continua a cargo do cron
+        self.assertFalse(self.env['contabilidade.indicador.mensal'].search_count([('periodo', '=', date(2025, 3, 1))]))
+
+        self.assertEqual(self.url_open('/contabilidade/api/dre?month=13').status_code, 400)
@@ -0,0 +1,58 @@
+from datetime import date
+
+from .common import ContabilidadeCase
+
+
+class TestBalancoTendencia(ContabilidadeCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.capital = cls.env['contabilidade.contas'].create({'conta': 'Capital Tendência', 'grupo_contabil': 'patrimonio'})
+        cls._lancar(date(2024, 11, 5), 100.0, credito=cls.capital)
+        cls._lancar(date(2025, 1, 10), 50.0)
+        cls._lancar(date(2025, 3, 10), 150.0)
+
+    def _wizard(self, **vals):
+        return self.env['contabilidade.balanco.patrimonial.wizard'].create(dict({
+            'modo': 'tendencia',
+            'month_recent': '3',
+            'year_recent': '2025',
+            'quantidade_meses': '6',
+        }, **vals))
+
+    def test_saldos_acumulados_e_ah(self):
+        meses, linhas = self._wizard()._estrutura_tendencia()
+        self.assertEqual(meses[0], date(2024, 10, 1))
+        banco = next(linha for linha in linhas if linha['conta_id'] == self.banco.id)
+        self.assertEqual(banco['saldos'], [0.0, 100.0, 100.0, 150.0, 150.0, 300.0])
+        self.assertEqual(banco['ah'][:3], [False, False, 0.0])
+        self.assertEqual(banco['ah'][-1], 1.0)
+        self.assertEqual(banco['av'][-1], 1.0)
+
+        lucros = next(linha for linha in linhas if linha['name'] == 'Lucros/Prejuízos Acumulados')
+        self.assertEqual(lucros['saldos'][-1], 200.0)
+
+        _meses, linhas = self._wizard(ah_modo='base')._estrutura_tendencia()
+        banco = next(linha for linha in linhas if linha['conta_id'] == self.banco.id)
+        self.assertEqual(banco['ah'][-1], False)
+
+    def test_parte_do_fechamento(self):
+        """Os meses a partir do fechamento vêm do snapshot, sem ler os saldos mensais anteriores."""
+        self.env['contabilidade.fechamento'].create({'data': date(2025, 1, 31)})
+        self.env.flush_all()
+        self.env.cr.execute("""
+            UPDATE contabilidade_saldo_mensal SET debito = debito + 500
+             WHERE conta_id = %s AND periodo < %s
+        """, [self.banco.id, date(2025, 2, 1)])
+        # nova versão: não reaproveita o resultado em cache dos outros testes
+        self.env['contabilidade.diario.versao']._incrementar([self.env.uid])
+        _meses, linhas = self._wizard()._estrutura_tendencia()
+        banco = next(linha for linha in linhas if linha['conta_id'] == self.banco.id)
+        self.assertEqual(banco['saldos'][-3:], [150.0, 150.0, 300.0])
+
+    def test_celulas(self):
+        wizard = self._wizard()
+        wizard.action_abrir_tendencia()
+        self.assertEqual(len(wizard.tendencia_ids.filtered(lambda c: c.conta_id == self.banco)), 6)
+        self.assertFalse(wizard.tendencia_ids.filtered(lambda c: c.display_type != 'line'))
@@ -0,0 +1,44 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestBuscaContas(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # sem o histórico de uso deixado pelos dados de demonstração
+        cls.env.cr.execute("DELETE FROM contabilidade_contas_uso")
+        Conta = cls.env['contabilidade.contas']
+        cls.contas = Conta.create([
+            {'conta': 'Busca Alfa', 'grupo_contabil': 'circulante'},
+            {'conta': 'Busca Beta', 'grupo_contabil': 'circulante'},
+            {'conta': 'Receita Busca Alfa', 'grupo_contabil': 'receitas'},
+        ])
+
+    def _busca(self, texto):
+        ids = [conta_id for conta_id, _nome in self.env['contabilidade.contas'].name_search(texto, limit=100)]
+        return self.env['contabilidade.contas'].browse(ids)
+
+    def test_prefixo_codigo(self):
+        """Um início de código lista só as contas do prefixo, em ordem de código."""
+        encontradas = self._busca('1.0.')
+        self.assertIn(self.contas[0], encontradas)
+        self.assertNotIn(self.contas[2], encontradas)
+        self.assertTrue(all(conta.codigo.startswith('1.0.') for conta in encontradas))
+        self.assertEqual(encontradas.mapped('codigo'), sorted(encontradas.mapped('codigo')))
+
+    def test_recentes_primeiro(self):
+        """As contas usadas por último nos lançamentos vêm antes das demais."""
+        self.assertEqual(self._busca('Busca'), self.contas)
+
+        self.env['contabilidade.livro.diario'].create({
+            'data': '2024-03-10',
+            'descricao': 'Transferência',
+            'conta_debito_id': self.contas[1].id,
+            'conta_credito_id': self.contas[2].id,
+            'valor': 10.0,
+        })
+        encontradas = self._busca('Busca')
+        self.assertEqual(set(encontradas[:2]), set(self.contas[1:]))
+        self.assertEqual(encontradas[2], self.contas[0])
+        self.assertEqual(self._busca('Alfa')[0], self.contas[2])
@@ -0,0 +1,33 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestContas(TransactionCase):
+
+    def test_codigos_em_lote(self):
+        """Um create em lote gera códigos seguidos, sem repetir, em ordem numérica."""
+        Conta = self.env['contabilidade.contas']
+        Conta.create({'conta': 'Manual', 'codigo': '2.3.9', 'grupo_contabil': 'nao_circulante', 'subgrupo1': 'intangivel'})
+        contas = Conta.create([
+            {'conta': f'Intangível {n}', 'grupo_contabil': 'nao_circulante', 'subgrupo1': 'intangivel'}
+            for n in range(3)
+        ] + [{'conta': 'Receita Lote', 'grupo_contabil': 'receitas'}])
+        self.assertEqual(contas[:3].mapped('codigo'), ['2.3.10', '2.3.11', '2.3.12'])
+        self.assertTrue(contas[3].codigo.startswith('7.0.'))
+        self.assertEqual(contas[0].name, '2.3.10 - Intangível 0')
+
+        seguinte = Conta.create({'conta': 'Depois', 'grupo_contabil': 'nao_circulante', 'subgrupo1': 'intangivel'})
+        self.assertEqual(seguinte.codigo, '2.3.13')
+
+    def test_contador_por_escopo(self):
+        """Contas sem dono e do usuário 1 dividem o mesmo contador."""
+        Sequencia = self.env['contabilidade.contas.sequencia']
+        primeiro = Sequencia._reservar(False, '9.9', 1)
+        self.assertEqual(Sequencia._reservar(1, '9.9', 1), primeiro + 1)
+        self.assertEqual(Sequencia.search_count([('prefixo', '=', '9.9')]), 1)
+
+    def test_escrita_em_lote(self):
+        """Renomear várias contas de uma vez recalcula o nome de todas."""
+        Conta = self.env['contabilidade.contas']
+        contas = Conta.create([{'conta': f'Caixa {n}', 'grupo_contabil': 'circulante'} for n in range(3)])
+        contas.write({'conta': 'Caixa Geral', 'descricao': 'lote'})
+        self.assertEqual(contas.mapped('name'), [f'{conta.codigo} - Caixa Geral' for conta in contas])
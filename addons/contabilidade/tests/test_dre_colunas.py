@@ -0,0 +1,61 @@
+from datetime import date
+
+from .common import ContabilidadeCase
+
+
+class TestDreColunas(ContabilidadeCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.cmv = cls.env['contabilidade.contas'].create({'conta': 'CMV DRE', 'grupo_contabil': 'despesa'})
+        cls._lancar(date(2024, 12, 5), 50.0)
+        cls._lancar(date(2025, 2, 10), 100.0)
+        cls._lancar(date(2025, 3, 12), 200.0)
+        cls._lancar(date(2025, 3, 15), 80.0, debito=cls.cmv, credito=cls.banco)
+
+    def _wizard(self, **vals):
+        return self.env['contabilidade.dre.wizard'].create(dict({'month': '3', 'year': '2025'}, **vals))
+
+    def test_colunas_batem_com_mes_a_mes(self):
+        colunas = self._wizard(modo='colunas', quantidade_meses=3)
+        contas = colunas._classificar_contas()
+        titulos, valores = colunas._colunas_mensais(contas, [self.env.uid], date(2025, 3, 31))
+        self.assertEqual(titulos, ['Jan/2025', 'Fev/2025', 'Mar/2025', 'Acumulado 2025'])
+        self.assertEqual([v['receita_bruta'] for v, _d, _c in valores], [0.0, 100.0, 200.0, 300.0])
+        self.assertEqual(valores[2][0]['lucro_bruto'], 120.0)
+        self.assertEqual(valores[3][0]['custo_atual'], 80.0)
+
+        for mes, coluna in ((2, valores[1][0]), (3, valores[2][0])):
+            mensal = self._wizard(month=str(mes))
+            self.assertEqual(mensal.receita_bruta, coluna['receita_bruta'])
+            self.assertEqual(mensal.lucro_liquido, coluna['lucro_liquido'])
+
+        self.assertEqual(colunas.lucro_liquido, valores[2][0]['lucro_liquido'])
+        self.assertIn('Acumulado 2025', colunas.colunas_html)
+
+    def test_analise_vertical(self):
+        wizard = self._wizard()
+        linhas = {linha.name: linha.av_percent for linha in wizard.line_ids}
+        self.assertEqual(linhas['TOTAL - Receita Líquida'], 1.0)
+        self.assertEqual(linhas['LUCRO BRUTO'], 0.6)
+        layout = wizard._linhas_dre(*self._colunas(wizard))
+        lucro = next(linha for linha in layout if linha['name'] == 'LUCRO BRUTO')
+        self.assertEqual(lucro['av'], [0.0, 1.0, 0.6, 220.0 / 300.0])
+
+    def _colunas(self, wizard):
+        wizard.quantidade_meses = 3
+        contas = wizard._classificar_contas()
+        _titulos, colunas = wizard._colunas_mensais(contas, [self.env.uid], date(2025, 3, 31))
+        return contas, colunas
+
+    def test_classificacao_dre(self):
+        Conta = self.env['contabilidade.contas']
+        self.assertEqual(self.cmv.classificacao_dre, 'custo')
+        self.assertEqual(self.receita.classificacao_dre, 'receita')
+        self.assertFalse(self.banco.classificacao_dre)
+        comissoes = Conta.create({'conta': 'Comissões', 'grupo_contabil': 'despesa'})
+        self.assertEqual(comissoes.classificacao_dre, 'despesa_operacional')
+        comissoes.conta = 'Despesas Financeiras'
+        self.assertEqual(comissoes.classificacao_dre, 'despesa_financeira')
+        self.assertIn(comissoes, self._wizard()._classificar_contas()['despesa_financeira'])
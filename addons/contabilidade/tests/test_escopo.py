@@ -0,0 +1,41 @@
+from odoo.tests.common import TransactionCase, new_test_user
+
+
+class TestEscopo(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.aluno_a = new_test_user(cls.env, login='escopo_a', groups='base.group_user')
+        cls.aluno_b = new_test_user(cls.env, login='escopo_b', groups='base.group_user')
+        Conta = cls.env['contabilidade.contas']
+        cls.compartilhada = Conta.create({'conta': 'Caixa Comum', 'grupo_contabil': 'circulante', 'user_id': False})
+        cls.conta_a = Conta.with_user(cls.aluno_a).create({'conta': 'Banco A', 'grupo_contabil': 'circulante'})
+        cls.conta_b = Conta.with_user(cls.aluno_b).create({'conta': 'Banco B', 'grupo_contabil': 'circulante'})
+
+    def test_escopo_calculado(self):
+        """Sem usuário ou do usuário 1 é compartilhado (0); os demais levam o próprio usuário."""
+        self.assertEqual(self.compartilhada.escopo, 0)
+        self.assertEqual(self.conta_a.escopo, self.aluno_a.id)
+        self.conta_a.user_id = 1
+        self.assertEqual(self.conta_a.escopo, 0)
+
+    def test_regra_de_acesso(self):
+        """Cada usuário vê as próprias linhas e as compartilhadas, nunca as de outro usuário."""
+        visiveis = self.env['contabilidade.contas'].with_user(self.aluno_a).search([])
+        self.assertIn(self.conta_a, visiveis)
+        self.assertIn(self.compartilhada, visiveis)
+        self.assertNotIn(self.conta_b, visiveis)
+
+        lancamento = self.env['contabilidade.livro.diario'].with_user(self.aluno_b).create({
+            'data': '2024-05-02',
+            'descricao': 'Depósito',
+            'conta_debito_id': self.conta_b.id,
+            'conta_credito_id': self.compartilhada.id,
+            'valor': 50.0,
+        })
+        self.assertEqual(lancamento.partida_ids.mapped('escopo'), [self.aluno_b.id] * 2)
+        self.assertFalse(self.env['contabilidade.livro.diario'].with_user(self.aluno_a).search([('id', '=', lancamento.id)]))
+        self.assertFalse(self.env['contabilidade.saldo.mensal'].with_user(self.aluno_a).search([('user_id', '=', self.aluno_b.id)]))
+        saldos = self.env['contabilidade.saldo.mensal'].with_user(self.aluno_b).search([('user_id', '=', self.aluno_b.id)])
+        self.assertEqual(set(saldos.mapped('escopo')), {self.aluno_b.id})
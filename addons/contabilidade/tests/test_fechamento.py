@@ -0,0 +1,83 @@
+from odoo.exceptions import AccessError, UserError
+from odoo.tests.common import new_test_user
+from datetime import date
+
+from .common import ContabilidadeCase
+
+
+class TestFechamento(ContabilidadeCase):
+
+    def test_bloqueio_e_snapshot(self):
+        antigo = self._lancar(date(2025, 1, 10), 100.0)
+        fechamento = self.env['contabilidade.fechamento'].create({'data': date(2025, 1, 31)})
+        saldo = fechamento.saldo_ids.filtered(lambda s: s.conta_id == self.banco)
+        self.assertEqual(saldo.debito, 100.0)
+
+        with self.assertRaises(UserError):
+            antigo.valor = 50.0
+        with self.assertRaises(UserError):
+            antigo.unlink()
+        with self.assertRaises(UserError):
+            self._lancar(date(2025, 1, 20), 10.0)
+
+        self._lancar(date(2025, 2, 5), 40.0)
+        debit_map, _credit_map = self.Agregacao._mapas_por_conta([self.env.uid], date_to=date(2025, 2, 28))
+        self.assertEqual(debit_map[self.banco.id], 140.0)
+
+        # o acumulado passa a vir do snapshot, não mais dos lançamentos antigos
+        saldo.debito = 1000.0
+        debit_map, _credit_map = self.Agregacao._mapas_por_conta([self.env.uid], date_to=date(2025, 2, 28))
+        self.assertEqual(debit_map[self.banco.id], 1040.0)
+
+    def test_reabrir(self):
+        lanc = self._lancar(date(2025, 3, 10), 100.0)
+        primeiro = self.env['contabilidade.fechamento'].create({'data': date(2025, 3, 31)})
+        segundo = self.env['contabilidade.fechamento'].create({'data': date(2025, 4, 30)})
+        with self.assertRaises(UserError):
+            primeiro.action_reabrir()
+        segundo.action_reabrir()
+        primeiro.action_reabrir()
+        lanc.valor = 80.0
+        self.assertEqual(sum(lanc.partida_ids.mapped('debito')), 80.0)
+
+    def test_posicoes_a_partir_do_fechamento(self):
+        """As posições do Balanço partem do fechamento: as linhas anteriores a ele não são lidas."""
+        self._lancar(date(2025, 1, 10), 100.0)
+        self.env['contabilidade.fechamento'].create({'data': date(2025, 1, 31)})
+        self._lancar(date(2025, 2, 5), 40.0)
+
+        # saldos mensais e partidas de antes do fechamento deixam de bater com o snapshot
+        self.env.flush_all()
+        self.env.cr.execute("""
+            UPDATE contabilidade_saldo_mensal SET debito = debito + 500
+             WHERE conta_id = %s AND periodo < %s
+        """, [self.banco.id, date(2025, 2, 1)])
+        self.env.cr.execute("""
+            UPDATE contabilidade_livro_diario_partida SET debito = debito + 500
+             WHERE conta_id = %s AND data <= %s AND debito > 0
+        """, [self.banco.id, date(2025, 1, 31)])
+
+        posicoes = self.Agregacao._posicoes_por_conta([self.env.uid], [date(2025, 1, 31), date(2025, 2, 10)])
+        self.assertEqual(posicoes[date(2025, 1, 31)][0][self.banco.id], 100.0)
+        self.assertEqual(posicoes[date(2025, 2, 10)][0][self.banco.id], 140.0)
+
+    def test_saldos_so_do_dono(self):
+        """Os saldos congelados só são lidos pelo dono do fechamento e não são gravados à mão."""
+        aluno = new_test_user(self.env, login='fechamento_aluno', groups='base.group_user')
+        outro = new_test_user(self.env, login='fechamento_outro', groups='base.group_user')
+        self.Diario.with_user(aluno).create({
+            'data': date(2025, 1, 10),
+            'descricao': 'Venda',
+            'conta_debito_id': self.banco.id,
+            'conta_credito_id': self.receita.id,
+            'valor': 100.0,
+        })
+        fechamento = self.env['contabilidade.fechamento'].with_user(aluno).create({'data': date(2025, 1, 31)})
+        self.assertTrue(fechamento.saldo_ids)
+
+        Saldo = self.env['contabilidade.fechamento.saldo']
+        self.assertFalse(Saldo.with_user(outro).search([('fechamento_id', '=', fechamento.id)]))
+        with self.assertRaises(AccessError):
+            Saldo.with_user(outro).browse(fechamento.saldo_ids.ids).read(['debito'])
+        with self.assertRaises(AccessError):
+            Saldo.with_user(aluno).create({'fechamento_id': fechamento.id, 'conta_id': self.banco.id, 'debito': 1.0})
@@ -0,0 +1,79 @@
+import base64
+import io
+from datetime import date
+
+from odoo.exceptions import ValidationError
+
+from .common import ContabilidadeCase
+
+
+class TestImportacao(ContabilidadeCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Wizard = cls.env['contabilidade.importacao.wizard']
+
+    def _importar(self, conteudo, **vals):
+        wizard = self.Wizard.create({
+            'arquivo': base64.b64encode(conteudo.encode()),
+            'nome_arquivo': 'lancamentos.csv',
+            'tamanho_lote': 2,
+            **vals,
+        })
+        wizard.action_importar()
+        return wizard
+
+    def _lancamentos(self):
+        return self.env['contabilidade.livro.diario'].search([('conta_debito_id', 'in', [self.banco.id, self.receita.id])])
+
+    def test_csv_com_erros_por_linha(self):
+        """Linhas inválidas são relatadas sem abortar as demais."""
+        conteudo = "\n".join([
+            "data;descricao;conta_debito;conta_credito;valor",
+            "2025-01-10;Venda 1;%s;%s;1.234,50" % (self.banco.codigo, self.receita.codigo),
+            "10/01/2025;Venda 2;9.9.99;%s;10" % self.receita.codigo,
+            "2025-01-11;Venda 3;%s;%s;abc" % (self.banco.codigo, self.receita.codigo),
+            "2025-01-12;Venda 4;%s;%s;20.00" % (self.banco.codigo, self.receita.codigo),
+        ])
+        for usar_copy in (False, True):
+            wizard = self._importar(conteudo, usar_copy=usar_copy)
+            self.assertEqual(wizard.total_importado, 2)
+            self.assertEqual(wizard.total_erros, 2)
+            self.assertIn("Linha 3", wizard.log_erros)
+            self.assertIn("Linha 4", wizard.log_erros)
+        self.assertEqual(sorted(self._lancamentos().mapped('valor')), [20.0, 20.0, 1234.5, 1234.5])
+
+        debit_map, _credit_map = self.env['contabilidade.agregacao']._mapas_por_conta([self.env.uid], date(2025, 1, 1), date(2025, 1, 31))
+        self.assertAlmostEqual(debit_map[self.banco.id], 2509.0)
+
+    def test_copy_com_periodo_fechado(self):
+        """Na carga rápida, um lote recusado é gravado linha a linha sem abortar a importação."""
+        self.env['contabilidade.fechamento'].create({'data': date(2024, 12, 31)})
+        conteudo = "\n".join([
+            "data;descricao;conta_debito;conta_credito;valor",
+            "2024-12-20;Venda antiga;%s;%s;5" % (self.banco.codigo, self.receita.codigo),
+            "2025-01-10;Venda nova;%s;%s;7" % (self.banco.codigo, self.receita.codigo),
+            "2025-01-11;Venda nova;%s;%s;8" % (self.banco.codigo, self.receita.codigo),
+        ])
+        wizard = self._importar(conteudo, usar_copy=True)
+        self.assertEqual(wizard.total_importado, 2)
+        self.assertEqual(wizard.total_erros, 1)
+        self.assertIn("Linha 2", wizard.log_erros)
+        self.assertEqual(sorted(self._lancamentos().mapped('valor')), [7.0, 8.0])
+
+    def test_copy_so_com_contas_analiticas(self):
+        """A carga rápida recusa o lote com conta sintética, que o ORM também recusaria."""
+        vals = {
+            'data': date(2025, 1, 10), 'descricao': 'Venda', 'valor': 10.0,
+            'conta_debito_id': self.env.ref('contabilidade.no_disponivel').id, 'conta_credito_id': self.receita.id,
+            'currency_id': self.env.ref('base.BRL').id, 'user_id': self.env.uid,
+        }
+        with self.assertRaises(ValidationError):
+            self.Wizard._copiar_lote([(1, vals)])
+
+    def test_tokens_ofx_em_uma_linha(self):
+        ofx = "OFXHEADER:100<OFX><STMTTRN><TRNAMT>-15,00<DTPOSTED>20250105<MEMO>Tarifa</STMTTRN></OFX>"
+        tokens = list(self.Wizard._tokens_ofx(io.StringIO(ofx), tamanho_bloco=7))
+        self.assertIn('TRNAMT>-15,00', tokens)
+        self.assertIn('/STMTTRN>', tokens)
@@ -0,0 +1,76 @@
+from datetime import date
+
+from odoo.tests.common import new_test_user
+
+from .common import ContabilidadeCase
+
+
+class TestIndicadorMensal(ContabilidadeCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.fornecedores = cls.env['contabilidade.contas'].create({'conta': 'Fornecedores Série', 'grupo_contabil': 'passivo_circulante'})
+        cls.Indicador = cls.env['contabilidade.indicador.mensal']
+        cls._lancar(date(2031, 1, 10), 100.0, credito=cls.fornecedores)
+        cls._lancar(date(2031, 3, 5), 50.0)
+
+    def _serie(self):
+        self.Indicador._garantir(self.env.uid, date(2031, 1, 1), date(2031, 4, 1))
+        return {
+            linha.periodo: linha
+            for linha in self.Indicador.search([('user_id', '=', self.env.uid), ('periodo', '>=', date(2031, 1, 1))])
+        }
+
+    def test_serie_acumulada(self):
+        """Cada mês usa o saldo acumulado até o seu último dia e o lucro do ano."""
+        serie = self._serie()
+        self.assertEqual(len(serie), 4)
+        self.assertGreater(serie[date(2031, 3, 1)].disponivel - serie[date(2031, 2, 1)].disponivel, 49.99)
+        self.assertEqual(
+            serie[date(2031, 3, 1)].lucro_liquido - serie[date(2031, 2, 1)].lucro_liquido, 50.0,
+        )
+
+    def test_invalidacao_incremental(self):
+        """Um lançamento marca como desatualizados apenas o mês dele e os seguintes."""
+        serie = self._serie()
+        self._lancar(date(2031, 2, 20), 10.0)
+        self.env.flush_all()
+        self.assertFalse(serie[date(2031, 1, 1)].desatualizado)
+        self.assertTrue(serie[date(2031, 2, 1)].desatualizado)
+        self.assertTrue(serie[date(2031, 4, 1)].desatualizado)
+
+        antes = serie[date(2031, 4, 1)].disponivel
+        serie = self._serie()
+        self.assertFalse(serie[date(2031, 4, 1)].desatualizado)
+        self.assertEqual(serie[date(2031, 4, 1)].disponivel - antes, 10.0)
+
+    def test_liquidez_conta_do_aluno(self):
+        """Caixa e estoque do aluno, criados sem conta superior, entram nas liquidezes imediata e seca."""
+        aluno = new_test_user(self.env, login='aluno_serie', groups='base.group_user')
+        Conta = self.env['contabilidade.contas'].with_user(aluno)
+        caixa = Conta.create({'conta': 'Caixa do Aluno', 'grupo_contabil': 'circulante'})
+        estoque = Conta.create({'conta': 'Estoque de Mercadorias', 'grupo_contabil': 'circulante'})
+        emprestimo = Conta.create({'conta': 'Empréstimo do Aluno', 'grupo_contabil': 'passivo_circulante'})
+        self.assertEqual(caixa.parent_id, self.env.ref('contabilidade.no_disponivel'))
+        self.assertEqual(estoque.parent_id, self.env.ref('contabilidade.no_estoques'))
+        Diario = self.env['contabilidade.livro.diario'].with_user(aluno)
+        for debito, valor in ((caixa, 80.0), (estoque, 20.0)):
+            Diario.create({
+                'data': date(2031, 1, 10),
+                'descricao': 'Série',
+                'conta_debito_id': debito.id,
+                'conta_credito_id': emprestimo.id,
+                'valor': valor,
+            })
+
+        # o escopo do aluno também soma os lançamentos compartilhados
+        mes = date(2031, 1, 1)
+        compartilhado = self._serie()[mes]
+        self.Indicador._garantir(aluno.id, mes, mes)
+        linha = self.Indicador.search([('user_id', '=', aluno.id), ('periodo', '=', mes)])
+        self.assertAlmostEqual(linha.disponivel - compartilhado.disponivel, 80.0)
+        self.assertAlmostEqual(linha.estoques - compartilhado.estoques, 20.0)
+        self.assertAlmostEqual(
+            linha.liq_imediata, (compartilhado.disponivel + 80.0) / (compartilhado.passivo_circulante + 100.0),
+        )
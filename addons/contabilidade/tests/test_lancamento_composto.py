@@ -0,0 +1,70 @@
+from odoo import Command
+from odoo.exceptions import ValidationError
+from datetime import date
+
+from .common import ContabilidadeCase
+
+
+class TestLancamentoComposto(ContabilidadeCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.icms = cls.env['contabilidade.contas'].create({'conta': 'ICMS a Recolher Composto', 'grupo_contabil': 'passivo_circulante'})
+
+    def _partidas(self, *lados):
+        return [Command.create({'conta_id': conta.id, 'debito': debito, 'credito': credito}) for conta, debito, credito in lados]
+
+    def test_simples_gera_duas_partidas(self):
+        lanc = self.Diario.create({
+            'data': date(2025, 5, 2),
+            'descricao': 'Venda à vista',
+            'conta_debito_id': self.banco.id,
+            'conta_credito_id': self.receita.id,
+            'valor': 100.0,
+        })
+        self.assertEqual(
+            sorted((p.conta_id, p.debito, p.credito) for p in lanc.partida_ids),
+            sorted([(self.banco, 100.0, 0.0), (self.receita, 0.0, 100.0)]),
+        )
+        lanc.valor = 120.0
+        self.assertEqual(len(lanc.partida_ids), 2)
+        self.assertEqual(sum(lanc.partida_ids.mapped('debito')), 120.0)
+
+    def test_composto_balanceado(self):
+        lanc = self.Diario.create({
+            'data': date(2025, 5, 3),
+            'descricao': 'Venda com ICMS',
+            'tipo': 'composto',
+            'partida_ids': self._partidas(
+                (self.banco, 100.0, 0.0),
+                (self.receita, 0.0, 82.0),
+                (self.icms, 0.0, 18.0),
+            ),
+        })
+        self.assertEqual(lanc.valor, 100.0)
+        debit_map, credit_map = self.env['contabilidade.agregacao']._mapas_por_conta([self.env.uid], date(2025, 5, 1), date(2025, 5, 31))
+        self.assertEqual(debit_map[self.banco.id], 100.0)
+        self.assertEqual(credit_map[self.icms.id], 18.0)
+
+    def test_composto_desbalanceado(self):
+        with self.assertRaises(ValidationError):
+            self.Diario.create({
+                'data': date(2025, 5, 4),
+                'descricao': 'Desbalanceado',
+                'tipo': 'composto',
+                'partida_ids': self._partidas((self.banco, 100.0, 0.0), (self.receita, 0.0, 90.0)),
+            })
+
+    def test_migracao_idempotente(self):
+        lanc = self.Diario.create({
+            'data': date(2025, 5, 5),
+            'descricao': 'Antigo',
+            'conta_debito_id': self.banco.id,
+            'conta_credito_id': self.receita.id,
+            'valor': 10.0,
+        })
+        lanc.partida_ids.with_context(contabilidade_saldo_diario=True).unlink()
+        self.Diario._migrar_partidas()
+        self.Diario._migrar_partidas()
+        self.assertEqual(len(lanc.partida_ids), 2)
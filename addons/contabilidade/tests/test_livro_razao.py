@@ -0,0 +1,45 @@
+from unittest.mock import patch
+from datetime import date
+
+from odoo.addons.contabilidade.models import contabilidade_livro_razao
+
+from .common import ContabilidadeCase
+
+
+class TestLivroRazao(ContabilidadeCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for dia in range(1, 6):
+            cls._lancar(date(2025, 1, dia), 10.0 * dia, descricao=f'Venda {dia}')
+
+    def test_saldo_acumulado_por_linha(self):
+        wizard = self.env['contabilidade.livro.razao.wizard'].create({
+            'conta_id': self.banco.id,
+            'data_base': date(2025, 1, 2),
+        })
+        totais, linhas = wizard._consultar()
+        self.assertEqual(totais, {'abertura': 10.0, 'debito': 140.0, 'credito': 0.0})
+        self.assertEqual([linha['saldo'] for linha in linhas], [30.0, 60.0, 100.0, 150.0])
+        self.assertEqual(wizard.saldo_final, 'R$ 150.00 D')
+
+    def test_paginacao_por_chave(self):
+        wizard = self.env['contabilidade.livro.razao.wizard'].create({'conta_id': self.banco.id})
+        with patch.object(contabilidade_livro_razao, 'TAMANHO_PAGINA', 2):
+            wizard.invalidate_recordset()
+            self.assertTrue(wizard.tem_proxima)
+            wizard.action_proxima_pagina()
+            wizard.action_proxima_pagina()
+            wizard.invalidate_recordset()
+            self.assertEqual(wizard.pagina, 3)
+            self.assertFalse(wizard.tem_proxima)
+            self.assertEqual(wizard.ultimo_saldo, 150.0)
+            self.assertIn('Venda 5', wizard.linhas_html)
+
+            wizard.action_pagina_anterior()
+            wizard.invalidate_recordset()
+            self.assertEqual(wizard.ancora_saldo, 30.0)
+            self.assertEqual(wizard.ultimo_saldo, 100.0)
+            wizard.action_pagina_anterior()
+            self.assertFalse(wizard.ancora_id)
@@ -0,0 +1,44 @@
+import csv
+import io
+from datetime import date
+
+from .common import ContabilidadeCase
+
+
+class TestLivroRazaoExportacao(ContabilidadeCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for data, descricao, valor in [
+            (date(2025, 1, 20), 'Abertura', 50.0),
+            (date(2025, 2, 3), 'Venda A', 10.0),
+            (date(2025, 2, 9), 'Venda B', 15.0),
+        ]:
+            cls._lancar(data, valor, descricao=descricao)
+
+    def _exportacao(self, formato='csv'):
+        return self.env['contabilidade.livro.razao.exportacao'].create({
+            'conta_ids': [(6, 0, [self.banco.id, self.receita.id])],
+            'date_from': date(2025, 2, 1),
+            'date_to': date(2025, 2, 28),
+            'formato': formato,
+        })
+
+    def test_linhas_por_conta(self):
+        linhas = [(linha[1], linha[3], linha[6]) for linha in self._exportacao()._linhas()]
+        self.assertEqual(linhas[:4], [
+            ('Banco Teste', 'Saldo inicial', 50.0),
+            ('Banco Teste', 'Venda A', 60.0),
+            ('Banco Teste', 'Venda B', 75.0),
+            ('Banco Teste', 'Saldo final', 75.0),
+        ])
+        self.assertEqual(linhas[-1], ('Vendas Teste', 'Saldo final', -75.0))
+
+    def test_arquivos(self):
+        arquivo, nome, _mimetype = self._exportacao('csv')._gerar_arquivo()
+        conteudo = list(csv.reader(io.StringIO(arquivo.read().decode('utf-8-sig')), delimiter=';'))
+        self.assertTrue(nome.endswith('.csv'))
+        self.assertEqual(len(conteudo), 9)
+        arquivo, nome, _mimetype = self._exportacao('xlsx')._gerar_arquivo()
+        self.assertEqual(arquivo.read(2), b'PK')
@@ -0,0 +1,39 @@
+from datetime import date
+
+from .common import ContabilidadeCase
+
+
+class TestParticionamento(ContabilidadeCase):
+
+    def test_particionar_mantem_orm(self):
+        Partida = self.env['contabilidade.livro.diario.partida']
+        antigo = self._lancar(date(2019, 6, 1), 10.0)
+
+        self.assertTrue(Partida._particionar())
+        self.assertTrue(Partida._tabela_particionada())
+        self.assertFalse(Partida._particionar())
+
+        # ano sem partição cai na partição padrão e é movido quando ela é criada
+        futuro = self._lancar(date(2090, 1, 15), 10.0)
+        self.assertTrue(Partida._criar_particao(2090))
+        self.env.cr.execute(f"SELECT COUNT(*) FROM {Partida._table}_2090")
+        self.assertEqual(self.env.cr.fetchone()[0], 2)
+
+        # mudar a data move as linhas entre partições
+        antigo.data = date(2090, 3, 1)
+        futuro.unlink()
+        self.env.invalidate_all()
+        self.assertEqual(Partida.search_count([('conta_id', '=', self.banco.id), ('data', '>=', date(2090, 1, 1))]), 1)
+
+    def test_init_completa_colunas(self):
+        """Na tabela já particionada, o init cria e preenche as colunas que faltam."""
+        Partida = self.env['contabilidade.livro.diario.partida']
+        lancamento = self._lancar(date(2019, 6, 1), 10.0)
+        Partida._particionar()
+        self.env.cr.execute(f'ALTER TABLE "{Partida._table}" DROP COLUMN escopo')
+        self.env.invalidate_all()
+
+        Partida.init()
+        self.env.cr.execute(f'SELECT escopo FROM "{Partida._table}" WHERE diario_id = %s', [lancamento.id])
+        self.assertEqual(self.env.cr.fetchall(), [(lancamento.escopo,), (lancamento.escopo,)])
+        self.assertEqual(Partida.search_count([('diario_id', '=', lancamento.id), ('escopo', '=', lancamento.escopo)]), 2)
@@ -0,0 +1,42 @@
+from datetime import date
+
+from odoo.exceptions import ValidationError
+
+from .common import ContabilidadeCase
+
+
+class TestPlanoContas(ContabilidadeCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.no_disponivel = cls.env.ref('contabilidade.no_disponivel')
+        cls.no_circulante = cls.env.ref('contabilidade.no_ativo_circulante')
+        cls.no_receitas = cls.env.ref('contabilidade.no_receitas')
+        cls.clientes = cls.env['contabilidade.contas'].create({'conta': 'Clientes Plano', 'grupo_contabil': 'circulante'})
+
+    def test_pai_padrao(self):
+        """Sem conta superior informada, a conta entra no nó do seu grupo."""
+        self.assertEqual(self.banco.parent_id, self.no_disponivel)
+        self.assertEqual(self.clientes.parent_id, self.no_circulante)
+        self.assertEqual(self.receita.parent_id, self.no_receitas)
+        self.assertTrue(self.banco.parent_path.startswith(self.no_circulante.parent_path))
+
+    def test_sintetica_fora_da_dre(self):
+        self.assertFalse(self.no_receitas.classificacao_dre)
+        self.assertEqual(self.receita.classificacao_dre, 'receita')
+
+    def test_ciclo(self):
+        with self.assertRaises(ValidationError):
+            self.no_circulante.parent_id = self.no_disponivel
+
+    def test_sintetica_sem_lancamentos(self):
+        """Uma conta sintética não recebe lançamentos, mesmo fora da interface."""
+        with self.assertRaises(ValidationError):
+            self.env['contabilidade.livro.diario'].create({
+                'data': date(2025, 4, 11),
+                'descricao': 'Venda',
+                'conta_debito_id': self.no_disponivel.id,
+                'conta_credito_id': self.receita.id,
+                'valor': 10.0,
+            })
@@ -0,0 +1,95 @@
+import base64
+
+from odoo.tests.common import TransactionCase
+
+
+class TestProvisionamento(TransactionCase):
+
+    def _wizard(self, linhas, **vals):
+        arquivo = "\n".join(["login;nome;email;senha", *linhas]).encode()
+        return self.env['contabilidade.provisionamento.wizard'].create({
+            'arquivo': base64.b64encode(arquivo),
+            **vals,
+        })
+
+    def test_usuarios_em_lote(self):
+        """Os alunos do CSV viram usuários internos; logins repetidos ou existentes são recusados."""
+        wizard = self._wizard([
+            "aluno_prov_1;Aluno Um;um@example.com;senha123",
+            "aluno_prov_2;;;",
+            "aluno_prov_1;Repetido;;",
+            "admin;Administrador;;",
+            ";Sem login;;",
+        ])
+        wizard.action_provisionar()
+        self.assertEqual(wizard.total_criados, 2)
+        self.assertEqual(wizard.total_erros, 3)
+
+        usuarios = self.env['res.users'].search([('login', 'in', ['aluno_prov_1', 'aluno_prov_2'])], order='login')
+        self.assertEqual(usuarios.mapped('name'), ['Aluno Um', 'aluno_prov_2'])
+        for usuario in usuarios:
+            self.assertTrue(usuario.has_group('base.group_user'))
+            self.assertFalse(usuario.has_group('base.group_portal'))
+
+    def test_plano_e_abertura(self):
+        """Cada aluno recebe a cópia das contas modelo e um lançamento de abertura nelas."""
+        banco = self.env.ref('contabilidade.conta_banco')
+        capital = self.env['contabilidade.contas'].create({
+            'conta': 'Capital Social', 'grupo_contabil': 'patrimonio', 'user_id': False,
+        })
+        wizard = self._wizard(
+            ["aluno_prov_3;Aluno Três;;", "aluno_prov_4;Aluno Quatro;;"],
+            conta_modelo_ids=[(6, 0, [banco.id])],
+            valor_abertura=1000.0,
+            data_abertura='2024-02-01',
+            conta_abertura_debito_id=banco.id,
+            conta_abertura_credito_id=capital.id,
+        )
+        wizard.action_provisionar()
+
+        usuarios = self.env['res.users'].search([('login', 'in', ['aluno_prov_3', 'aluno_prov_4'])])
+        for usuario in usuarios:
+            copia = self.env['contabilidade.contas'].search([('user_id', '=', usuario.id)])
+            # código próprio do aluno no mesmo prefixo, sem repetir o do modelo visível
+            self.assertNotEqual(copia.codigo, banco.codigo)
+            self.assertEqual(copia.codigo.rpartition('.')[0], banco.codigo.rpartition('.')[0])
+            self.assertEqual(copia.name, f"{copia.codigo} - {banco.conta}")
+            self.assertEqual(copia.escopo, usuario.id)
+            self.assertEqual(copia.parent_id, banco.parent_id)
+            self.assertIn(copia, self.env['contabilidade.contas'].search([('id', 'child_of', banco.parent_id.id)]))
+
+            lancamento = self.env['contabilidade.livro.diario'].search([('user_id', '=', usuario.id)])
+            self.assertEqual(lancamento.valor, 1000.0)
+            self.assertEqual(lancamento.conta_debito_id, copia)
+            self.assertEqual(lancamento.conta_credito_id, capital)
+            self.assertEqual(len(lancamento.partida_ids), 2)
+
+            saldo = self.env['contabilidade.saldo.mensal'].search([
+                ('user_id', '=', usuario.id), ('conta_id', '=', copia.id),
+            ])
+            self.assertEqual(saldo.debito, 1000.0)
+
+    def test_modelos_com_mesmo_codigo(self):
+        """Cada cópia fica ligada ao seu modelo, mesmo quando dois modelos têm o mesmo código."""
+        Conta = self.env['contabilidade.contas']
+        caixa, banco = Conta.create([
+            {'conta': conta, 'codigo': '1.0.900', 'grupo_contabil': 'circulante', 'user_id': False}
+            for conta in ('Caixa Modelo', 'Banco Modelo')
+        ])
+        capital = Conta.create({'conta': 'Capital Modelo', 'grupo_contabil': 'patrimonio', 'user_id': False})
+        wizard = self._wizard(
+            ["aluno_prov_5;Aluno Cinco;;"],
+            conta_modelo_ids=[(6, 0, [caixa.id, banco.id])],
+            valor_abertura=10.0,
+            data_abertura='2024-02-01',
+            conta_abertura_debito_id=banco.id,
+            conta_abertura_credito_id=capital.id,
+        )
+        wizard.action_provisionar()
+
+        usuario = self.env['res.users'].search([('login', '=', 'aluno_prov_5')])
+        copias = Conta.search([('user_id', '=', usuario.id)])
+        self.assertEqual(sorted(copias.mapped('conta')), ['Banco Modelo', 'Caixa Modelo'])
+        self.assertEqual(len(set(copias.mapped('codigo'))), 2)
+        lancamento = self.env['contabilidade.livro.diario'].search([('user_id', '=', usuario.id)])
+        self.assertEqual(lancamento.conta_debito_id, copias.filtered(lambda c: c.conta == 'Banco Modelo'))
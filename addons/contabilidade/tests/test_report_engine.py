@@ -0,0 +1,66 @@
+from datetime import date
+from unittest.mock import patch
+
+from odoo.tests.common import new_test_user
+
+from .common import ContabilidadeCase
+
+
+class TestReportEngine(ContabilidadeCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Engine = cls.env['contabilidade.report.engine']
+        cls._lancar(date(2025, 6, 10), 100.0)
+
+    def _debito(self):
+        debit_map, _credit_map = self.Engine._saldos([self.env.uid], date(2025, 6, 1), date(2025, 6, 30))
+        return debit_map.get(self.banco.id, 0.0)
+
+    def test_cache_por_versao(self):
+        """A mesma consulta só vai ao banco de novo depois de um lançamento."""
+        Agregacao = type(self.env['contabilidade.agregacao'])
+        original = Agregacao._mapas_por_conta
+        with patch.object(Agregacao, '_mapas_por_conta', autospec=True, side_effect=original) as consulta:
+            self.assertEqual(self._debito(), 100.0)
+            self.assertEqual(self._debito(), 100.0)
+            self.assertEqual(consulta.call_count, 1)
+
+            self._lancar(date(2025, 6, 10), 25.0)
+            self.assertEqual(self._debito(), 125.0)
+            self.assertEqual(consulta.call_count, 2)
+
+    def test_resultado_isolado(self):
+        """Alterar o mapa recebido não altera o que está em cache."""
+        debit_map, _credit_map = self.Engine._saldos([self.env.uid], date(2025, 6, 1), date(2025, 6, 30))
+        debit_map[self.banco.id] = 0.0
+        self.assertEqual(self._debito(), 100.0)
+
+    def test_memoria_da_transacao(self):
+        """Alternar contas zeradas refiltra as linhas sem recalcular os saldos."""
+        Wizard = self.env['contabilidade.balanco.patrimonial.wizard']
+        original = type(Wizard)._calcular_dados_balanco
+        with patch.object(type(Wizard), '_calcular_dados_balanco', autospec=True, side_effect=original) as calculo:
+            wizard = Wizard.create({'month_recent': '6', 'year_recent': '2025', 'month_previous': '5', 'year_previous': '2025'})
+            linhas = len(wizard.line_ids)
+            wizard.show_zero_accounts = True
+            self.assertGreater(len(wizard.line_ids), linhas)
+            wizard.show_zero_accounts = False
+            self.assertEqual(len(wizard.line_ids), linhas)
+            self.assertEqual(calculo.call_count, 1)
+
+            self._lancar(date(2025, 6, 10), 5.0)
+            wizard.invalidate_recordset()
+            wizard.line_ids
+            self.assertEqual(calculo.call_count, 2)
+
+    def test_versao_geral(self):
+        """Uma alteração para todos muda a versão até de quem não tem linha própria."""
+        Versao = self.env['contabilidade.diario.versao']
+        usuario = new_test_user(self.env, login='versao_geral')
+        antes = Versao._versoes([usuario.id])
+        Versao._incrementar()
+        depois = Versao._versoes([usuario.id])
+        self.assertNotEqual(depois, antes)
+        self.assertEqual(depois[1:], (0,))
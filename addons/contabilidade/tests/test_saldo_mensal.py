@@ -0,0 +1,43 @@
+from datetime import date
+
+from .common import ContabilidadeCase
+
+
+class TestSaldoMensal(ContabilidadeCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.SaldoMensal = cls.env['contabilidade.saldo.mensal']
+
+    def _saldos(self):
+        domain = [('conta_id', 'in', [self.banco.id, self.receita.id])]
+        return {
+            (s.conta_id.id, s.periodo): (round(s.debito, 2), round(s.credito, 2))
+            for s in self.SaldoMensal.search(domain)
+        }
+
+    def test_create_write_unlink(self):
+        """Os saldos acompanham create/write/unlink do Livro Diário."""
+        jan, fev = date(2025, 1, 1), date(2025, 2, 1)
+        lanc = self._lancar(date(2025, 1, 10), 100.0)
+        self._lancar(date(2025, 1, 20), 50.0)
+        saldos = self._saldos()
+        self.assertEqual(saldos[(self.banco.id, jan)], (150.0, 0.0))
+        self.assertEqual(saldos[(self.receita.id, jan)], (0.0, 150.0))
+
+        lanc.write({'data': date(2025, 2, 5), 'valor': 80.0})
+        saldos = self._saldos()
+        self.assertEqual(saldos[(self.banco.id, jan)], (50.0, 0.0))
+        self.assertEqual(saldos[(self.banco.id, fev)], (80.0, 0.0))
+
+        lanc.unlink()
+        self.assertEqual(self._saldos()[(self.banco.id, fev)], (0.0, 0.0))
+
+    def test_reconstruir(self):
+        """A reconstrução completa produz os mesmos totais da manutenção incremental."""
+        self._lancar(date(2025, 3, 1), 10.0)
+        self._lancar(date(2025, 4, 1), 20.0)
+        incremental = {k: v for k, v in self._saldos().items() if v != (0.0, 0.0)}
+        self.SaldoMensal._reconstruir()
+        self.assertEqual(self._saldos(), incremental)